@@ -0,0 +1,126 @@
+"""Benchmark the CSceneVehicleVis sample decoders.
+
+Compares the per-field slice-and-unpack decoder (the previous implementation,
+condensed below as the baseline) with the precompiled single-struct decoder in
+tm_gbx.ghost and, when NumPy is installed, the vectorized batch decoder.
+
+Usage:
+    python benchmarks/bench_sample_decoder.py [num_samples] [repeats]
+"""
+
+import math
+import os
+import random
+import struct
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tm_gbx.ghost import parse_vehicle_vis_sample
+
+
+def baseline_parse_vehicle_vis_sample(time_ms, sample_data):
+    """Closure + slice based decoder (one struct.unpack per field)."""
+    if len(sample_data) != 107:
+        return None
+
+    def u8(o): return sample_data[o]
+    def i8(o): return struct.unpack('b', sample_data[o:o+1])[0]
+    def u16(o): return struct.unpack('<H', sample_data[o:o+2])[0]
+    def i16(o): return struct.unpack('<h', sample_data[o:o+2])[0]
+    def f32(o): return struct.unpack('<f', sample_data[o:o+4])[0]
+
+    x, y, z = f32(47), f32(51), f32(55)
+    angle = u16(59) * math.pi / 65535.0
+    axis_heading = i16(61) * math.pi / 32767.0
+    axis_pitch = (i16(63) / 32767.0) * (math.pi / 2.0)
+    speed = math.exp(i16(65) / 1000.0)
+    vel_heading = (i8(67) / 127.0) * math.pi
+    vel_pitch = (i8(68) / 127.0) * (math.pi / 2.0)
+
+    ax = math.sin(angle) * math.cos(axis_pitch) * math.cos(axis_heading)
+    ay = math.sin(angle) * math.cos(axis_pitch) * math.sin(axis_heading)
+    az = math.sin(angle) * math.sin(axis_pitch)
+    qw = math.cos(angle)
+    roll = math.atan2(2.0 * (qw * ax + ay * az), 1.0 - 2.0 * (ax * ax + ay * ay))
+    sinp = 2.0 * (qw * ay - az * ax)
+    pitch = math.copysign(math.pi / 2, sinp) if abs(sinp) >= 1 else math.asin(sinp)
+    yaw = math.atan2(2.0 * (qw * az + ax * ay), 1.0 - 2.0 * (ay * ay + az * az))
+
+    rf = u8(89)
+    rc = u8(90)
+    brake = u8(18) / 255.0
+    sample = {
+        'time_ms': time_ms, 'time_s': time_ms / 1000.0, 'x': x, 'y': y, 'z': z,
+        'speed': speed, 'side_speed': ((u16(2) / 65536.0) - 0.5) * 2000.0,
+        'vel_x': speed * math.cos(vel_pitch) * math.cos(vel_heading),
+        'vel_y': speed * math.cos(vel_pitch) * math.sin(vel_heading),
+        'vel_z': speed * math.sin(vel_pitch),
+        'pitch_deg': math.degrees(pitch), 'yaw_deg': math.degrees(yaw), 'roll_deg': math.degrees(roll),
+        'steer': ((u8(14) / 255.0) - 0.5) * 2.0, 'gas': (u8(15) / 255.0) + brake, 'brake': brake,
+        'gear': u8(91) / 5.0, 'rpm': u8(5), 'is_turbo': (u8(31) & 0x82) != 0,
+        'turbo_time': u8(21) / 255.0, 'is_ground_contact': (rf & 0x01) != 0,
+        'is_top_contact': (u8(76) & 0x20) != 0,
+        'reactor_state': 1 if rf & 0x04 else (2 if rf & 0x08 else (3 if rf & 0x10 else 0)),
+        'reactor_boost': 1 if rf & 0x20 else (2 if rf & 0x40 else 0),
+        'reactor_pedal': 1 if rc & 0x20 else (0 if rc & 0x10 else -1),
+        'reactor_steer': -1 if rc & 0x80 else (0 if rc & 0x40 else 1),
+        'sim_time_coef': u8(102) / 255.0, 'wetness': u8(101) / 255.0,
+        'fl_slip': (u8(32) & 0x40) != 0, 'fr_slip': (u8(33) & 0x01) != 0,
+        'rr_slip': (u8(33) & 0x04) != 0, 'rl_slip': (u8(33) & 0x10) != 0,
+    }
+    for i, wheel in enumerate(('fl', 'fr', 'rr', 'rl')):
+        sample[wheel + '_dampen'] = ((u8(23 + 2 * i) / 255.0) - 0.5) * 4.0
+        sample[wheel + '_ground_mat'] = u8(24 + 2 * i)
+        sample[wheel + '_ice'] = u8(81 + i) / 255.0
+        sample[wheel + '_dirt'] = u8(93 + 2 * i) / 255.0
+        sample[wheel + '_wheel_rot'] = (u8(6 + 2 * i) / 255.0) * (2 * math.pi) + (u8(7 + 2 * i) * 2 * math.pi)
+    return sample
+
+
+def make_samples(count, seed=0):
+    """Random 107-byte samples with finite positions."""
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        data = bytearray(rng.getrandbits(8) for _ in range(107))
+        struct.pack_into('<fff', data, 47, *(rng.uniform(-2000, 2000) for _ in range(3)))
+        samples.append({'time_ms': i * 50, 'data': bytes(data)})
+    return samples
+
+
+def bench(label, func, repeats, count):
+    best = min(timeit.repeat(func, number=1, repeat=repeats))
+    print(f"{label:<28} {best * 1000:9.2f} ms   {best / count * 1e6:7.2f} us/sample   {count / best:12,.0f} samples/s")
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    samples = make_samples(count)
+
+    print(f"Decoding {count:,} CSceneVehicleVis samples (best of {repeats})\n")
+
+    baseline = bench("baseline (slice + unpack)",
+                     lambda: [baseline_parse_vehicle_vis_sample(s['time_ms'], s['data']) for s in samples],
+                     repeats, count)
+    current = bench("precompiled struct",
+                    lambda: [parse_vehicle_vis_sample(s['time_ms'], s['data']) for s in samples],
+                    repeats, count)
+    print(f"{'':<28} speedup vs baseline: {baseline / current:.2f}x")
+
+    try:
+        from tm_gbx.vectorized import decode_vehicle_vis_samples, np
+    except ImportError:
+        np = None
+    if np is not None:
+        buffer = b''.join(s['data'] for s in samples)
+        refs = [(s['time_ms'], i * 107, 107) for i, s in enumerate(samples)]
+        vectorized = bench("vectorized (NumPy)", lambda: decode_vehicle_vis_samples(buffer, refs), repeats, count)
+        print(f"{'':<28} speedup vs baseline: {baseline / vectorized:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
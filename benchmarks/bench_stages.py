@@ -0,0 +1,273 @@
+"""Benchmark every parse stage separately.
+
+Times (best and median of N runs) and memory-profiles (tracemalloc peak of
+one run) each stage of parse_gbx on its own input:
+
+    parse_header     header and user data chunks
+    ref_table        reference table skip
+    decompress_body  body decompression (zlib or LZO)
+    record_search    structural body walk to the CPlugEntRecordData chunks
+    record_inflate   record chunk decompression
+    framing          record header and entity list framing (v11: column rebuild)
+    sample_decode    parse_vehicle_vis_sample over every sample
+    parse_gbx        the whole parse, end to end
+
+over synthetic small (30 s), medium (3 min) and long (10 min) ghosts, any
+real replays passed with --gbx, and a batch workload timed through
+parse_many() in-process and on all cores. Results are written as JSON so runs
+can be compared; --compare reports stages that got slower than a baseline.
+
+Usage:
+    python benchmarks/bench_stages.py [-o results.json] [--repeats N] [--sizes small,long]
+                                      [--batch-files N] [--gbx FILE ...]
+                                      [--compare BASELINE.json [--threshold 1.25]]
+"""
+
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import tm_gbx
+from tm_gbx import ghost
+from tm_gbx.batch import parse_many
+from tm_gbx.body import read_body_records
+from tm_gbx.compression import lzo
+from tm_gbx.ghost import np, parse_vehicle_vis_sample
+from tm_gbx.header import parse_header
+from tm_gbx.parser import _decompress_body, _skip_ref_table, parse_gbx
+from tm_gbx.reader import read_uint32
+from tm_gbx.synthetic import make_spec, write_gbx
+
+RESULTS_VERSION = 1
+
+# Synthetic workloads: ghost length in seconds
+SIZES = {'small': 30, 'medium': 180, 'long': 600}
+
+
+def measure(func, repeats):
+    """Return (best seconds, median seconds, tracemalloc peak bytes) of func()."""
+    times = timeit.repeat(func, number=1, repeat=repeats)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), statistics.median(times), peak
+
+
+def stage_inputs(path):
+    """Run the stages once on a file, returning each stage's callable and sizes.
+
+    Returns:
+        list of (stage, func, bytes_in, bytes_out, samples); stops at the
+        first stage whose output the next one can't use
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    # Each stage's input is the previous stage's output, computed once here
+    header = io.BytesIO(data)
+    parse_header(header)
+    ref_table_offset = header.tell()
+    _skip_ref_table(header)
+    uncompressed_size = read_uint32(header)
+    compressed_size = read_uint32(header)
+    compressed = data[header.tell():header.tell() + compressed_size]
+
+    def skip_ref_table():
+        f = io.BytesIO(data)
+        f.seek(ref_table_offset)
+        _skip_ref_table(f)
+
+    stages = [
+        ('parse_header', lambda: parse_header(io.BytesIO(data)), ref_table_offset, 0, 0),
+        ('ref_table', skip_ref_table, 4, 0, 0),
+    ]
+
+    body = _decompress_body(compressed, uncompressed_size)
+    if not body:
+        return stages
+    stages.append(('decompress_body', lambda: _decompress_body(compressed, uncompressed_size),
+                   compressed_size, len(body), 0))
+
+    records = read_body_records(body)
+    stages.append(('record_search', lambda: read_body_records(body), len(body), 0, 0))
+    if not records:
+        return stages
+
+    offset = records[0].offset
+    version, record_data = ghost._read_record_chunk(body, offset)
+    stages.append(('record_inflate', lambda: ghost._read_record_chunk(body, offset),
+                   ghost._RECORD_CHUNK_HEAD.unpack_from(body, offset)[2], len(record_data), 0))
+
+    def frame():
+        view = memoryview(record_data)
+        record_header = ghost._read_record_header(view)
+        if version >= 11:
+            for entity in ghost._iter_column_entities(view, record_header[-1]):
+                if ghost._entity_class_id(entity['type'], record_header[2]) == ghost.VEHICLE_VIS_CLASS_ID:
+                    return ghost._decode_column_entity(view, entity)
+            return b'', []
+        for entity in ghost._read_entities(view, record_header[-1]):
+            if ghost._entity_class_id(entity['type'], record_header[2]) == ghost.VEHICLE_VIS_CLASS_ID:
+                return record_data, entity['samples']
+        return b'', []
+
+    rows, refs = frame()
+    rows = memoryview(rows)
+
+    def decode():
+        return [parse_vehicle_vis_sample(time_ms, rows[start:start + length]) for time_ms, start, length in refs]
+
+    stages.append(('framing', frame, len(record_data), 107 * len(refs), len(refs)))
+    stages.append(('sample_decode', decode, 107 * len(refs), 0, len(refs)))
+    return stages
+
+
+def result(workload, stage, bytes_in, bytes_out, samples, repeats, best, median, peak, files=1):
+    return {
+        'workload': workload,
+        'stage': stage,
+        'files': files,
+        'samples': samples,
+        'bytes_in': bytes_in,
+        'bytes_out': bytes_out,
+        'repeats': repeats,
+        'best_s': best,
+        'median_s': median,
+        'peak_alloc_bytes': peak,
+        'mb_per_s': bytes_in / best / 1e6 if best and bytes_in else None,
+        'samples_per_s': samples / best if best and samples else None,
+    }
+
+
+def bench_file(workload, path, repeats):
+    stages = stage_inputs(path)
+    samples = max(stage[4] for stage in stages)
+    stages.append(('parse_gbx', lambda: parse_gbx(path), os.path.getsize(path), 0, samples))
+
+    results = []
+    for stage, func, bytes_in, bytes_out, samples in stages:
+        best, median, peak = measure(func, repeats)
+        results.append(result(workload, stage, bytes_in, bytes_out, samples, repeats, best, median, peak))
+        print(f"{workload:<14} {stage:<16} {best * 1000:10.3f} ms  {median * 1000:10.3f} ms  "
+              f"{peak / 1024:10,.0f} KiB")
+    return results
+
+
+def bench_batch(paths, repeats, samples):
+    """parse_many() over all paths, in-process and on every core."""
+    results = []
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    for label, workers in (('batch_serial', 1), ('batch_parallel', os.cpu_count() or 1)):
+        def run():
+            for item in parse_many(paths, workers=workers):
+                if not item.ok:
+                    raise RuntimeError(f"{item.path}: {item.error}")
+
+        times = timeit.repeat(run, number=1, repeat=max(1, repeats // 2))
+        best, median = min(times), statistics.median(times)
+        results.append(result(label, 'parse_many', total_bytes, 0, samples, len(times), best, median, None,
+                              files=len(paths)))
+        print(f"{label:<14} {'parse_many':<16} {best * 1000:10.3f} ms  {median * 1000:10.3f} ms  "
+              f"{len(paths) / best:8.1f} files/s ({workers} workers)")
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'tm_gbx_version': tm_gbx.__version__,
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__ if np is not None else None,
+        'lzo': lzo is not None,
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Print best-time ratios against a baseline; return the regressed (workload, stage) pairs."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['workload'], r['stage']): r for r in json.load(f)['results']}
+
+    regressions = []
+    print(f"\nvs {baseline_path} (regression above {threshold:.2f}x)")
+    for r in results:
+        old = baseline.get((r['workload'], r['stage']))
+        if old is None or not old['best_s']:
+            continue
+        # Per file, so batch runs of different sizes stay comparable
+        ratio = (r['best_s'] / r['files']) / (old['best_s'] / old['files'])
+        flag = ''
+        if ratio > threshold:
+            regressions.append((r['workload'], r['stage']))
+            flag = '  REGRESSION'
+        print(f"{r['workload']:<14} {r['stage']:<16} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every tm_gbx parse stage")
+    parser.add_argument('-o', '--output', default='bench_stages.json', help="JSON results file")
+    parser.add_argument('--repeats', type=int, default=5, help="timed runs per stage (best and median)")
+    parser.add_argument('--sizes', default=','.join(SIZES), help="synthetic ghost sizes to run")
+    parser.add_argument('--record-version', type=int, choices=(10, 11), default=10)
+    parser.add_argument('--batch-files', type=int, default=32, help="medium ghosts in the batch workload")
+    parser.add_argument('--gbx', nargs='*', default=[], help="real replay files to add as workloads")
+    parser.add_argument('--compare', help="baseline results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="slowdown ratio counted as regression")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'workload':<14} {'stage':<16} {'best':>13}  {'median':>13}  {'peak alloc':>14}")
+        for name in args.sizes.split(','):
+            spec = make_spec(f"{name}.Replay.Gbx", seed=1, duration_s=SIZES[name],
+                             record_version=args.record_version)
+            path = os.path.join(tmp, spec.name)
+            write_gbx(path, spec)
+            results += bench_file(name, path, args.repeats)
+
+        for path in args.gbx:
+            results += bench_file(os.path.basename(path), path, args.repeats)
+
+        if args.batch_files:
+            paths = []
+            for index in range(args.batch_files):
+                spec = make_spec(f"batch-{index:04d}.Replay.Gbx", seed=100 + index, duration_s=SIZES['medium'],
+                                 record_version=args.record_version)
+                paths.append(os.path.join(tmp, spec.name))
+                write_gbx(paths[-1], spec)
+            results += bench_batch(paths, args.repeats, args.batch_files * spec.num_samples)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'version': RESULTS_VERSION, 'environment': environment(), 'results': results}, f, indent=1)
+    print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
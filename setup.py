@@ -9,8 +9,13 @@ setup(
     ],
     extras_require={
         'lzo': ['python-lzo>=1.14'],  # Optional for body decompression
+        'numpy': ['numpy>=1.17'],  # Optional for columnar sample decoding
+        'arrow': ['pyarrow>=8.0', 'numpy>=1.17'],  # Optional for Arrow/Parquet output
         'dev': ['pytest>=7.0'],
     },
+    entry_points={
+        'console_scripts': ['tm-gbx=tm_gbx.cli:main'],
+    },
     python_requires='>=3.7',
     author="villezekeviking",
     description="Pure-Python parser for TrackMania 2020 GBX replay files",
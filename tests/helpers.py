@@ -0,0 +1,142 @@
+"""Builders of synthetic samples, records, bodies and GBX files shared by the tests."""
+
+import random
+import struct
+import zlib
+
+NODE_END = struct.pack('<I', 0xFACADE01)
+
+
+def string(value):
+    return struct.pack('<I', len(value)) + value
+
+
+def record_chunk(record, version=10):
+    compressed = zlib.compress(record)
+    return struct.pack('<IIII', 0x0911F000, version, len(record), len(compressed)) + compressed
+
+
+def skippable(chunk_id, payload):
+    return struct.pack('<I', chunk_id) + b'PIKS' + struct.pack('<I', len(payload)) + payload
+
+
+def ghost_chunks(record, node_index=2, nickname=b'Player', first_id=True):
+    """Chunks of a CGameCtnGhost node whose main chunk references a record node.
+
+    The lookback version precedes only the first Id of a body (first_id).
+    """
+    ghost = struct.pack('<I', 8)
+    ghost += struct.pack('<I', 3) if first_id else b''
+    ghost += struct.pack('<I', 0x40000000) + string(b'CarSport')           # player model ident
+    ghost += struct.pack('<I', 10003) + struct.pack('<I', 0x40000000) + string(b'Nadeo')
+    ghost += struct.pack('<fff', 0.5, 1.0, 0.0)
+    ghost += struct.pack('<IB', 1, 3) + bytes(32) + string(b'Skins\\Stadium.zip') + string(b'')
+    ghost += struct.pack('<I', 0)                                           # no badges
+    ghost += string(nickname) + string(b'') + string(b'') + struct.pack('<I', 0)
+    ghost += struct.pack('<iI', node_index, 0x0911F000) + record_chunk(record) + NODE_END
+    ghost += struct.pack('<II', 1, 0) + string(b'PLA') + string(b'World') + string(b'')
+
+    out = struct.pack('<IIII', 0x0303F006, 1, 4, 12) + b'\x78\x9c' + bytes(10)
+    out += skippable(0x0303F007, struct.pack('<I', 0x0911F000))
+    out += skippable(0x03092000, ghost)
+    out += struct.pack('<II', 0x03092010, 0x40000000) + string(b'MapUid')
+    return out
+
+
+def replay_body(record, map_data=b''):
+    """Replay body: embedded map, then a ghost list holding one ghost node."""
+    body = struct.pack('<II', 0x03093002, len(map_data)) + map_data
+    body += struct.pack('<IIIiI', 0x03093014, 10, 1, 1, 0x03092000) + ghost_chunks(record) + NODE_END
+    body += struct.pack('<II', 0, 0)
+    body += struct.pack('<Ii', 0x03093015, -1)
+    return body + NODE_END
+
+
+def build_ghost_gbx(samples, class_id=0x03093000, record_version=10):
+    """Build a minimal zlib-bodied GBX file with one CPlugEntRecordData record."""
+    record = struct.pack('<iiII', 0, len(samples) * 50, 0, 0)
+    record += struct.pack('<B', 1) + struct.pack('<iiiii', 0x0A018000, 0, 0, 0, 0)
+    for i, data in enumerate(samples):
+        record += struct.pack('<BiI', 1, i * 50, len(data)) + data
+    record += b'\x00\x00\x00\x00'
+    compressed_record = zlib.compress(record)
+
+    body = struct.pack('<IIII', 0x0911F000, record_version, len(record), len(compressed_record)) + compressed_record
+    compressed_body = zlib.compress(body)
+
+    header = b'GBX' + struct.pack('<H', 6) + b'BUCR' + struct.pack('<III', class_id, 0, 2)
+    return header + struct.pack('<iII', 0, len(body), len(compressed_body)) + compressed_body
+
+
+def build_record(samples, descriptor_data=b'', samples2_data=b''):
+    """Build a CPlugEntRecordData record with one vehicle entity."""
+    out = struct.pack('<ii', 0, 1000)
+    out += struct.pack('<I', 1) + struct.pack('<IiiiI', 0x0A018000, 107, 0, 0, len(descriptor_data))
+    out += descriptor_data + struct.pack('<i', 0)
+    out += struct.pack('<I', 1) + struct.pack('<iiI', 1, 2, 0x0A018000)
+    out += struct.pack('<B', 1) + struct.pack('<iiiii', 0x0A018000, 0, 0, 0, 0)
+    for time_ms, data in samples:
+        out += struct.pack('<BiI', 1, time_ms, len(data)) + data
+    out += struct.pack('<BB', 0, 0)
+    if samples2_data:
+        out += struct.pack('<BiiI', 1, 7, 8, len(samples2_data)) + samples2_data
+    out += struct.pack('<B', 0)
+    out += struct.pack('<B', 0)
+    return out
+
+
+def build_multi_record(entities):
+    """Build a version 10 record; entities is a list of (descriptor index, samples).
+
+    Descriptor 0 is CSceneVehicleVis, descriptor 1 another entity class. Only
+    the first entity is announced by a sentinel byte; each entity's hasNext
+    byte chains to the next one.
+    """
+    out = struct.pack('<ii', 0, 1000) + struct.pack('<I', 2)
+    out += struct.pack('<IiiiI', 0x0A018000, 107, 0, 0, 0) + struct.pack('<i', 0)
+    out += struct.pack('<IiiiI', 0x0A02B000, 20, 0, 0, 0) + struct.pack('<i', 0)
+    out += struct.pack('<I', 0)
+    out += struct.pack('<B', 1)
+    for i, (desc_index, samples) in enumerate(entities):
+        out += struct.pack('<iiiii', desc_index, 0, 0, 0, 0)
+        for time_ms, data in samples:
+            out += struct.pack('<BiI', 1, time_ms, len(data)) + data
+        out += struct.pack('<BBB', 0, int(i < len(entities) - 1), 0)
+    return out + struct.pack('<B', 0)
+
+
+def build_column_record(rows, start=0, period=50, other_rows=()):
+    """Build a version 11 record: a 4-byte-row entity, then the vehicle entity.
+
+    Entity types are descriptor indices; rows are stored column-wise as
+    byte deltas.
+    """
+    def column_entity(desc_index, rows):
+        num_keys = len(rows[0]) if rows else 0
+        out = struct.pack('<BiIiiiIII', 1, desc_index, 0x02000006, start,
+                          start + period * (len(rows) - 1), 0, len(rows), num_keys, 0)
+        out += struct.pack(f'<{max(len(rows) - 1, 0)}I', *[period] * (len(rows) - 1))
+        for key in range(num_keys):
+            column = [row[key] for row in rows]
+            out += bytes([column[0]] + [(b - a) & 0xFF for a, b in zip(column, column[1:])])
+        return out
+
+    out = struct.pack('<ii', start, start + period * (len(rows) - 1))
+    out += struct.pack('<I', 2)
+    for class_id, sample_size in ((0x2F0CB000, 4), (0x0A018000, 864)):
+        out += struct.pack('<IiiiI', class_id, sample_size, 0, 0, 0) + struct.pack('<i', 0)
+    out += struct.pack('<I', 0)
+    out += column_entity(0, list(other_rows)) + column_entity(1, rows)
+    out += struct.pack('<B', 0)
+    return out
+
+
+def make_samples(count, seed=42):
+    """Build random 107-byte samples with sane position floats."""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        data = bytearray(rng.getrandbits(8) for _ in range(107))
+        struct.pack_into('<fff', data, 47, *(rng.uniform(-2000, 2000) for _ in range(3)))
+        samples.append(bytes(data))
+    return samples
@@ -0,0 +1,92 @@
+"""Tests for the asyncio parsing API."""
+
+import asyncio
+import pytest
+
+from tm_gbx import parse_gbx
+from tm_gbx.aio import parse_gbx_async, parse_many_async
+from tests.helpers import build_ghost_gbx
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def collect(aiter):
+    return [item async for item in aiter]
+
+
+@pytest.fixture
+def ghost_file(tmp_path):
+    path = tmp_path / "async.Ghost.Gbx"
+    path.write_bytes(build_ghost_gbx([bytes(range(107))] * 12))
+    return str(path)
+
+
+class TestParseGbxAsync:
+    """Test parse_gbx_async()."""
+
+    def test_path_and_bytes(self, ghost_file):
+        """Paths and in-memory bytes give the same result as parse_gbx."""
+        with open(ghost_file, 'rb') as f:
+            data = f.read()
+        expected = parse_gbx(ghost_file)
+
+        assert run(parse_gbx_async(ghost_file)) == expected
+        assert run(parse_gbx_async(data)) == expected
+
+    def test_semaphore_and_kwargs(self, ghost_file):
+        async def main():
+            semaphore = asyncio.Semaphore(1)
+            return await asyncio.gather(*(
+                parse_gbx_async(ghost_file, semaphore=semaphore, fields=['time_ms']) for _ in range(3)))
+
+        results = run(main())
+
+        assert all(r['ghost_samples'][-1] == {'time_ms': 550} for r in results)
+
+    def test_path_only_kwargs_with_bytes(self, ghost_file):
+        """use_mmap is ignored for bytes; a header-only parse of bytes is refused up front."""
+        with open(ghost_file, 'rb') as f:
+            data = f.read()
+
+        assert run(parse_gbx_async(data, use_mmap=True, body=True)) == parse_gbx(ghost_file)
+        with pytest.raises(ValueError, match="body=False"):
+            run(parse_gbx_async(data, body=False))
+        assert run(parse_gbx_async(ghost_file, body=False))['ghost_info'] is None
+
+    def test_errors_propagate(self, tmp_path):
+        with pytest.raises(ValueError):
+            run(parse_gbx_async(b'not a gbx file'))
+
+
+class TestParseManyAsync:
+    """Test parse_many_async()."""
+
+    @pytest.mark.parametrize('ordered', [True, False])
+    def test_batch(self, ghost_file, ordered):
+        sources = [ghost_file, b'garbage', ghost_file, ghost_file, ghost_file]
+        results = run(collect(parse_many_async(sources, concurrency=2, ordered=ordered)))
+
+        assert len(results) == 5
+        failed = [r for r in results if not r.ok]
+        assert [r.path for r in failed] == [1]
+        assert all(r.result == parse_gbx(ghost_file) for r in results if r.ok)
+        if ordered:
+            assert [r.path for r in results] == [ghost_file, 1, ghost_file, ghost_file, ghost_file]
+
+    def test_use_mmap_with_mixed_sources(self, ghost_file):
+        with open(ghost_file, 'rb') as f:
+            data = f.read()
+
+        results = run(collect(parse_many_async([ghost_file, data], use_mmap=True)))
+
+        assert [r.error for r in results] == [None, None]
+        assert results[0].result == results[1].result
+
+    def test_early_exit(self, ghost_file):
+        async def main():
+            async for result in parse_many_async([ghost_file] * 10, concurrency=3):
+                return result
+
+        assert run(main()).ok
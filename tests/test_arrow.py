@@ -0,0 +1,75 @@
+"""Tests for Arrow / Parquet output."""
+
+import math
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("numpy")
+import pyarrow.parquet as pq
+
+from tm_gbx import parse_gbx
+from tm_gbx.arrow import parse_gbx_arrow, replay_id_for, write_parquet
+from tests.helpers import build_ghost_gbx, make_samples
+
+
+@pytest.fixture
+def ghost_files(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"ghost_{i}.Ghost.Gbx"
+        path.write_bytes(build_ghost_gbx(make_samples(10 + i, seed=i)))
+        paths.append(str(path))
+    return paths
+
+
+class TestArrowOutput:
+    """Test RecordBatch conversion."""
+
+    def test_types_and_values(self, ghost_files):
+        path = ghost_files[0]
+        batch = parse_gbx_arrow(path)['ghost_samples']
+        expected = parse_gbx(path)['ghost_samples']
+
+        assert batch.num_rows == len(expected) == 10
+        assert batch.schema.field('time_ms').type == pa.int32()
+        assert batch.schema.field('x').type == pa.float32()
+        assert batch.schema.field('fl_ground_mat').type == pa.uint8()
+        assert batch.schema.field('is_turbo').type == pa.bool_()
+        assert batch.column('replay_id')[0].as_py() == replay_id_for(path)
+
+        rows = batch.to_pylist()
+        for row, sample in zip(rows, expected):
+            assert row['time_ms'] == sample['time_ms']
+            assert row['fl_ground_mat'] == sample['fl_ground_mat']
+            assert row['is_turbo'] == sample['is_turbo']
+            assert math.isclose(row['speed'], sample['speed'], rel_tol=1e-6)
+
+    def test_header_and_fields(self, ghost_files):
+        result = parse_gbx_arrow(ghost_files[1], fields=['time_ms', 'x'])
+
+        assert result['ghost_samples'].schema.names == ['replay_id', 'time_ms', 'x']
+        header = result['header'].to_pylist()[0]
+        assert header['file_name'] == 'ghost_1.Ghost.Gbx'
+        assert header['num_samples'] == 11
+        assert header['record_version'] == 10
+
+
+class TestWriteParquet:
+    """Test write_parquet()."""
+
+    def test_writes_row_groups(self, ghost_files, tmp_path):
+        bad = tmp_path / "bad.Gbx"
+        bad.write_bytes(b'garbage')
+        out_dir = tmp_path / "out"
+
+        summary = write_parquet(ghost_files + [str(bad)], str(out_dir), row_group_size=20)
+
+        assert summary['files'] == 3
+        assert summary['rows'] == 33
+        assert [path for path, _ in summary['failed']] == [str(bad)]
+
+        samples = pq.ParquetFile(str(out_dir / "samples.parquet"))
+        assert samples.metadata.num_rows == 33
+        assert samples.metadata.num_row_groups > 1
+        headers = pq.read_table(str(out_dir / "headers.parquet"))
+        assert headers.column('num_samples').to_pylist() == [10, 11, 12]
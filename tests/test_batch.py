@@ -0,0 +1,59 @@
+"""Tests for multi-process batch parsing."""
+
+import pytest
+
+from tm_gbx import parse_gbx, parse_many
+from tests.helpers import build_ghost_gbx
+
+
+@pytest.fixture
+def batch_files(tmp_path):
+    """Five valid ghost files with different sample counts and one bad file."""
+    paths = []
+    for count in range(1, 6):
+        path = tmp_path / f"ghost_{count}.Ghost.Gbx"
+        path.write_bytes(build_ghost_gbx([bytes([count]) * 107] * count))
+        paths.append(str(path))
+    bad = tmp_path / "bad.Gbx"
+    bad.write_bytes(b'not a gbx file at all')
+    paths.insert(2, str(bad))
+    return paths
+
+
+class TestParseMany:
+    """Test parse_many()."""
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_ordered_results_match_parse_gbx(self, batch_files, workers):
+        results = list(parse_many(batch_files, workers=workers, chunksize=2))
+
+        assert [r.path for r in results] == batch_files
+        for r in results:
+            if r.ok:
+                assert r.result == parse_gbx(r.path)
+
+    def test_bad_file_is_captured(self, batch_files):
+        """One unreadable file doesn't stop the batch."""
+        results = list(parse_many(batch_files, workers=2))
+
+        failed = [r for r in results if not r.ok]
+        assert len(failed) == 1
+        assert failed[0].path.endswith("bad.Gbx")
+        assert failed[0].result is None
+        assert failed[0].error.startswith("ValueError: Invalid GBX file")
+        assert sum(r.ok for r in results) == 5
+
+    def test_unordered(self, batch_files):
+        results = list(parse_many(batch_files, workers=2, ordered=False))
+
+        assert sorted(r.path for r in results) == sorted(batch_files)
+
+    def test_parse_kwargs(self, batch_files):
+        """Keyword arguments are forwarded to parse_gbx."""
+        results = parse_many(batch_files[:2], workers=1, fields=['time_ms'])
+
+        assert [r.result['ghost_samples'] for r in results] == [[{'time_ms': 0}], [{'time_ms': 0}, {'time_ms': 50}]]
+
+    def test_rejects_lazy(self, batch_files):
+        with pytest.raises(ValueError):
+            next(parse_many(batch_files, lazy=True))
@@ -0,0 +1,82 @@
+"""Tests for the GBX body structure walk."""
+
+import io
+import struct
+
+from tm_gbx import stats as reasons
+from tm_gbx.body import BodyChunk, index_chunks, read_body_records, walk_to_record
+from tm_gbx.stats import ParseStats
+from tm_gbx.ghost import extract_record_data
+from tests.helpers import NODE_END, ghost_chunks, record_chunk, replay_body
+
+
+class TestReadBodyRecords:
+    """Test walking the body structure to the CPlugEntRecordData chunk."""
+
+    def test_replay_body(self):
+        """The record is reached through the ghost list and the ghost's main chunk."""
+        record = b'record' * 10
+        body = replay_body(record)
+        found, = read_body_records(body)
+
+        # The record node's class ID right before the chunk ID is not taken for it
+        assert body[found.offset - 8:found.offset] == struct.pack('<II', 0x0911F000, 0x0911F000)
+        assert found.player['nickname'] == 'Player'
+        assert extract_record_data(body) == (10, record)
+
+    def test_ghost_body(self):
+        """A .Ghost.Gbx body holds the ghost node's chunks directly."""
+        record = b'ghost' * 10
+
+        assert extract_record_data(ghost_chunks(record) + NODE_END) == (10, record)
+
+    def test_ignores_chunk_ids_in_other_data(self):
+        """Record chunks inside the embedded map or unread chunks are never considered."""
+        decoy = record_chunk(b'decoy' * 10, version=5)
+        body = replay_body(b'record' * 10, map_data=b'\x00' * 50 + decoy + b'\x00' * 50)
+
+        assert len(read_body_records(body)) == 1
+        assert extract_record_data(body) == (10, b'record' * 10)
+
+    def test_unknown_chunk_ends_the_walk(self):
+        """A non-skippable chunk of unknown layout ends the walk instead of a search."""
+        body = struct.pack('<II', 0x03093099, 0) + replay_body(b'record' * 10)
+        stats = ParseStats()
+        stats.begin_file('replay')
+
+        assert read_body_records(body, stats) == []
+        assert walk_to_record(io.BytesIO(body)) is None
+        assert stats.end_file()['failure'] == reasons.UNREADABLE_BODY
+
+    def test_bare_record_chunk(self):
+        """A body that starts with the record chunk is read directly."""
+        assert [record.offset for record in read_body_records(record_chunk(b'x' * 40))] == [4]
+        assert read_body_records(b'') == []
+
+
+class TestIndexChunks:
+    """Test listing the chunks of a body."""
+
+    def test_replay_body(self):
+        """Every chunk the walk reads or skips is listed with its payload offset and size."""
+        body = replay_body(b'record' * 10, map_data=b'm' * 100)
+
+        chunks = index_chunks(body)
+
+        assert [(chunk.chunk_id, chunk.depth) for chunk in chunks] == [
+            (0x03093002, 0), (0x03093014, 0), (0x0303F006, 1), (0x0303F007, 1),
+            (0x03092000, 1), (0x0911F000, 2), (0x03092010, 1), (0x03093015, 0)]
+        assert chunks[0] == BodyChunk(0x03093002, 4, 104, False, 0)
+        assert chunks[3].skippable and chunks[3].size == 4
+        # Outer chunks span the nodes read from them
+        ghost_list, ghost = chunks[1], chunks[4]
+        assert ghost_list.offset < ghost.offset and ghost.offset + ghost.size <= ghost_list.offset + ghost_list.size
+        assert chunks[5].offset == read_body_records(body)[0].offset
+
+    def test_unknown_chunk_ends_index(self):
+        """A non-skippable chunk of unknown layout is listed last, without a size."""
+        body = struct.pack('<II', 0x03093002, 0) + struct.pack('<II', 0x03093099, 10)
+
+        assert index_chunks(body) == [BodyChunk(0x03093002, 4, 4, False, 0),
+                                      BodyChunk(0x03093099, 12, None, False, 0)]
+
@@ -0,0 +1,113 @@
+"""Tests for the persistent parse cache."""
+
+import os
+import pytest
+
+import tm_gbx
+from tm_gbx import parse_gbx
+from tm_gbx.cache import ParseCache
+from tests.helpers import build_ghost_gbx
+
+
+def write_ghosts(directory, count):
+    paths = []
+    for i in range(count):
+        path = directory / f"ghost_{i}.Ghost.Gbx"
+        path.write_bytes(build_ghost_gbx([bytes([i]) * 107] * (20 + i)))
+        paths.append(str(path))
+    return paths
+
+
+class TestParseCache:
+    """Test ParseCache."""
+
+    def test_hit_returns_same_result(self, tmp_path):
+        path, = write_ghosts(tmp_path, 1)
+        cache = ParseCache(str(tmp_path / "cache"))
+
+        first = cache.parse_gbx(path)
+        second = ParseCache(str(tmp_path / "cache")).parse_gbx(path)
+
+        assert first == second == parse_gbx(path)
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['entries'] == 1
+
+    def test_stats(self, tmp_path):
+        path, = write_ghosts(tmp_path, 1)
+        cache = ParseCache(str(tmp_path / "cache"))
+
+        for _ in range(4):
+            cache.parse_gbx(path)
+        cache.parse_gbx(path, fields=['x'])
+
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (3, 2, 2)
+        assert stats['hit_rate'] == 0.6
+
+    def test_trace_results_cached_separately(self, tmp_path):
+        """trace=True is part of the key and comes back as a GhostTrace."""
+        path, = write_ghosts(tmp_path, 1)
+        cache = ParseCache(str(tmp_path / "cache"))
+
+        rows = cache.parse_gbx(path)
+        trace = ParseCache(str(tmp_path / "cache")).parse_gbx(path, trace=True)
+        cached = ParseCache(str(tmp_path / "cache")).parse_gbx(path, trace=True)['ghost_samples']
+
+        assert isinstance(rows['ghost_samples'], list)
+        assert isinstance(cached, tm_gbx.GhostTrace) and cached == trace['ghost_samples']
+        assert cache.stats()['entries'] == 1 and len(os.listdir(tmp_path / "cache")) == 2
+
+    def test_rejects_unknown_arguments(self, tmp_path):
+        path, = write_ghosts(tmp_path, 1)
+
+        with pytest.raises(TypeError):
+            ParseCache(str(tmp_path / "cache")).parse_gbx(path, stats=object())
+
+    def test_content_addressed(self, tmp_path):
+        """A changed file is a miss; a renamed copy is a hit."""
+        path, = write_ghosts(tmp_path, 1)
+        cache = ParseCache(str(tmp_path / "cache"))
+        cache.parse_gbx(path)
+
+        os.rename(path, path + ".moved")
+        cache.parse_gbx(path + ".moved")
+        assert cache.hits == 1
+
+        with open(path + ".moved", 'wb') as f:
+            f.write(build_ghost_gbx([bytes(107)] * 3))
+        assert cache.parse_gbx(path + ".moved")['ghost_info']['num_samples'] == 3
+        assert cache.misses == 2
+
+    def test_lru_eviction(self, tmp_path):
+        paths = write_ghosts(tmp_path, 4)
+        cache = ParseCache(str(tmp_path / "cache"))
+        for path in paths[:2]:
+            cache.parse_gbx(path)
+        entry_size = cache.stats()['bytes'] // 2
+
+        cache.max_bytes = entry_size * 3
+        cache.parse_gbx(paths[0])  # paths[1] is now least recently used
+        cache.parse_gbx(paths[2])
+        cache.parse_gbx(paths[3])
+
+        assert cache.evictions >= 1
+        assert cache.stats()['bytes'] <= cache.max_bytes
+        cache.parse_gbx(paths[1])
+        assert cache.misses == 5
+
+    def test_version_bump_invalidates(self, tmp_path, monkeypatch):
+        path, = write_ghosts(tmp_path, 1)
+        ParseCache(str(tmp_path / "cache")).parse_gbx(path)
+
+        monkeypatch.setattr(tm_gbx, '__version__', '999.0.0')
+        cache = ParseCache(str(tmp_path / "cache"))
+
+        assert cache.stats()['entries'] == 0
+        assert os.listdir(str(tmp_path / "cache")) == []
+        cache.parse_gbx(path)
+        assert cache.misses == 1
+
+    def test_rejects_lazy(self, tmp_path):
+        path, = write_ghosts(tmp_path, 1)
+        with pytest.raises(ValueError):
+            ParseCache(str(tmp_path / "cache")).parse_gbx(path, lazy=True)
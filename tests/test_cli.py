@@ -0,0 +1,92 @@
+"""Tests for the tm-gbx command-line converter."""
+
+import json
+import os
+import pytest
+
+from tm_gbx import parse_gbx
+from tm_gbx.cli import main, convert_tree
+from tests.helpers import build_ghost_gbx, make_samples
+
+
+@pytest.fixture
+def replay_tree(tmp_path):
+    """input/ with two ghosts in nested folders and one corrupt file."""
+    root = tmp_path / "input"
+    (root / "map_a").mkdir(parents=True)
+    (root / "map_b" / "top").mkdir(parents=True)
+    (root / "map_a" / "one.Ghost.Gbx").write_bytes(build_ghost_gbx(make_samples(5)))
+    (root / "map_b" / "top" / "two.Replay.gbx").write_bytes(build_ghost_gbx(make_samples(7, seed=1)))
+    (root / "map_b" / "broken.Gbx").write_bytes(b'not a replay')
+    (root / "notes.txt").write_text("ignored")
+    return root
+
+
+class TestConvert:
+    """Test `tm-gbx convert`."""
+
+    def test_jsonl_output(self, replay_tree, tmp_path, capsys):
+        out = tmp_path / "out"
+
+        assert main(['convert', str(replay_tree), str(out), '-j', '2']) == 1
+
+        lines = (out / "map_a" / "one.Ghost.jsonl").read_text().splitlines()
+        header = json.loads(lines[0])
+        expected = parse_gbx(str(replay_tree / "map_a" / "one.Ghost.Gbx"))
+        assert header['ghost_info'] == expected['ghost_info']
+        assert [json.loads(line) for line in lines[1:]] == expected['ghost_samples']
+        assert (out / "map_b" / "top" / "two.Replay.jsonl").exists()
+
+        captured = capsys.readouterr()
+        assert "2 converted, 0 up to date, 1 failed (3 files)" in captured.out
+        assert "samples/s" in captured.out and "MB/s" in captured.out
+        assert "broken.Gbx" in captured.err
+
+    def test_skips_up_to_date(self, replay_tree, tmp_path):
+        out = tmp_path / "out"
+        convert_tree(str(replay_tree), str(out), workers=1)
+
+        summary = convert_tree(str(replay_tree), str(out), workers=1)
+        assert (summary['converted'], summary['skipped']) == (0, 2)
+
+        src = replay_tree / "map_a" / "one.Ghost.Gbx"
+        os.utime(src, (os.path.getmtime(src) + 10,) * 2)
+        summary = convert_tree(str(replay_tree), str(out), workers=1)
+        assert (summary['converted'], summary['skipped']) == (1, 1)
+
+        assert convert_tree(str(replay_tree), str(out), workers=1, force=True)['converted'] == 2
+
+    def test_no_temp_files_left(self, replay_tree, tmp_path):
+        out = tmp_path / "out"
+        convert_tree(str(replay_tree), str(out), workers=1)
+
+        leftovers = [name for _, _, files in os.walk(out) for name in files if name.endswith('.tmp')]
+        assert leftovers == []
+        assert not (out / "map_b" / "broken.jsonl").exists()
+
+    def test_outputs_get_umask_mode(self, replay_tree, tmp_path):
+        """Outputs are readable like any new file, not mode 0600 from the temp file."""
+        out = tmp_path / "out"
+        old_umask = os.umask(0o022)
+        try:
+            convert_tree(str(replay_tree), str(out), workers=1)
+        finally:
+            os.umask(old_umask)
+
+        assert (out / "map_a" / "one.Ghost.jsonl").stat().st_mode & 0o777 == 0o644
+
+    def test_parquet_output(self, replay_tree, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        out = tmp_path / "out"
+
+        summary = convert_tree(str(replay_tree), str(out), fmt='parquet', workers=1, fields=['time_ms', 'x'])
+
+        assert summary['samples'] == 12
+        table = pq.read_table(str(out / "map_a" / "one.Ghost.parquet"))
+        assert table.column_names == ['replay_id', 'time_ms', 'x']
+        header = json.loads(table.schema.metadata[b'tm_gbx'])
+        assert header['ghost_info']['num_samples'] == 5
+
+    def test_unknown_field(self, replay_tree, tmp_path, capsys):
+        assert main(['convert', str(replay_tree), str(tmp_path / "out"), '--fields', 'x,nope']) == 2
+        assert "nope" in capsys.readouterr().err
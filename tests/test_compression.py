@@ -0,0 +1,73 @@
+"""Tests for the decompressor registry."""
+
+import struct
+import zlib
+
+from tm_gbx import iter_ghost_samples, parse_gbx
+from tm_gbx import stats as reasons
+from tm_gbx import compression
+from tm_gbx.compression import CODECS, Codec, body_codec_name, codec_stats, get_codec
+from tm_gbx.stats import ParseStats
+from tests.helpers import build_ghost_gbx
+
+
+class TestRegistry:
+    """Test codec selection and counters."""
+
+    def test_body_codec_from_stream_header(self):
+        """zlib bodies are recognized by their header; anything else is LZO."""
+        assert body_codec_name(zlib.compress(b'body')) == 'zlib'
+        assert body_codec_name(memoryview(zlib.compress(b'body', 1))) == 'zlib'
+        assert body_codec_name(b'\x2d\x02\x00\x00') == 'lzo'
+        # Deflate method and check bits, but a window larger than zlib allows
+        assert body_codec_name(b'\x88\x1c\x00\x00') == 'lzo'
+        assert body_codec_name(b'') == 'lzo'
+
+    def test_counters(self):
+        """Calls, bytes and time are counted per codec."""
+        codec = Codec('test', lambda data, size: data * size, (ValueError,))
+
+        assert codec.decompress(b'ab', 3) == b'ababab'
+        assert codec.stats()['calls'] == 1
+        assert (codec.bytes_in, codec.bytes_out) == (2, 6)
+        codec.reset_stats()
+        assert codec.stats()['calls'] == 0 and codec.seconds == 0.0
+
+    def test_lzo_resolved_at_import(self):
+        """The LZO codec is registered exactly when python-lzo imported."""
+        assert (get_codec('lzo') is None) == (compression.lzo is None)
+        assert get_codec('zlib') is CODECS['zlib']
+
+    def test_parse_uses_selected_codec_only(self, tmp_path, monkeypatch):
+        """A zlib body is never handed to the LZO codec, and both are counted."""
+        calls = []
+        monkeypatch.setitem(CODECS, 'lzo', Codec('lzo', lambda *args: calls.append(args), (ValueError,)))
+        monkeypatch.setitem(CODECS, 'zlib', Codec('zlib', compression._zlib_decompress, (zlib.error,)))
+        path = tmp_path / "zlib.Ghost.Gbx"
+        path.write_bytes(build_ghost_gbx([bytes(107)] * 3))
+
+        assert len(parse_gbx(str(path))['ghost_samples']) == 3
+        assert calls == []
+        # Body and record
+        assert codec_stats()['zlib']['calls'] == 2
+
+    def test_lzo_body_passing_zlib_header_check(self, tmp_path, monkeypatch):
+        """A body that looks like zlib but doesn't inflate is decompressed as LZO."""
+        data = build_ghost_gbx([bytes(107)] * 3)
+        body = zlib.decompress(data[33:])
+        lzo_body = b'\x78\x9c' + b'\xff' * 30
+        path = tmp_path / "lzo.Replay.Gbx"
+        path.write_bytes(data[:21] + struct.pack('<iII', 0, len(body), len(lzo_body)) + lzo_body)
+        monkeypatch.setitem(CODECS, 'lzo', Codec('lzo', lambda data, size: body, (ValueError,)))
+
+        info = {}
+        assert len(parse_gbx(str(path))['ghost_samples']) == 3
+        assert len(list(iter_ghost_samples(str(path), streaming=True, stream_info=info))) == 3
+        assert info['body_codec'] == 'lzo'
+
+        monkeypatch.delitem(CODECS, 'lzo')
+        stats = ParseStats()
+        parse_gbx(str(path), stats=stats)
+        assert stats.failures() == {reasons.LZO_MISSING: 1}
+        assert stats.files[0]['detail'].startswith('zlib: ')
+
@@ -0,0 +1,199 @@
+"""Tests for CSceneVehicleVis sample decoding."""
+
+import struct
+import zlib
+import pytest
+
+from tm_gbx import ghost
+from tm_gbx import stats as reasons
+from tm_gbx.ghost import (
+    SAMPLE_FIELDS, VEHICLE_VIS_STRUCT,
+    extract_record_data, extract_records, iter_record_samples,
+    parse_ghost_from_body, parse_record_data, parse_record_vehicles, parse_vehicle_vis_sample,
+)
+from tm_gbx.stats import ParseStats
+from tests.helpers import build_column_record, build_multi_record, build_record, make_samples
+
+
+class TestVehicleVisSample:
+    """Test the precompiled-struct scalar decoder."""
+
+    @pytest.fixture
+    def sample_data(self):
+        """A 107-byte sample with known raw values."""
+        data = bytearray(107)
+        struct.pack_into('<fff', data, 47, 1513.25, 2.0, 1063.5)
+        struct.pack_into('<h', data, 65, 3000)   # speed = exp(3)
+        data[14] = 255                           # full right steer
+        data[18] = 51                            # brake = 0.2
+        data[15] = 204                           # gas = 0.8 + brake
+        data[89] = 0x01 | 0x08 | 0x40            # ground contact, reactor up, boost 2
+        data[90] = 0x80                          # reactor steer left, pedal brake
+        return bytes(data)
+
+    def test_struct_covers_whole_sample(self):
+        """The precompiled layout spans exactly one 107-byte sample."""
+        assert VEHICLE_VIS_STRUCT.size == 107
+
+    def test_decodes_known_values(self, sample_data):
+        """Raw bytes are converted with the documented formulas."""
+        sample = parse_vehicle_vis_sample(1250, sample_data)
+
+        assert tuple(sample) == SAMPLE_FIELDS
+        assert sample['time_ms'] == 1250
+        assert sample['time_s'] == 1.25
+        assert (sample['x'], sample['y'], sample['z']) == (1513.25, 2.0, 1063.5)
+        assert sample['speed'] == pytest.approx(20.0855369)
+        assert sample['steer'] == 1.0
+        assert sample['brake'] == pytest.approx(0.2)
+        assert sample['gas'] == pytest.approx(1.0)
+        assert sample['is_ground_contact'] is True
+        assert sample['reactor_state'] == 2
+        assert sample['reactor_boost'] == 2
+        assert sample['reactor_pedal'] == -1
+        assert sample['reactor_steer'] == -1
+
+    def test_accepts_memoryview(self, sample_data):
+        """Decoding a memoryview gives the same result as decoding bytes."""
+        view = memoryview(b'\x00' * 10 + sample_data)[10:]
+
+        assert parse_vehicle_vis_sample(0, view) == parse_vehicle_vis_sample(0, sample_data)
+
+    def test_rejects_wrong_length(self, sample_data):
+        """Samples that are not 107 bytes are rejected."""
+        assert parse_vehicle_vis_sample(0, sample_data[:-1]) is None
+        assert parse_vehicle_vis_sample(0, sample_data + b'\x00') is None
+
+
+class TestRecordFraming:
+    """Test CPlugEntRecordData framing."""
+
+    def test_skips_descriptor_and_samples2_payloads(self):
+        """Descriptor and samples2 payloads are stepped over, samples decoded."""
+        data = bytes(range(107))
+        record = build_record([(0, data), (50, data)], b'\xaa' * 33, b'\xbb' * 1024)
+
+        result = parse_record_data(record, 10)
+
+        assert result['ghost_info']['num_samples'] == 2
+        assert result['ghost_info']['end_time'] == 1000
+        assert [s['time_ms'] for s in result['ghost_samples']] == [0, 50]
+        assert result['ghost_samples'][0] == parse_vehicle_vis_sample(0, data)
+
+    def test_truncated_record_from_body(self):
+        """A record cut short inside a sample payload parses to None."""
+        def body_for(record):
+            compressed = zlib.compress(record)
+            return struct.pack('<IIII', 0x0911F000, 10, len(record), len(compressed)) + compressed
+
+        record = build_record([(0, bytes(107))])
+
+        assert parse_ghost_from_body(body_for(record))['ghost_info']['num_samples'] == 1
+        assert parse_ghost_from_body(body_for(record[:-60])) is None
+
+    def test_sample_outside_entity_is_a_framing_error(self, monkeypatch):
+        """Events out of order raise ValueError, not UnboundLocalError."""
+        events = [(ghost._SAMPLE, 0, 0, 107), (ghost._ENTITY_END, 0, [])]
+        monkeypatch.setattr(ghost, '_iter_entity_events', lambda view, offset: iter(events))
+
+        with pytest.raises(ValueError):
+            ghost._read_entities(memoryview(b''), 0)
+
+    def test_iter_record_samples_streams_partial_record(self):
+        """Streaming yields the samples framed before a truncation point."""
+        samples = [(i * 50, bytes([i]) * 107) for i in range(5)]
+        record = build_record(samples)
+
+        assert list(iter_record_samples(record)) == parse_record_data(record, 10)['ghost_samples']
+        # Cut inside the fourth sample payload: the first three still come through
+        truncated = record[:len(record) - 4 - 2 * (9 + 107) + 50]
+        assert [s['time_ms'] for s in iter_record_samples(truncated)] == [0, 50, 100]
+
+
+class TestMultipleVehicles:
+    """Test decoding every vehicle entity of a record."""
+
+    def test_chained_entities(self):
+        """Entities after the first are reached through hasNext and decoded separately."""
+        first = [(i * 50, bytes([i]) * 107) for i in range(3)]
+        second = [(i * 50, bytes([i + 10]) * 107) for i in range(5)]
+        record = build_multi_record([(0, first), (1, [(0, b'x' * 20)]), (0, second)])
+
+        vehicles = parse_record_vehicles(record, 10)
+
+        assert [v['entity'] for v in vehicles] == [{'index': 0, 'type': 0}, {'index': 2, 'type': 0}]
+        assert [v['ghost_info']['num_samples'] for v in vehicles] == [3, 5]
+        assert vehicles[1]['ghost_samples'][4] == parse_vehicle_vis_sample(200, second[4][1])
+        assert parse_record_data(record, 10)['ghost_samples'] == vehicles[0]['ghost_samples']
+
+        columnar = parse_record_vehicles(record, 10, columnar=True, fields=['time_ms'], limit=1)
+        assert len(columnar) == 1 and list(columnar[0]['ghost_samples']['time_ms']) == [0, 50, 100]
+
+
+class TestColumnRecord:
+    """Test version 11 column-oriented, delta-encoded records."""
+
+    @pytest.fixture
+    def rows(self):
+        """116-byte rows: a vehicle sample followed by 9 extra bytes."""
+        return [data + bytes(range(i, i + 9)) for i, data in enumerate(make_samples(40, seed=11))]
+
+    def test_matches_row_decoding(self, rows):
+        """Samples rebuilt from the columns equal the first 107 bytes of each row."""
+        record = build_column_record(rows, start=1000, other_rows=[b'\x01\x02\x03\x04'] * 3)
+
+        result = parse_record_data(record, 11)
+
+        assert result['ghost_info']['num_samples'] == 40
+        assert result['ghost_samples'] == [
+            parse_vehicle_vis_sample(1000 + i * 50, row[:107]) for i, row in enumerate(rows)]
+
+    def test_python_fallback_matches_numpy(self, rows, monkeypatch):
+        """The pure-Python prefix sums give the same samples as NumPy."""
+        record = build_column_record(rows)
+        expected = parse_record_data(record, 11)['ghost_samples']
+
+        monkeypatch.setattr(ghost, 'np', None)
+
+        assert parse_record_data(record, 11)['ghost_samples'] == expected
+
+    def test_output_modes_and_streaming(self, rows):
+        """Columnar, lazy, trace and streaming output agree on v11 records."""
+        pytest.importorskip('numpy')
+        record = build_column_record(rows)
+        expected = parse_record_data(record, 11)['ghost_samples']
+
+        columns = parse_record_data(record, 11, columnar=True)['ghost_samples']
+        assert list(columns['time_ms']) == [s['time_ms'] for s in expected]
+        assert list(parse_record_data(record, 11, lazy=True)['ghost_samples']) == expected
+        assert len(parse_record_data(record, 11, trace=True)['ghost_samples']) == len(expected)
+        assert list(iter_record_samples(record, version=11)) == expected
+
+    def test_truncated_columns(self, rows):
+        """A record cut inside the column data parses to nothing."""
+        record = build_column_record(rows)[:-500]
+        compressed = zlib.compress(record)
+        body = struct.pack('<IIII', 0x0911F000, 11, len(record), len(compressed)) + compressed
+
+        assert parse_ghost_from_body(body) is None
+        assert list(iter_record_samples(record, version=11)) == []
+
+
+class TestRecordChunk:
+    """Test locating and inflating the record chunk."""
+
+    def chunk(self, record, compressed):
+        return struct.pack('<IIII', 0x0911F000, 11, len(record), len(compressed)) + compressed
+
+    def test_bad_checksum_is_rejected(self):
+        """A stream failing the adler32 check is corrupt, even if it inflates."""
+        record = bytes(range(256)) * 8
+        compressed = bytearray(zlib.compress(record))
+        compressed[-1] ^= 0xFF  # break the adler32 trailer
+        stats = ParseStats()
+        stats.begin_file('record')
+
+        assert extract_record_data(self.chunk(record, bytes(compressed))) is None
+        assert extract_records(self.chunk(record, bytes(compressed)), stats=stats) == []
+        assert stats.end_file()['failure'] == reasons.RECORD_CORRUPT
+        assert extract_record_data(self.chunk(record, zlib.compress(record))) == (11, record)
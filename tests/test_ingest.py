@@ -0,0 +1,100 @@
+"""Tests for incremental directory ingestion."""
+
+import json
+import os
+import shutil
+import pytest
+
+from tm_gbx.ingest import Manifest, hash_file, ingest_incremental, scan_directory
+from tests.helpers import build_ghost_gbx, make_samples
+
+
+@pytest.fixture
+def replay_dir(tmp_path):
+    root = tmp_path / "replays"
+    (root / "map_a").mkdir(parents=True)
+    for i in range(3):
+        (root / "map_a" / f"r{i}.Replay.Gbx").write_bytes(build_ghost_gbx(make_samples(4 + i, seed=i)))
+    return root
+
+
+def run(replay_dir, manifest_path, **kwargs):
+    return list(ingest_incremental(str(replay_dir), str(manifest_path), **kwargs))
+
+
+class TestIngestIncremental:
+    """Test ingest_incremental() and the manifest."""
+
+    def test_first_run_parses_everything(self, replay_dir, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        items = run(replay_dir, manifest_path)
+
+        assert [item.status for item in items] == ['new'] * 3
+        assert all(item.ok for item in items)
+        assert [item.result['ghost_info']['num_samples'] for item in items] == [4, 5, 6]
+
+        manifest = json.loads(manifest_path.read_text())
+        entry = manifest['files'][os.path.join('map_a', 'r0.Replay.Gbx')]
+        assert entry[0] == os.path.getsize(replay_dir / "map_a" / "r0.Replay.Gbx")
+        assert len(entry[2]) == 64
+
+    def test_unordered_results_match_their_files(self, replay_dir, tmp_path):
+        """With ordered=False each manifest entry still gets its own file's hash."""
+        manifest_path = tmp_path / "manifest.json"
+        items = run(replay_dir, manifest_path, workers=2, ordered=False)
+
+        manifest = Manifest(str(manifest_path))
+        for item in items:
+            name = os.path.relpath(item.path, str(replay_dir))
+            assert manifest.get(name).hash == item.content_hash == hash_file(item.path)
+            assert item.result['ghost_info']['num_samples'] == 4 + int(os.path.basename(name)[1])
+
+    def test_second_run_is_empty(self, replay_dir, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        run(replay_dir, manifest_path)
+
+        assert run(replay_dir, manifest_path) == []
+        delta = scan_directory(str(replay_dir), Manifest(str(manifest_path)))
+        assert delta.unchanged == 3
+
+    def test_delta_only(self, replay_dir, tmp_path):
+        """New and changed files are parsed; renames, copies and touches are not."""
+        manifest_path = tmp_path / "manifest.json"
+        run(replay_dir, manifest_path)
+
+        map_a = replay_dir / "map_a"
+        os.rename(map_a / "r0.Replay.Gbx", map_a / "renamed.Replay.Gbx")
+        shutil.copy(map_a / "r1.Replay.Gbx", replay_dir / "copy.Replay.Gbx")
+        os.utime(map_a / "r2.Replay.Gbx", (1, 1))
+        (map_a / "r1.Replay.Gbx").write_bytes(build_ghost_gbx(make_samples(9, seed=9)))
+        (replay_dir / "new.Replay.Gbx").write_bytes(build_ghost_gbx(make_samples(2, seed=5)))
+
+        items = run(replay_dir, manifest_path)
+
+        assert sorted((os.path.basename(item.path), item.status) for item in items) == [
+            ('new.Replay.Gbx', 'new'), ('r1.Replay.Gbx', 'changed')]
+        manifest = Manifest(str(manifest_path))
+        assert os.path.join('map_a', 'r0.Replay.Gbx') not in manifest
+        assert os.path.join('map_a', 'renamed.Replay.Gbx') in manifest
+        assert 'copy.Replay.Gbx' in manifest
+        assert run(replay_dir, manifest_path) == []
+
+    def test_failed_files_are_retried(self, replay_dir, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        (replay_dir / "bad.Gbx").write_bytes(b'garbage')
+
+        items = run(replay_dir, manifest_path, workers=2)
+        assert [os.path.basename(item.path) for item in items if not item.ok] == ['bad.Gbx']
+
+        retry = run(replay_dir, manifest_path)
+        assert [os.path.basename(item.path) for item in retry] == ['bad.Gbx']
+
+    def test_early_stop_records_processed_files(self, replay_dir, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        stream = ingest_incremental(str(replay_dir), str(manifest_path))
+        next(stream)
+        next(stream)
+        stream.close()
+
+        assert len(Manifest(str(manifest_path))) == 1
+        assert len(run(replay_dir, manifest_path)) == 2
@@ -1,8 +1,13 @@
 """Tests for GBX parser."""
 
 import os
+import struct
+import zlib
 import pytest
-from tm_gbx import parse_gbx
+import types
+from tm_gbx import parse_gbx, parse_gbx_ghosts, parse_gbx_header, iter_ghost_samples
+from tm_gbx import parser as parser_module
+from tests.helpers import NODE_END, build_ghost_gbx, build_multi_record, ghost_chunks
 
 
 class TestGBXParser:
@@ -161,5 +166,142 @@ class TestGBXParser:
                 assert field in sample, f"Missing field: {field}"
 
 
+class TestMmapInput:
+    """Test memory-mapped file input."""
+
+    @pytest.fixture
+    def ghost_file(self, tmp_path):
+        samples = [bytes((i + j) % 256 for j in range(107)) for i in range(40)]
+        path = tmp_path / "synthetic.Ghost.Gbx"
+        path.write_bytes(build_ghost_gbx(samples))
+        return str(path)
+
+    def test_mmap_matches_normal_read(self, ghost_file, monkeypatch):
+        """Parsing through mmap gives the same result as buffered reads."""
+        monkeypatch.setattr(parser_module, 'MMAP_MIN_SIZE', 0)
+
+        expected = parse_gbx(ghost_file)
+        result = parse_gbx(ghost_file, use_mmap=True)
+
+        assert expected['ghost_info']['num_samples'] == 40
+        assert result == expected
+
+    def test_small_file_falls_back_to_read(self, ghost_file, monkeypatch):
+        """Files below MMAP_MIN_SIZE are never mapped."""
+        def fail(*args, **kwargs):
+            raise AssertionError("mmap should not be used for small files")
+
+        monkeypatch.setattr(parser_module.mmap, 'mmap', fail)
+
+        assert parse_gbx(ghost_file, use_mmap=True)['ghost_info']['num_samples'] == 40
+
+    def test_mmap_real_files_metadata(self):
+        """Header metadata is identical with and without mmap on the real replays."""
+        test_files_dir = os.path.dirname(__file__)
+        for name in sorted(os.listdir(test_files_dir)):
+            if not name.lower().endswith('.gbx'):
+                continue
+            filepath = os.path.join(test_files_dir, name)
+
+            assert parse_gbx(filepath, use_mmap=True) == parse_gbx(filepath)
+
+
+class TestHeaderOnly:
+    """Test the header-only fast path."""
+
+    def test_header_matches_full_parse(self):
+        """parse_gbx_header returns the same metadata as a full parse."""
+        filepath = os.path.join(os.path.dirname(__file__), "Ville (Best).Gbx")
+        if not os.path.exists(filepath):
+            pytest.skip(f"Test file not found: {filepath}")
+
+        header = parse_gbx_header(filepath)
+
+        assert header['class_id'] == 0x03093000
+        assert header['metadata'] == parse_gbx(filepath)['metadata']
+        assert parse_gbx(filepath, body=False) == {
+            'metadata': header['metadata'],
+            'ghost_info': None,
+            'ghost_samples': []
+        }
+
+    def test_body_is_never_read(self, tmp_path):
+        """A corrupt body does not matter when only the header is parsed."""
+        data = build_ghost_gbx([bytes(107)] * 3)
+        path = tmp_path / "corrupt.Ghost.Gbx"
+        path.write_bytes(data[:29] + b'\xde\xad' * 100)
+
+        assert parse_gbx_header(str(path))['num_nodes'] == 2
+        assert parse_gbx(str(path), body=False)['ghost_samples'] == []
+
+    def test_rejects_non_gbx(self, tmp_path):
+        """Files without the GBX magic are rejected immediately."""
+        path = tmp_path / "not_a_replay.Gbx"
+        path.write_bytes(b'PK\x03\x04' + b'\x00' * 64)
+
+        with pytest.raises(ValueError, match="magic"):
+            parse_gbx_header(str(path))
+
+    def test_rejects_unexpected_class(self, tmp_path):
+        """GBX files of other node classes (e.g. maps) are rejected from the prefix."""
+        path = tmp_path / "map.Map.Gbx"
+        path.write_bytes(build_ghost_gbx([], class_id=0x03043000))
+
+        with pytest.raises(ValueError, match="0x03043000"):
+            parse_gbx_header(str(path))
+
+
+class TestStreaming:
+    """Test the iter_ghost_samples generator API."""
+
+    def test_matches_parse_gbx(self, tmp_path):
+        """Streaming yields exactly the samples parse_gbx returns."""
+        samples = [bytes((i * 3 + j) % 256 for j in range(107)) for i in range(25)]
+        path = tmp_path / "stream.Ghost.Gbx"
+        path.write_bytes(build_ghost_gbx(samples))
+
+        stream = iter_ghost_samples(str(path))
+
+        assert isinstance(stream, types.GeneratorType)
+        assert list(stream) == parse_gbx(str(path))['ghost_samples']
+
+    def test_undecodable_body_yields_nothing(self):
+        """Files whose body can't be decoded produce an empty stream."""
+        filepath = os.path.join(os.path.dirname(__file__), "Jon (Best).Gbx")
+        if not os.path.exists(filepath):
+            pytest.skip(f"Test file not found: {filepath}")
+        if parse_gbx(filepath)['ghost_samples']:
+            pytest.skip("Body is decodable in this environment")
+
+        assert list(iter_ghost_samples(filepath)) == []
+
+
+class TestAllGhosts:
+    """Test the parse_gbx_ghosts multi-ghost API."""
+
+    def test_every_ghost_with_player(self, tmp_path):
+        """Each ghost node's vehicles come back with that ghost's player info."""
+        first = build_multi_record([(0, [(0, bytes(107))]), (0, [(0, bytes(107)), (50, bytes(107))])])
+        second = build_multi_record([(1, []), (0, [(i * 50, bytes(107)) for i in range(4)])])
+        body = struct.pack('<IIIiI', 0x03093014, 10, 2, 1, 0x03092000)
+        body += ghost_chunks(first, node_index=2, nickname=b'First') + NODE_END
+        body += struct.pack('<iI', 3, 0x03092000)
+        body += ghost_chunks(second, node_index=4, nickname=b'Second', first_id=False) + NODE_END
+        body += struct.pack('<II', 0, 0) + NODE_END
+        compressed = zlib.compress(body)
+        header = b'GBX' + struct.pack('<H', 6) + b'BUCR' + struct.pack('<III', 0x03093000, 0, 2)
+        path = tmp_path / "two.Replay.Gbx"
+        path.write_bytes(header + struct.pack('<iII', 0, len(body), len(compressed)) + compressed)
+
+        result = parse_gbx_ghosts(str(path))
+        ghosts = result['ghosts']
+
+        assert [(g['entity']['record'], g['entity']['index']) for g in ghosts] == [(0, 0), (0, 1), (1, 1)]
+        assert [g['player']['nickname'] for g in ghosts] == ['First', 'First', 'Second']
+        assert ghosts[2]['player']['trigram'] == 'PLA'
+        assert [g['ghost_info']['num_samples'] for g in ghosts] == [1, 2, 4]
+        assert parse_gbx(str(path))['ghost_samples'] == ghosts[0]['ghost_samples']
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,92 @@
+"""Tests for sample field projection."""
+
+import pytest
+
+from tm_gbx import parse_gbx, iter_ghost_samples
+from tm_gbx.ghost import SAMPLE_FIELDS, parse_vehicle_vis_sample
+from tm_gbx.projection import FIELD_DEPENDENCIES, make_sample_decoder
+from tests.helpers import build_ghost_gbx, make_samples
+
+
+class TestSampleDecoder:
+    """Test projected decoders against the full scalar decoder."""
+
+    def test_every_field_matches_full_decoder(self):
+        """Each single-field decoder gives exactly the full decoder's value."""
+        for i, data in enumerate(make_samples(200)):
+            expected = parse_vehicle_vis_sample(i * 50, data)
+            for field in SAMPLE_FIELDS:
+                assert make_sample_decoder([field])(i * 50, data) == {field: expected[field]}
+
+    def test_all_fields_in_requested_order(self):
+        """Samples contain the requested fields, in order, without duplicates."""
+        data = make_samples(1)[0]
+        decode = make_sample_decoder(['yaw_deg', 'x', 'gas', 'x'])
+        sample = decode(100, data)
+        expected = parse_vehicle_vis_sample(100, data)
+
+        assert list(sample) == ['yaw_deg', 'x', 'gas']
+        assert sample == {name: expected[name] for name in sample}
+        assert make_sample_decoder(SAMPLE_FIELDS)(100, data) == expected
+
+    def test_none_means_full_decoder(self):
+        assert make_sample_decoder(None) is parse_vehicle_vis_sample
+
+    def test_wrong_length(self):
+        assert make_sample_decoder(['x'])(0, b'\x00' * 50) is None
+
+    def test_dependencies(self):
+        """Dependencies list the raw values a field is computed from."""
+        assert FIELD_DEPENDENCIES['yaw_deg'] == ('angle_raw', 'axis_heading_raw', 'axis_pitch_raw')
+        assert FIELD_DEPENDENCIES['x'] == ('x',)
+        assert FIELD_DEPENDENCIES['gas'] == ('gas_raw', 'brake_raw')
+        assert FIELD_DEPENDENCIES['time_s'] == ()
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError, match="'speed_kmh'"):
+            make_sample_decoder(['x', 'speed_kmh'])
+
+
+class TestParseGbxFields:
+    """Test the fields= argument of the parser entry points."""
+
+    @pytest.fixture
+    def ghost_file(self, tmp_path):
+        path = tmp_path / "projection.Ghost.Gbx"
+        path.write_bytes(build_ghost_gbx(make_samples(30)))
+        return str(path)
+
+    def test_parse_gbx_fields(self, ghost_file):
+        """Projected samples are the matching subset of the full samples."""
+        fields = ['time_ms', 'x', 'y', 'z']
+        full = parse_gbx(ghost_file)['ghost_samples']
+        result = parse_gbx(ghost_file, fields=fields)
+
+        assert result['ghost_info']['num_samples'] == 30
+        assert result['ghost_samples'] == [{f: s[f] for f in fields} for s in full]
+
+    def test_lazy_and_streaming_fields(self, ghost_file):
+        expected = parse_gbx(ghost_file, fields=['speed'])['ghost_samples']
+
+        assert parse_gbx(ghost_file, lazy=True, fields=['speed'])['ghost_samples'].materialize() == expected
+        assert list(iter_ghost_samples(ghost_file, fields=['speed'])) == expected
+
+    def test_columnar_fields(self, ghost_file):
+        pytest.importorskip("numpy")
+
+        columns = parse_gbx(ghost_file, columnar=True, fields=['x', 'speed'])['ghost_samples']
+
+        assert list(columns) == ['x', 'speed']
+
+    def test_unknown_field_raises_before_reading(self, tmp_path):
+        """Unknown names are reported even if the file would never be opened."""
+        with pytest.raises(ValueError, match="Unknown ghost sample field"):
+            parse_gbx(str(tmp_path / "missing.Gbx"), fields=['nope'])
+
+    def test_empty_field_list_raises(self, ghost_file):
+        """An empty selection is an error in every output mode, not a silent 0 or 52 fields."""
+        for kwargs in ({}, {'columnar': True}, {'lazy': True}, {'trace': True}):
+            with pytest.raises(ValueError, match="No ghost sample fields"):
+                parse_gbx(ghost_file, fields=[], **kwargs)
+        with pytest.raises(ValueError, match="No ghost sample fields"):
+            list(iter_ghost_samples(ghost_file, fields=()))
@@ -0,0 +1,92 @@
+"""Tests for the lazy GhostSamples sequence."""
+
+import struct
+import pytest
+
+from tm_gbx import GhostSamples, parse_gbx
+from tm_gbx import samples as samples_module
+from tm_gbx.ghost import parse_vehicle_vis_sample
+from tests.helpers import build_ghost_gbx
+
+
+def make_payloads(count):
+    """Distinct 107-byte samples with increasing x positions."""
+    payloads = []
+    for i in range(count):
+        data = bytearray((i * 7 + j) % 256 for j in range(107))
+        struct.pack_into('<fff', data, 47, float(i), 2.0, 3.0)
+        payloads.append(bytes(data))
+    return payloads
+
+
+class TestGhostSamples:
+    """Test lazy decoding, slicing and caching."""
+
+    @pytest.fixture
+    def payloads(self):
+        return make_payloads(30)
+
+    @pytest.fixture
+    def lazy(self, payloads):
+        buffer = b''.join(payloads)
+        refs = [(i * 50, i * 107, 107) for i in range(len(payloads))]
+        return GhostSamples(buffer, refs, cache_size=4)
+
+    def test_sequence_protocol(self, lazy, payloads):
+        """len, indexing, negative indexing and iteration match eager decoding."""
+        eager = [parse_vehicle_vis_sample(i * 50, p) for i, p in enumerate(payloads)]
+
+        assert len(lazy) == 30
+        assert lazy[0] == eager[0]
+        assert lazy[-1] == eager[-1]
+        assert list(lazy) == eager
+        assert lazy.materialize() == eager
+        assert lazy.times() == [s['time_ms'] for s in eager]
+
+        with pytest.raises(IndexError):
+            lazy[30]
+
+    def test_slicing_is_lazy(self, lazy):
+        """Slices are GhostSamples over the same buffer."""
+        part = lazy[10:20:2]
+
+        assert isinstance(part, GhostSamples)
+        assert [s['x'] for s in part] == [10.0, 12.0, 14.0, 16.0, 18.0]
+
+    def test_decodes_only_touched_samples(self, lazy, monkeypatch):
+        """Only accessed samples are decoded and repeat hits come from the cache."""
+        calls = []
+        original = samples_module.parse_vehicle_vis_sample
+
+        def counting(time_ms, data):
+            calls.append(time_ms)
+            return original(time_ms, data)
+
+        monkeypatch.setattr(samples_module, 'parse_vehicle_vis_sample', counting)
+
+        lazy[5]
+        lazy[5]
+        lazy[7]
+
+        assert calls == [250, 350]
+
+    def test_cache_is_bounded(self, lazy):
+        """The decoded-sample cache never grows past cache_size."""
+        for i in range(len(lazy)):
+            lazy[i]
+
+        assert len(lazy._cache) == 4
+
+    def test_parse_gbx_lazy(self, tmp_path, payloads):
+        """parse_gbx(lazy=True) returns a GhostSamples equal to the eager list."""
+        path = tmp_path / "lazy.Ghost.Gbx"
+        path.write_bytes(build_ghost_gbx(payloads))
+
+        result = parse_gbx(str(path), lazy=True)
+
+        assert isinstance(result['ghost_samples'], GhostSamples)
+        assert result['ghost_info']['num_samples'] == 30
+        assert result['ghost_samples'].materialize() == parse_gbx(str(path))['ghost_samples']
+
+        with pytest.raises(ValueError):
+            parse_gbx(str(path), lazy=True, columnar=True)
@@ -0,0 +1,117 @@
+"""Tests for per-stage parse instrumentation and failure reasons."""
+
+import struct
+
+import pytest
+
+from tm_gbx import parse_gbx, parse_gbx_bytes, parse_many
+from tm_gbx import stats as reasons
+from tm_gbx.compression import CODECS
+from tm_gbx.stats import ParseStats
+from tests.helpers import build_ghost_gbx, make_samples
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestParseStats:
+    """Test the stats recorded by parse_gbx."""
+
+    def test_stages_and_samples(self, tmp_path):
+        """Every stage of a good file is timed and its samples counted."""
+        path = write(tmp_path, "good.Ghost.Gbx", build_ghost_gbx(make_samples(20)))
+        stats = ParseStats()
+
+        result = parse_gbx(path, stats=stats)
+
+        assert len(result['ghost_samples']) == 20
+        entry, = stats.files
+        assert entry['path'] == path and entry['samples'] == 20 and entry['failure'] is None
+        assert set(stats.stages) == {'parse_header', 'ref_table', 'decompress_body', 'record_search',
+                                     'record_inflate', 'framing', 'sample_decode'}
+        assert stats.stages['sample_decode']['bytes_in'] == 20 * 107
+        assert stats.stages['decompress_body']['bytes_in'] and stats.stages['record_inflate']['bytes_out']
+        assert entry['seconds'] >= sum(entry['stages'].values())
+
+    def test_bad_sample_length(self, tmp_path):
+        """Samples that aren't 107 bytes are skipped and named as the failure."""
+        path = write(tmp_path, "short.Ghost.Gbx", build_ghost_gbx([bytes(100)] * 5))
+        stats = ParseStats()
+
+        assert len(parse_gbx(path, stats=stats, columnar=True)['ghost_samples']['time_ms']) == 0
+
+        entry, = stats.files
+        assert entry['failure'] == reasons.BAD_SAMPLE_LENGTH and '100' in entry['detail']
+        assert entry['skipped_samples'] == 5 and stats.skipped_samples == 5
+
+    def test_partly_skipped_samples_are_not_a_failure(self, tmp_path):
+        path = write(tmp_path, "mixed.Ghost.Gbx", build_ghost_gbx(make_samples(3) + [bytes(100)]))
+        stats = ParseStats()
+
+        parse_gbx(path, stats=stats, lazy=True)
+
+        assert stats.failed() == [] and (stats.samples, stats.skipped_samples) == (3, 1)
+
+    def test_unsupported_record_version(self, tmp_path):
+        path = write(tmp_path, "v20.Ghost.Gbx", build_ghost_gbx(make_samples(3), record_version=20))
+        stats = ParseStats()
+
+        parse_gbx(path, stats=stats)
+
+        assert stats.failures() == {reasons.UNSUPPORTED_RECORD_VERSION: 1}
+        assert stats.files[0]['detail'] == "record version 20"
+        assert stats.unparseable() == [path]
+
+    def test_lzo_missing_is_retryable(self, monkeypatch):
+        """An LZO body without python-lzo fails for a reason retrying can fix."""
+        monkeypatch.delitem(CODECS, 'lzo', raising=False)
+        body = bytes(64)
+        data = (b'GBX' + struct.pack('<H', 6) + b'BUCR' + struct.pack('<III', 0x03093000, 0, 2)
+                + struct.pack('<iII', 0, 256, len(body)) + body)
+        stats = ParseStats()
+
+        parse_gbx_bytes(data, stats=stats, name='replay')
+
+        assert stats.files[0]['path'] == 'replay'
+        assert stats.failures() == {reasons.LZO_MISSING: 1}
+        assert stats.unparseable() == []
+
+    def test_invalid_header_is_recorded_and_raised(self, tmp_path):
+        path = write(tmp_path, "junk.Gbx", b'junk' * 10)
+        stats = ParseStats()
+
+        with pytest.raises(ValueError):
+            parse_gbx(path, stats=stats)
+
+        assert stats.failures() == {reasons.INVALID_HEADER: 1}
+
+
+class TestBatchStats:
+    """Test stats aggregated over parse_many batches."""
+
+    def test_batches_merge_into_one(self, tmp_path):
+        good = write(tmp_path, "good.Ghost.Gbx", build_ghost_gbx(make_samples(10)))
+        junk = write(tmp_path, "junk.Gbx", b'junk' * 10)
+        stats = ParseStats()
+
+        for paths in ([good, junk], [good]):
+            assert len(list(parse_many(paths, workers=1, stats=stats))) == len(paths)
+
+        summary = stats.summary()
+        assert (summary['files'], summary['failed'], summary['samples']) == (3, 1, 20)
+        assert summary['stages']['framing']['calls'] == 2
+        assert stats.unparseable() == [junk]
+        assert [entry['path'] for entry in stats.hot_files(2, stage='sample_decode')] == [good, good]
+
+    def test_worker_stats_are_merged(self, tmp_path):
+        paths = [write(tmp_path, f"{i}.Ghost.Gbx", build_ghost_gbx(make_samples(5))) for i in range(3)]
+        stats = ParseStats()
+
+        items = list(parse_many(paths, workers=2, stats=stats))
+
+        assert all(item.ok for item in items)
+        assert sorted(entry['path'] for entry in stats.files) == paths
+        assert stats.samples == 15
@@ -0,0 +1,95 @@
+"""Tests for the memory-mapped columnar telemetry store."""
+
+import os
+
+import pytest
+
+from tm_gbx import parse_gbx
+from tm_gbx.store import StoreWriter, TelemetryStore, write_store
+from tm_gbx.synthetic import make_spec, write_gbx
+
+
+@pytest.fixture
+def replay(tmp_path):
+    spec = make_spec("store.Replay.Gbx", seed=7, duration_s=10)
+    path = str(tmp_path / spec.name)
+    write_gbx(path, spec)
+    return path
+
+
+class TestStore:
+    """Test writing parse results and reading them back."""
+
+    def test_round_trip_every_output_mode(self, replay, tmp_path):
+        """List, trace and columnar results store the same channels."""
+        path = str(tmp_path / "ghosts.tmcol")
+        expected = parse_gbx(replay, trace=True)
+        write_store(path, [('list', parse_gbx(replay)), ('trace', expected),
+                           ('columnar', parse_gbx(replay, columnar=True))])
+
+        with TelemetryStore(path) as store:
+            assert store.names() == ['list', 'trace', 'columnar']
+            for ghost in store:
+                assert ghost.num_samples == len(expected['ghost_samples'])
+                assert ghost.metadata == expected['metadata']
+                assert ghost.ghost_info == expected['ghost_info']
+                assert ghost.to_trace() == expected['ghost_samples']
+
+    def test_channels_are_views_of_the_file(self, replay, tmp_path):
+        """memoryview and NumPy channels read the mapping without copying."""
+        np = pytest.importorskip('numpy')
+        path = str(tmp_path / "ghosts.tmcol")
+        trace = parse_gbx(replay, trace=True)['ghost_samples']
+        write_store(path, [{'ghost_samples': trace}])
+
+        store = TelemetryStore(path)
+        ghost = store[0]
+        speed = ghost.numpy('speed')
+        time_ms = ghost.channel('time_ms')
+
+        assert speed.dtype == np.float32 and not speed.flags.owndata and not speed.flags.writeable
+        assert np.array_equal(speed, np.asarray(trace['speed']))
+        assert ghost.numpy('is_turbo').dtype == bool
+        assert time_ms.format == 'i' and time_ms.tolist() == trace['time_ms'].tolist()
+        # Views outlive the store
+        store.close()
+        assert speed[0] == trace['speed'][0] and time_ms[-1] == trace['time_ms'][-1]
+
+    def test_projected_fields_and_empty_ghosts(self, replay, tmp_path):
+        """Only parsed channels are stored; ghosts without samples have none."""
+        path = str(tmp_path / "ghosts.tmcol")
+        with StoreWriter(path) as writer:
+            writer.add(parse_gbx(replay, fields=['x', 'speed']), name='projected')
+            writer.add({'metadata': {}, 'ghost_info': None, 'ghost_samples': []}, name='empty')
+
+        with TelemetryStore(path) as store:
+            assert store.find('projected').fields == ('x', 'speed')
+            assert 'y' not in store.find('projected')
+            assert len(store.find('empty')) == 0 and store.find('empty').fields == ()
+            assert store.find('missing') is None
+
+    def test_failed_write_leaves_no_file(self, replay, tmp_path):
+        """An exception inside the writer discards the partial store."""
+        path = tmp_path / "ghosts.tmcol"
+        with pytest.raises(RuntimeError):
+            with StoreWriter(str(path)) as writer:
+                writer.add(parse_gbx(replay))
+                raise RuntimeError
+
+        assert list(tmp_path.iterdir()) == [tmp_path / "store.Replay.Gbx"]
+
+    def test_store_gets_umask_mode(self, replay, tmp_path):
+        """The store is readable like any new file, not mode 0600 from the temp file."""
+        path = tmp_path / "ghosts.tmcol"
+        old_umask = os.umask(0o022)
+        try:
+            write_store(str(path), [parse_gbx(replay)])
+        finally:
+            os.umask(old_umask)
+
+        assert path.stat().st_mode & 0o777 == 0o644
+
+    def test_rejects_other_files(self, replay):
+        """Files without the store magic are refused."""
+        with pytest.raises(ValueError):
+            TelemetryStore(replay)
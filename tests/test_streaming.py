@@ -0,0 +1,108 @@
+"""Tests for bounded-memory streaming decompression."""
+
+import io
+import os
+import struct
+import zlib
+import pytest
+
+from tm_gbx import iter_ghost_samples, parse_gbx
+from tm_gbx.ghost import iter_record_samples
+from tm_gbx.streaming import InflateReader, iter_stream_record_samples
+from tests.helpers import build_column_record, build_multi_record, make_samples, replay_body
+
+
+def build_replay_gbx(record):
+    """Build a zlib-bodied replay GBX file whose ghost references record."""
+    body = replay_body(record, map_data=os.urandom(200000))
+    compressed = zlib.compress(body)
+    header = b'GBX' + struct.pack('<H', 6) + b'BUCR' + struct.pack('<III', 0x03093000, 0, 2)
+    return header + struct.pack('<iII', 0, len(body), len(compressed)) + compressed
+
+
+class TestInflateReader:
+    """Test the incrementally inflating file object."""
+
+    def test_reads_and_seeks_like_bytesio(self):
+        """Reads, forward seeks and short backward seeks match the inflated stream."""
+        data = os.urandom(5000) * 20
+        reader = InflateReader(io.BytesIO(zlib.compress(data)), len(zlib.compress(data)), chunk_size=1024)
+        expected = io.BytesIO(data)
+
+        for size, skip in ((10, 0), (3000, 7), (4, -4), (1, 20000), (500, 0)):
+            reader.seek(skip, io.SEEK_CUR)
+            expected.seek(skip, io.SEEK_CUR)
+            assert reader.read(size) == expected.read(size)
+            assert reader.tell() == expected.tell()
+        # Buffered: at most the largest read plus a chunk of output and of input
+        assert reader.meter.peak <= 3000 + 2 * 1024
+
+        assert reader.read() == expected.read()
+        assert reader.eof and reader.read(1) == b''
+        assert reader.inflated_bytes == len(data)
+
+    def test_rejects_seek_behind_buffer(self):
+        """Data that has been dropped can't be seeked back to."""
+        data = os.urandom(10000)
+        reader = InflateReader(io.BytesIO(zlib.compress(data)), len(zlib.compress(data)), chunk_size=256)
+        reader.read(5000)
+        reader.read(2000)
+
+        with pytest.raises(io.UnsupportedOperation):
+            reader.seek(0)
+
+
+class TestStreamingSamples:
+    """Test iter_ghost_samples(streaming=True)."""
+
+    def test_matches_buffered_iteration(self, tmp_path):
+        """Streaming yields the same samples with a fraction of the record inflated."""
+        vehicle = [(i * 50, data) for i, data in enumerate(make_samples(2000))]
+        other = [(i * 50, os.urandom(400)) for i in range(1000)]
+        record = build_multi_record([(0, vehicle), (1, other)])
+        path = tmp_path / "long.Replay.Gbx"
+        path.write_bytes(build_replay_gbx(record))
+
+        info = {}
+        samples = list(iter_ghost_samples(str(path), streaming=True, stream_info=info))
+
+        assert samples == list(iter_ghost_samples(str(path)))
+        assert info['body_codec'] == 'zlib' and info['samples'] == 2000
+        # Decompression stopped at the end of the vehicle entity
+        assert info['record_bytes'] < len(record) - 300000
+        assert info['peak_buffer_bytes'] < 300000
+
+    def test_truncated_stream_ends_iteration(self, tmp_path):
+        """A body cut short ends the stream after the samples read so far."""
+        record = build_multi_record([(0, [(i * 50, data) for i, data in enumerate(make_samples(50))])])
+        data = build_replay_gbx(record)
+        path = tmp_path / "cut.Replay.Gbx"
+        path.write_bytes(data[:-100])
+
+        info = {}
+        samples = list(iter_ghost_samples(str(path), streaming=True, stream_info=info))
+
+        assert len(samples) < 50 and info['samples'] == len(samples)
+
+    def test_unknown_chunk_matches_buffered_parse(self, tmp_path):
+        """A body the walk can't get through yields nothing, streamed or not."""
+        record = build_multi_record([(0, [(i * 50, data) for i, data in enumerate(make_samples(5))])])
+        body = struct.pack('<II', 0x03093099, 0) + replay_body(record)
+        compressed = zlib.compress(body)
+        header = b'GBX' + struct.pack('<H', 6) + b'BUCR' + struct.pack('<III', 0x03093000, 0, 2)
+        path = tmp_path / "unknown.Replay.Gbx"
+        path.write_bytes(header + struct.pack('<iII', 0, len(body), len(compressed)) + compressed)
+
+        assert parse_gbx(str(path))['ghost_samples'] == []
+        assert list(iter_ghost_samples(str(path))) == []
+        assert list(iter_ghost_samples(str(path), streaming=True)) == []
+
+    def test_column_record(self):
+        """Version 11 entities are rebuilt one at a time from the stream."""
+        rows = [data + bytes(9) for data in make_samples(30)]
+        record = build_column_record(rows, other_rows=[b'\x01\x02\x03\x04'] * 10)
+        compressed = zlib.compress(record)
+
+        stream = iter_stream_record_samples(InflateReader(io.BytesIO(compressed), len(compressed)), 11)
+
+        assert list(stream) == list(iter_record_samples(record, version=11))
@@ -0,0 +1,73 @@
+"""Tests for the array-backed GhostTrace."""
+
+import math
+import pickle
+import pytest
+
+from tm_gbx import GhostTrace, parse_gbx, iter_ghost_samples
+from tests.helpers import build_ghost_gbx, make_samples
+
+
+@pytest.fixture
+def ghost_file(tmp_path):
+    path = tmp_path / "trace.Ghost.Gbx"
+    path.write_bytes(build_ghost_gbx(make_samples(40)))
+    return str(path)
+
+
+def assert_rows_close(row, expected):
+    assert list(row) == list(expected)
+    for name, value in expected.items():
+        if isinstance(value, float):
+            assert math.isclose(row[name], value, rel_tol=1e-6, abs_tol=1e-4), name
+        else:
+            assert row[name] == value and type(row[name]) is type(value), name
+
+
+class TestGhostTrace:
+    """Test GhostTrace storage and row access."""
+
+    def test_parse_gbx_trace(self, ghost_file):
+        """Rows match the list-of-dicts output within float32 precision."""
+        expected = parse_gbx(ghost_file)['ghost_samples']
+        trace = parse_gbx(ghost_file, trace=True)['ghost_samples']
+
+        assert isinstance(trace, GhostTrace)
+        assert len(trace) == 40
+        for row, sample in zip(trace, expected):
+            assert_rows_close(row, sample)
+        assert_rows_close(trace[-1], expected[-1])
+
+    def test_channels(self, ghost_file):
+        trace = parse_gbx(ghost_file, trace=True)['ghost_samples']
+
+        assert trace['time_ms'].typecode == 'i'
+        assert trace['x'].typecode == 'f'
+        assert trace['fl_ground_mat'].typecode == 'B'
+        assert list(trace['time_ms']) == [i * 50 for i in range(40)]
+        assert trace.nbytes < 40 * 52 * 4
+        with pytest.raises(KeyError):
+            trace['nope']
+
+    def test_slots(self):
+        with pytest.raises(AttributeError):
+            GhostTrace().extra = 1
+
+    def test_fields_and_slicing(self, ghost_file):
+        trace = parse_gbx(ghost_file, trace=True, fields=['time_ms', 'is_turbo'])['ghost_samples']
+
+        assert trace.fields == ('time_ms', 'is_turbo')
+        part = trace[10:12]
+        assert len(part) == 2
+        assert part[0]['time_ms'] == 500
+        assert isinstance(part[0]['is_turbo'], bool)
+
+    def test_from_samples_and_pickle(self, ghost_file):
+        trace = GhostTrace.from_samples(iter_ghost_samples(ghost_file))
+
+        assert trace == parse_gbx(ghost_file, trace=True)['ghost_samples']
+        assert pickle.loads(pickle.dumps(trace)) == trace
+
+    def test_mutually_exclusive(self, ghost_file):
+        with pytest.raises(ValueError):
+            parse_gbx(ghost_file, trace=True, lazy=True)
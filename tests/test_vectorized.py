@@ -0,0 +1,117 @@
+"""Tests for the vectorized NumPy sample decoder."""
+
+import math
+import random
+import struct
+import pytest
+
+from tm_gbx.ghost import SAMPLE_FIELDS, parse_vehicle_vis_sample, parse_record_data
+
+np = pytest.importorskip("numpy")
+
+from tm_gbx.vectorized import decode_vehicle_vis_samples
+
+
+def make_sample(rng):
+    """Build a random 107-byte CSceneVehicleVis sample with sane floats."""
+    data = bytearray(rng.getrandbits(8) for _ in range(107))
+    struct.pack_into('<fff', data, 47, *(rng.uniform(-2000, 2000) for _ in range(3)))
+    return bytes(data)
+
+
+def pack_samples(samples, gap=9):
+    """Lay sample payloads out in one buffer; return (buffer, sample references)."""
+    buffer = bytearray()
+    refs = []
+    for sample in samples:
+        buffer += b'\x00' * gap
+        refs.append((sample['time_ms'], len(buffer), len(sample['data'])))
+        buffer += sample['data']
+    return bytes(buffer), refs
+
+
+def make_record(samples):
+    """Build a minimal CPlugEntRecordData record with one vehicle entity."""
+    out = struct.pack('<ii', 0, samples[-1]['time_ms'] if samples else 0)
+    out += struct.pack('<I', 0)  # no entity descriptors
+    out += struct.pack('<I', 0)  # no notices
+    out += struct.pack('<B', 1) + struct.pack('<iiiii', 0x0A018000, 0, 0, 0, 0)
+    for sample in samples:
+        out += struct.pack('<BiI', 1, sample['time_ms'], len(sample['data'])) + sample['data']
+    out += struct.pack('<BBB', 0, 0, 0)  # end samples, hasNext, end samples2
+    out += struct.pack('<B', 0)  # end entities
+    return out
+
+
+class TestVectorizedDecoder:
+    """Test the NumPy batch decoder against the scalar decoder."""
+
+    @pytest.fixture
+    def samples(self):
+        rng = random.Random(1234)
+        samples = [{'time_ms': i * 50, 'data': make_sample(rng)} for i in range(500)]
+        # Edge values: pitch singularity and extreme raw bytes
+        edge = bytearray(107)
+        struct.pack_into('<Hhh', edge, 59, 32767, 0, 32767)
+        samples.append({'time_ms': 25000, 'data': bytes(edge)})
+        samples.append({'time_ms': 25050, 'data': b'\xff' * 47 + struct.pack('<fff', 1, 2, 3) + b'\xff' * 48})
+        return samples
+
+    def test_matches_scalar_decoder(self, samples):
+        """Every column matches the scalar decoder within float tolerance."""
+        buffer, refs = pack_samples(samples)
+        columns = decode_vehicle_vis_samples(buffer, refs)
+
+        assert list(columns) == list(SAMPLE_FIELDS)
+
+        for i, sample in enumerate(samples):
+            expected = parse_vehicle_vis_sample(sample['time_ms'], sample['data'])
+            for field in SAMPLE_FIELDS:
+                value = columns[field][i]
+                if isinstance(expected[field], float):
+                    assert math.isclose(value, expected[field], rel_tol=1e-9, abs_tol=1e-9), field
+                else:
+                    assert value == expected[field], field
+
+    def test_skips_wrong_sample_length(self, samples):
+        """Samples that are not 107 bytes are dropped like in the scalar path."""
+        short = {'time_ms': 12345, 'data': b'\x00' * 50}
+        buffer, refs = pack_samples(samples[:10] + [short] + samples[10:])
+        columns = decode_vehicle_vis_samples(buffer, refs)
+
+        assert len(columns['time_ms']) == len(samples)
+        assert 12345 not in columns['time_ms']
+        assert np.array_equal(columns['time_ms'], [s['time_ms'] for s in samples])
+
+    def test_parse_record_data_columnar(self, samples):
+        """parse_record_data(columnar=True) returns arrays matching the list path."""
+        record = make_record(samples)
+
+        rows = parse_record_data(record, 10)
+        cols = parse_record_data(record, 10, columnar=True)
+
+        assert cols['ghost_info']['num_samples'] == rows['ghost_info']['num_samples'] == len(samples)
+        assert np.allclose(cols['ghost_samples']['speed'], [s['speed'] for s in rows['ghost_samples']])
+        assert np.array_equal(cols['ghost_samples']['time_ms'], [s['time_ms'] for s in rows['ghost_samples']])
+
+    def test_projection_computes_only_requested_columns(self, samples, monkeypatch):
+        """fields= returns those columns in order, without the unneeded trigonometry."""
+        buffer, refs = pack_samples(samples)
+        full = decode_vehicle_vis_samples(buffer, refs)
+
+        def no_trig(*args, **kwargs):
+            raise AssertionError("trigonometry computed for position columns")
+        monkeypatch.setattr(np, 'sin', no_trig)
+        monkeypatch.setattr(np, 'cos', no_trig)
+        columns = decode_vehicle_vis_samples(buffer, refs, ['z', 'time_ms', 'x', 'gas'])
+
+        assert list(columns) == ['z', 'time_ms', 'x', 'gas']
+        for field in columns:
+            assert np.array_equal(columns[field], full[field]), field
+
+    def test_parse_record_data_columnar_projection(self, samples):
+        """A projection without time_ms still reports the sample count."""
+        cols = parse_record_data(make_record(samples), 10, columnar=True, fields=['speed'])
+
+        assert list(cols['ghost_samples']) == ['speed']
+        assert cols['ghost_info']['num_samples'] == len(samples)
@@ -1,6 +1,15 @@
 """TM2020 GBX Parser - Pure-Python parser for TrackMania 2020 GBX replay files."""
 
-from .parser import parse_gbx
+from .parser import parse_gbx, parse_gbx_bytes, parse_gbx_ghosts, parse_gbx_header, iter_ghost_samples
+from .samples import GhostSamples
+from .trace import GhostTrace
+from .batch import ParseResult, parse_many
+from .aio import parse_gbx_async, parse_many_async
+from .cache import ParseCache
 
 __version__ = "0.3.0"
-__all__ = ["parse_gbx"]
+__all__ = [
+    "parse_gbx", "parse_gbx_bytes", "parse_gbx_ghosts", "parse_gbx_header", "iter_ghost_samples",
+    "GhostSamples", "GhostTrace",
+    "parse_many", "ParseResult", "parse_gbx_async", "parse_many_async", "ParseCache",
+]
@@ -0,0 +1,7 @@
+"""Allow `python -m tm_gbx` as an alias for the tm-gbx command."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,140 @@
+"""asyncio parsing API.
+
+parse_gbx_async() and parse_many_async() run the blocking parse (decompression
+and sample decoding) in an executor, so an event loop is never stalled by a
+large ghost. Concurrency is bounded with a semaphore / fixed window of
+in-flight parses.
+"""
+
+import asyncio
+import collections
+import functools
+import os
+
+from .batch import ParseResult
+from .parser import parse_gbx, parse_gbx_bytes
+from .projection import validate_fields
+
+# parse_gbx options that only apply to files; parse_gbx_bytes doesn't take them
+_PATH_ONLY_KWARGS = ('use_mmap', 'body')
+
+
+async def parse_gbx_async(source, executor=None, semaphore=None, **parse_kwargs):
+    """Parse a GBX replay without blocking the event loop.
+
+    Args:
+        source: Path to a .Gbx file, or the file contents as bytes
+        executor: concurrent.futures executor to parse in (default: the loop's
+            default thread pool). zlib releases the GIL, but sample decoding
+            does not - pass a ProcessPoolExecutor to decode on several cores.
+        semaphore: Optional asyncio.Semaphore held while parsing, to share a
+            concurrency limit between callers
+        **parse_kwargs: Passed to parse_gbx / parse_gbx_bytes (use_mmap is
+            ignored for bytes)
+
+    Returns:
+        Dictionary with 'metadata', 'ghost_info', and 'ghost_samples' keys
+
+    Raises:
+        ValueError: body=False with a bytes source
+    """
+    if 'fields' in parse_kwargs:
+        parse_kwargs['fields'] = validate_fields(parse_kwargs['fields'])
+
+    loop = asyncio.get_running_loop()
+    call = functools.partial(_parse_source, source, _source_kwargs(source, parse_kwargs))
+
+    if semaphore is None:
+        return await loop.run_in_executor(executor, call)
+    async with semaphore:
+        return await loop.run_in_executor(executor, call)
+
+
+async def parse_many_async(sources, executor=None, concurrency=4, ordered=True, **parse_kwargs):
+    """Parse many GBX replays concurrently as an async iterator.
+
+    At most `concurrency` parses are in flight at once. An exception raised
+    while parsing one source is captured in its ParseResult like parse_many().
+
+    Args:
+        sources: Iterable of paths and/or bytes
+        executor: Executor to parse in (see parse_gbx_async)
+        concurrency: Maximum number of parses in flight
+        ordered: Yield results in input order; with ordered=False results are
+            yielded as soon as they complete
+        **parse_kwargs: Passed to parse_gbx / parse_gbx_bytes (use_mmap is
+            ignored for bytes)
+
+    Yields:
+        ParseResult per source. For in-memory sources `path` is the index of
+        the source in the input.
+
+    Raises:
+        ValueError: body=False and a bytes source is reached
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if 'fields' in parse_kwargs:
+        parse_kwargs['fields'] = validate_fields(parse_kwargs['fields'])
+
+    loop = asyncio.get_running_loop()
+    pending = collections.deque() if ordered else set()
+
+    def submit(index, source):
+        path = source if isinstance(source, (str, os.PathLike)) else index
+        call = functools.partial(_parse_result, path, source, _source_kwargs(source, parse_kwargs))
+        future = loop.run_in_executor(executor, call)
+        if ordered:
+            pending.append(future)
+        else:
+            pending.add(future)
+
+    async def next_results():
+        if ordered:
+            return [await pending.popleft()]
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        pending.difference_update(done)
+        return [future.result() for future in done]
+
+    try:
+        for index, source in enumerate(sources):
+            submit(index, source)
+            if len(pending) >= concurrency:
+                for result in await next_results():
+                    yield result
+
+        while pending:
+            for result in await next_results():
+                yield result
+    finally:
+        # Consumer stopped early: drop parses that haven't started yet
+        for future in pending:
+            future.cancel()
+
+
+def _is_bytes(source):
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def _source_kwargs(source, parse_kwargs):
+    """parse_kwargs for one source, without the path-only options for bytes."""
+    if not _is_bytes(source):
+        return parse_kwargs
+    if not parse_kwargs.get('body', True):
+        raise ValueError("body=False is not supported for bytes sources; "
+                         "parse_gbx_bytes always parses the body")
+    return {key: value for key, value in parse_kwargs.items() if key not in _PATH_ONLY_KWARGS}
+
+
+def _parse_source(source, parse_kwargs):
+    if _is_bytes(source):
+        return parse_gbx_bytes(source, **parse_kwargs)
+    return parse_gbx(source, **parse_kwargs)
+
+
+def _parse_result(path, source, parse_kwargs):
+    """Parse one source, capturing any exception (runs in the executor)."""
+    try:
+        return ParseResult(path, _parse_source(source, parse_kwargs), None)
+    except Exception as e:
+        return ParseResult(path, None, f"{type(e).__name__}: {e}")
@@ -0,0 +1,225 @@
+"""Apache Arrow / Parquet output.
+
+Builds pyarrow RecordBatches straight from the vectorized column decoder, with
+compact types (float32 channels, int32 time, uint8 rpm/materials, int8 reactor
+states, bool flags), and writes Parquet incrementally with write_parquet().
+
+pyarrow is optional - install it to use this module.
+"""
+
+import hashlib
+import os
+
+from .batch import parse_many
+from .ghost import SAMPLE_FIELDS
+from .parser import parse_gbx
+from .projection import validate_fields
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow not available - Arrow output disabled
+    pa = None
+    pq = None
+
+
+# Arrow type per sample field; everything not listed is float32
+_SAMPLE_TYPES = {
+    'time_ms': 'int32',
+    'rpm': 'uint8',
+    'fl_ground_mat': 'uint8', 'fr_ground_mat': 'uint8', 'rr_ground_mat': 'uint8', 'rl_ground_mat': 'uint8',
+    'reactor_state': 'int8', 'reactor_boost': 'int8', 'reactor_pedal': 'int8', 'reactor_steer': 'int8',
+    'is_turbo': 'bool', 'is_ground_contact': 'bool', 'is_top_contact': 'bool',
+    'fl_slip': 'bool', 'fr_slip': 'bool', 'rr_slip': 'bool', 'rl_slip': 'bool',
+}
+
+# Header columns: (name, Arrow type, metadata / ghost_info key)
+_HEADER_COLUMNS = (
+    ('replay_id', 'string', None),
+    ('file_name', 'string', None),
+    ('map_uid', 'string', 'map_uid'),
+    ('map_name', 'string', 'map_name'),
+    ('map_author', 'string', 'map_author'),
+    ('player_nickname', 'string', 'player_nickname'),
+    ('player_login', 'string', 'player_login'),
+    ('author_login', 'string', 'author_login'),
+    ('author_nickname', 'string', 'author_nickname'),
+    ('title_id', 'string', 'title_id'),
+    ('race_time_ms', 'int32', 'race_time_ms'),
+    ('num_checkpoints', 'int32', 'num_checkpoints'),
+    ('start_time', 'int32', 'start_time'),
+    ('end_time', 'int32', 'end_time'),
+    ('num_samples', 'int32', 'num_samples'),
+    ('record_version', 'int32', 'version'),
+)
+
+if pa is not None:
+    SAMPLE_SCHEMA = pa.schema(
+        [pa.field('replay_id', pa.string())] +
+        [pa.field(name, pa.type_for_alias(_SAMPLE_TYPES.get(name, 'float32'))) for name in SAMPLE_FIELDS])
+    HEADER_SCHEMA = pa.schema([pa.field(name, pa.type_for_alias(type_)) for name, type_, _ in _HEADER_COLUMNS])
+else:
+    SAMPLE_SCHEMA = None
+    HEADER_SCHEMA = None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow/Parquet output")
+
+
+def replay_id_for(filepath):
+    """Replay ID used by the Silver tables: MD5 of the file name."""
+    return hashlib.md5(os.path.basename(filepath).encode()).hexdigest()
+
+
+def samples_to_record_batch(columns, replay_id=None):
+    """Convert columnar ghost samples to a RecordBatch with compact types.
+
+    Args:
+        columns: dict of NumPy arrays from parse_gbx(..., columnar=True)
+            (all 52 fields, or a projected subset)
+        replay_id: Optional replay ID added as a leading string column
+
+    Returns:
+        pyarrow.RecordBatch following SAMPLE_SCHEMA (restricted to the given fields)
+    """
+    _require_pyarrow()
+
+    schema_fields = []
+    arrays = []
+    num_rows = len(next(iter(columns.values()))) if columns else 0
+
+    if replay_id is not None:
+        schema_fields.append(SAMPLE_SCHEMA.field('replay_id'))
+        arrays.append(pa.repeat(pa.scalar(replay_id, pa.string()), num_rows))
+
+    for name, column in columns.items():
+        field = SAMPLE_SCHEMA.field(name)
+        arrays.append(pa.array(column.astype(field.type.to_pandas_dtype(), copy=False)))
+        schema_fields.append(field)
+
+    return pa.RecordBatch.from_arrays(arrays, schema=pa.schema(schema_fields))
+
+
+def empty_sample_batch(fields=None, replay_id=True):
+    """Return an empty RecordBatch with the sample schema (optionally projected)."""
+    _require_pyarrow()
+
+    names = (['replay_id'] if replay_id else []) + list(fields if fields is not None else SAMPLE_FIELDS)
+    schema = pa.schema([SAMPLE_SCHEMA.field(name) for name in names])
+    return pa.RecordBatch.from_arrays([pa.array([], field.type) for field in schema], schema=schema)
+
+
+def header_row(filepath, result):
+    """Build one HEADER_SCHEMA row (dict) from a parse_gbx() result."""
+    metadata = result.get('metadata') or {}
+    ghost_info = result.get('ghost_info') or {}
+    row = {'replay_id': replay_id_for(filepath), 'file_name': os.path.basename(filepath)}
+    for name, _, key in _HEADER_COLUMNS[2:]:
+        row[name] = metadata.get(key, ghost_info.get(key))
+    return row
+
+
+def headers_to_table(rows):
+    """Convert header rows (see header_row) to a Table with HEADER_SCHEMA."""
+    _require_pyarrow()
+    return pa.Table.from_pylist(list(rows), schema=HEADER_SCHEMA)
+
+
+def parse_gbx_arrow(filepath, fields=None, **parse_kwargs):
+    """Parse a GBX replay and return its samples as a RecordBatch.
+
+    Args:
+        filepath: Path to .Gbx replay file
+        fields: Only decode these sample fields (see parse_gbx)
+        **parse_kwargs: Passed to parse_gbx (use_mmap)
+
+    Returns:
+        Dictionary with 'metadata', 'ghost_info', 'header' (a one-row Table
+        with HEADER_SCHEMA) and 'ghost_samples' (a RecordBatch with
+        SAMPLE_SCHEMA, including the replay_id column)
+    """
+    _require_pyarrow()
+
+    fields = validate_fields(fields)
+    result = parse_gbx(filepath, columnar=True, fields=fields, **parse_kwargs)
+    return _to_arrow(filepath, result, fields)
+
+
+def _to_arrow(filepath, result, fields):
+    replay_id = replay_id_for(filepath)
+    if result['ghost_samples']:
+        batch = samples_to_record_batch(result['ghost_samples'], replay_id)
+    else:
+        batch = empty_sample_batch(fields)
+
+    return {
+        'metadata': result['metadata'],
+        'ghost_info': result['ghost_info'],
+        'header': headers_to_table([header_row(filepath, result)]),
+        'ghost_samples': batch,
+    }
+
+
+def write_parquet(paths, out_dir, workers=1, fields=None, row_group_size=256 * 1024,
+                  compression='zstd', **parse_kwargs):
+    """Parse replays and write telemetry and header Parquet files.
+
+    Files are parsed through parse_many() and their sample batches are
+    buffered only until a row group is full, so memory stays bounded however
+    many replays are converted. Files that fail to parse are skipped and
+    reported in the returned summary.
+
+    Args:
+        paths: Iterable of .Gbx file paths
+        out_dir: Output directory; receives samples.parquet and headers.parquet
+        workers: Worker processes for parsing (see parse_many)
+        fields: Only decode and write these sample fields
+        row_group_size: Target number of sample rows per Parquet row group
+        compression: Parquet compression codec
+        **parse_kwargs: Passed to parse_many / parse_gbx
+
+    Returns:
+        dict with 'files', 'rows' and 'failed' (list of (path, error))
+    """
+    _require_pyarrow()
+
+    fields = validate_fields(fields)
+    os.makedirs(out_dir, exist_ok=True)
+
+    schema = empty_sample_batch(fields).schema
+    samples_path = os.path.join(out_dir, 'samples.parquet')
+    headers = []
+    failed = []
+    pending = []
+    pending_rows = 0
+    total_rows = 0
+
+    with pq.ParquetWriter(samples_path, schema, compression=compression) as writer:
+        for item in parse_many(paths, workers=workers, columnar=True, fields=fields, **parse_kwargs):
+            if not item.ok:
+                failed.append((item.path, item.error))
+                continue
+
+            headers.append(header_row(item.path, item.result))
+            if not item.result['ghost_samples']:
+                continue
+
+            batch = samples_to_record_batch(item.result['ghost_samples'], replay_id_for(item.path))
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            total_rows += batch.num_rows
+
+            if pending_rows >= row_group_size:
+                writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=row_group_size)
+                pending = []
+                pending_rows = 0
+
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=row_group_size)
+
+    pq.write_table(headers_to_table(headers), os.path.join(out_dir, 'headers.parquet'),
+                   compression=compression)
+
+    return {'files': len(headers), 'rows': total_rows, 'failed': failed}
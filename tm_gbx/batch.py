@@ -0,0 +1,92 @@
+"""Multi-process batch parsing.
+
+parse_many() spreads parse_gbx() over a multiprocessing pool and streams the
+results back as they complete, so ingestion jobs use every core and can write
+each result out before the whole batch is done.
+"""
+
+import functools
+import multiprocessing
+from collections import namedtuple
+
+from .parser import parse_gbx
+from .projection import validate_fields
+from .stats import ParseStats
+
+
+class ParseResult(namedtuple('ParseResult', ['path', 'result', 'error'])):
+    """Outcome of parsing one file in a batch.
+
+    Attributes:
+        path: The path as passed to parse_many()
+        result: parse_gbx() output, or None if parsing failed
+        error: None on success, otherwise "ExceptionType: message"
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def parse_many(paths, workers=None, chunksize=1, ordered=True, stats=None, **parse_kwargs):
+    """Parse many GBX files in parallel, yielding results as they are ready.
+
+    An exception raised while parsing one file is captured in that file's
+    ParseResult instead of stopping the batch.
+
+    Args:
+        paths: Iterable of .Gbx file paths
+        workers: Number of worker processes (default: os.cpu_count()). With
+            workers=1 files are parsed in the calling process.
+        chunksize: Number of paths sent to a worker at a time; larger chunks
+            cut inter-process overhead for big batches of small files
+        ordered: Yield results in input order. With ordered=False results are
+            yielded as soon as any worker finishes.
+        stats: Optional tm_gbx.stats.ParseStats; every worker records its
+            files in its own and they are merged into this one as results
+            arrive, so one object can collect several batches
+        **parse_kwargs: Passed to parse_gbx (columnar, use_mmap, body, fields)
+
+    Yields:
+        ParseResult for every path
+    """
+    if parse_kwargs.get('lazy'):
+        raise ValueError("lazy results can't be sent between processes")
+    if 'fields' in parse_kwargs:
+        parse_kwargs['fields'] = validate_fields(parse_kwargs['fields'])
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    parse_one = functools.partial(_parse_one, parse_kwargs=parse_kwargs, collect_stats=stats is not None)
+
+    if workers == 1:
+        yield from _merge_stats(map(parse_one, paths), stats)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        yield from _merge_stats(imap(parse_one, paths, chunksize), stats)
+
+
+def _merge_stats(results, stats):
+    """Yield the ParseResults of _parse_one() results, merging their stats into stats."""
+    for item, file_stats in results:
+        if stats is not None:
+            stats.merge(file_stats)
+        yield item
+
+
+def _parse_one(path, parse_kwargs, collect_stats=False):
+    """Parse one file, capturing any exception (runs in the worker process).
+
+    Returns:
+        (ParseResult, ParseStats of this file or None)
+    """
+    stats = ParseStats() if collect_stats else None
+    try:
+        return ParseResult(path, parse_gbx(path, stats=stats, **parse_kwargs), None), stats
+    except Exception as e:
+        # Exception objects don't always pickle; send the message instead
+        return ParseResult(path, None, f"{type(e).__name__}: {e}"), stats
@@ -0,0 +1,334 @@
+"""GBX body structure.
+
+A decompressed body is the chunk list of the main node: chunk ID (u32)
+followed by the chunk payload, ending with 0xFACADE01. Skippable chunks carry
+their size ('PIKS' marker + u32 size); non-skippable chunks have to be read
+to find their end. Nodes are referenced by index and stored inline the first
+time they are referenced (index, class ID, then the node's chunk list).
+
+read_body_records() walks that structure to the CPlugEntRecordData chunks:
+the replay's ghost list, the CGameCtnGhost main chunk and the record node it
+references, returning every record with the player info of its ghost.
+walk_to_record() does the same walk on a file object (such as a
+streaming.InflateReader) and stops at the first record chunk. Neither
+searches the body for the record chunk ID: a walk that can't get through a
+chunk of unknown layout ends there, and is reported to stats as
+UNREADABLE_BODY. index_chunks() runs the same walk and lists every chunk it
+reads or skips, with its offset and size.
+
+Based on GbxReader chunk and node reading from gbx-net.
+"""
+
+import io
+import struct
+from collections import namedtuple
+
+from . import stats as _stats
+from .lookback import LookbackReader
+from .reader import read_int32, read_uint8, read_uint32
+from .stats import NO_STATS
+
+_U32 = struct.Struct('<I')
+_RECORD_CHUNK_HEAD = struct.Struct('<III')   # version, uncompressedSize, dataLength
+
+NODE_END = 0xFACADE01
+SKIPPABLE_MARKER = b'PIKS'
+RECORD_CHUNK_ID = 0x0911F000                 # CPlugEntRecordData
+
+# A CPlugEntRecordData chunk found by read_body_records()
+BodyRecord = namedtuple('BodyRecord', ['offset', 'player'])
+
+# One chunk listed by index_chunks(). offset is the start of the payload
+# (after the chunk ID and, for skippable chunks, the 'PIKS' marker and size);
+# depth is 0 for chunks of the main node and grows with each referenced node
+# the chunk is read from. size is None for a chunk the walk stopped in.
+BodyChunk = namedtuple('BodyChunk', ['chunk_id', 'offset', 'size', 'skippable', 'depth'])
+
+
+def _record_chunk_size(view, offset):
+    """CPlugEntRecordData 0x0911F000: version, sizes, compressed record."""
+    return _RECORD_CHUNK_HEAD.size + _RECORD_CHUNK_HEAD.unpack_from(view, offset)[2]
+
+
+def read_body_records(data, stats=NO_STATS):
+    """Walk a body and return its CPlugEntRecordData chunks with their players.
+
+    The body is walked structurally: chunks are read or skipped by size, node
+    references are followed into the ghost nodes and the record nodes they
+    reference, and IDs are read with the body's lookback state. Nothing is
+    searched for, so the work grows with the number of chunks rather than
+    the body size, and byte patterns inside other data (such as the embedded
+    map) are never mistaken for a record. A chunk of unknown layout or a
+    truncated body ends the walk; the records found up to then are returned
+    (if there are none, stats is told why).
+
+    Args:
+        data: Decompressed body bytes
+        stats: tm_gbx.stats.ParseStats told why a walk ended early
+
+    Returns:
+        list of BodyRecord(offset, player): offset is at the version field of
+        the record chunk, player a dict with what the owning CGameCtnGhost
+        node says about its player (nickname, trigram, zone, club_tag,
+        login; empty for a record outside a ghost node)
+    """
+    walker = _BodyWalker(io.BytesIO(data))
+    try:
+        walker.read_node()
+    except (struct.error, EOFError, ValueError) as e:
+        if not walker.records:
+            stats.fail(_stats.UNREADABLE_BODY, f"{type(e).__name__}: {e}")
+    return walker.records
+
+
+def index_chunks(data):
+    """List the chunks of a body and of the nodes it references.
+
+    The walk of read_body_records: the map and other chunks that are skipped
+    by size are listed without being read, and nested nodes are only
+    entered where the walk follows a node reference (the ghost list, the
+    ghost node and its record node).
+
+    Args:
+        data: Decompressed body bytes
+
+    Returns:
+        list of BodyChunk in body order (a chunk before the chunks nested in
+        it); a chunk the walk couldn't read to its end (such as one of
+        unknown layout) comes last with size None
+    """
+    walker = _BodyWalker(io.BytesIO(data), index=True)
+    try:
+        walker.read_node()
+    except (struct.error, EOFError, ValueError):
+        pass
+    return walker.chunks
+
+
+def walk_to_record(f, stats=NO_STATS):
+    """Walk a body read from f up to its first CPlugEntRecordData chunk.
+
+    The walk of read_body_records, on a file object that only needs read(),
+    tell() and seek() forward (plus 4 bytes back); nothing after the record
+    chunk's version field is read. A walk that ends early is reported to
+    stats like in read_body_records.
+
+    Returns:
+        BodyRecord with f positioned at the record chunk's version field, or
+        None if the walk ended without reaching one
+    """
+    walker = _BodyWalker(f, limit=1)
+    try:
+        walker.read_node()
+    except _WalkDone:
+        return walker.records[0]
+    except (struct.error, EOFError, ValueError) as e:
+        stats.fail(_stats.UNREADABLE_BODY, f"{type(e).__name__}: {e}")
+    return None
+
+
+class _WalkDone(Exception):
+    """Raised to end a walk once its record limit is reached."""
+
+
+class _BodyWalker:
+    """Reader state for a structural body walk (see read_body_records)."""
+
+    def __init__(self, f, limit=None, index=False):
+        self.f = f
+        self.limit = limit
+        self.lookback = LookbackReader()
+        self.nodes = set()
+        self.records = []
+        self.player = {}  # player info of the ghost node being read
+        self.chunks = [] if index else None
+        self.depth = -1
+
+    def read_node(self):
+        """Read the chunk list of a node up to its end marker."""
+        outer_player = self.player
+        self.depth += 1
+        self._read_chunks()
+        self.depth -= 1
+        self.player = outer_player
+
+    def _index(self, chunk_id, skippable, size=None):
+        """Add the index entry of a chunk whose payload starts here; returns its position."""
+        if self.chunks is None:
+            return None
+        self.chunks.append(BodyChunk(chunk_id, self.f.tell(), size, skippable, self.depth))
+        return len(self.chunks) - 1
+
+    def _sized(self, position):
+        """Set the size of an indexed chunk whose payload ends here."""
+        if position is not None:
+            chunk = self.chunks[position]
+            self.chunks[position] = chunk._replace(size=self.f.tell() - chunk.offset)
+
+    def _read_chunks(self):
+        f = self.f
+        while True:
+            chunk_id = read_uint32(f)
+            if chunk_id == NODE_END:
+                return
+
+            if chunk_id == RECORD_CHUNK_ID:
+                self.records.append(BodyRecord(f.tell(), self.player))
+                if len(self.records) == self.limit:
+                    raise _WalkDone()
+                position = self._index(chunk_id, False)
+                head = f.read(_RECORD_CHUNK_HEAD.size)
+                _skip(f, _record_chunk_size(head, 0) - len(head))
+                self._sized(position)
+                continue
+
+            marker = f.read(4)
+            if marker == SKIPPABLE_MARKER:
+                size = read_uint32(f)
+                end = f.tell() + size
+                self._index(chunk_id, True, size)
+                reader = _SKIPPABLE_READERS.get(chunk_id)
+                if reader is not None:
+                    reader(self)
+                f.seek(end)
+                continue
+
+            f.seek(-len(marker), io.SEEK_CUR)
+            position = self._index(chunk_id, False)
+            reader = _CHUNK_READERS.get(chunk_id)
+            if reader is None:
+                raise ValueError(f"Unknown non-skippable chunk 0x{chunk_id:08X}")
+            reader(self)
+            self._sized(position)
+
+    def read_node_ref(self):
+        """Read a node reference, and the node itself the first time it is referenced."""
+        index = read_int32(self.f)
+        if index == -1 or index in self.nodes:
+            return
+        self.nodes.add(index)
+        read_uint32(self.f)  # class ID
+        self.read_node()
+
+
+def _skip(f, size):
+    f.seek(size, io.SEEK_CUR)
+
+
+def _skip_string(f):
+    """Skip a length-prefixed string or data blob."""
+    _skip(f, read_uint32(f))
+
+
+def _read_string(f):
+    """Read a length-prefixed UTF-8 string."""
+    length = read_uint32(f)
+    data = f.read(length)
+    if len(data) != length:
+        raise EOFError(f"Failed to read string of length {length}")
+    return data.decode('utf-8', errors='replace')
+
+
+def _fixed(size):
+    """Reader for a chunk with a fixed payload size."""
+    def read(walker):
+        _skip(walker.f, size)
+    return read
+
+
+def _read_data(walker):
+    _skip_string(walker.f)
+
+
+def _read_id(walker):
+    walker.lookback.read_id(walker.f)
+
+
+def _read_ghost_login(walker):
+    """CGameCtnGhost 0x0309200F: player login."""
+    walker.player['login'] = _read_string(walker.f)
+
+
+def _read_ghost_data(walker):
+    """CGameGhost 0x0303F006: is_replaying, uncompressed size, compressed data."""
+    _skip(walker.f, 8)
+    _skip_string(walker.f)
+
+
+def _read_replay_ghosts(walker):
+    """CGameCtnReplayRecord 0x03093014: version, ghost nodes, u01, extras."""
+    f = walker.f
+    read_uint32(f)
+    for _ in range(read_uint32(f)):
+        walker.read_node_ref()
+    read_uint32(f)
+    _skip(f, 8 * read_uint32(f))
+
+
+def _read_replay_record_data(walker):
+    """CGameCtnReplayRecord 0x03093024: version, record data node, u01 node."""
+    read_uint32(walker.f)
+    walker.read_node_ref()
+    walker.read_node_ref()
+
+
+def _read_ghost(walker):
+    """CGameCtnGhost 0x03092000: player info and the record data node."""
+    f = walker.f
+    player = walker.player = {}
+    version = read_uint32(f)
+    walker.lookback.read_ident(f)           # player model
+    _skip(f, 12)                            # light trail color
+    for _ in range(read_uint32(f)):         # skin pack descs
+        file_version = read_uint8(f)
+        if file_version >= 3:
+            _skip(f, 32)                    # checksum
+        path_length = read_uint32(f)
+        _skip(f, path_length)
+        if (path_length and file_version >= 1) or file_version >= 3:
+            _skip_string(f)                 # locator URL
+    if read_uint32(f):                      # has badges
+        badge_version = read_uint32(f)
+        if badge_version != 0:
+            raise ValueError(f"Unsupported badge version: {badge_version}")
+        _skip(f, 12)                        # color
+        for _ in range(read_uint32(f)):     # stickers (key, value)
+            _skip_string(f)
+            _skip_string(f)
+        for _ in range(read_uint32(f)):     # layers
+            _skip_string(f)
+    player['nickname'] = _read_string(f)
+    _skip_string(f)                         # avatar name
+    if version >= 2:
+        _skip_string(f)                     # recording context
+    if version >= 4:
+        read_uint32(f)
+    if version >= 5:
+        walker.read_node_ref()              # CPlugEntRecordData
+        _skip(f, 4 * read_uint32(f))
+    if version >= 6:
+        player['trigram'] = _read_string(f)
+    if version >= 7:
+        player['zone'] = _read_string(f)
+    if version >= 8:
+        player['club_tag'] = _read_string(f)
+
+
+# Readers of the non-skippable chunks found in replay and ghost bodies
+_CHUNK_READERS = {
+    0x03093002: _read_data,                 # embedded map .Gbx
+    0x03093014: _read_replay_ghosts,
+    0x03093015: lambda walker: walker.read_node_ref(),  # MediaTracker clip
+    0x03093024: _read_replay_record_data,
+    0x0303F006: _read_ghost_data,
+    0x0309200C: _fixed(4),
+    0x0309200E: _fixed(4),
+    0x0309200F: _read_ghost_login,
+    0x03092010: _read_id,                   # map UID
+    0x0309201C: _fixed(32),
+}
+
+# Skippable chunks that are read because they reference the record node
+_SKIPPABLE_READERS = {
+    0x03092000: _read_ghost,
+}
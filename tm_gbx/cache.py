@@ -0,0 +1,195 @@
+"""Persistent content-addressed parse cache.
+
+ParseCache stores parse_gbx() results on disk keyed by a hash of the file
+contents, the parse options and the parser __version__, so unchanged replays
+are never re-parsed. Entries are zlib-compressed pickles; total size is capped
+with least-recently-used eviction. Entries written by another parser version
+are removed when the cache is opened.
+
+Only point a cache at a directory you trust - entries are unpickled on read.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+from collections import OrderedDict
+
+from .parser import parse_gbx, parse_gbx_bytes
+from .projection import validate_fields
+
+# Entry files are named "<parser version>-<sha256>.pkz"
+_SUFFIX = '.pkz'
+
+
+class ParseCache:
+    """On-disk LRU cache of parse_gbx() results.
+
+    Example:
+        cache = ParseCache("/lakehouse/default/Files/.tm_gbx_cache", max_bytes=2 * 1024**3)
+        for path in paths:
+            result = cache.parse_gbx(path)
+        print(cache.stats())
+    """
+
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024, compress_level=1):
+        """Open (or create) a cache directory.
+
+        Args:
+            directory: Directory holding the cache entries
+            max_bytes: Size cap for all entries; least recently used entries
+                are evicted once it is exceeded
+            compress_level: zlib level for stored entries
+        """
+        from . import __version__
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._prefix = __version__ + '-'
+        self._entries = OrderedDict()  # file name -> size, least recently used first
+        self._size = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Index current-version entries by last use; drop entries of other versions."""
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(_SUFFIX):
+                continue
+            if not entry.name.startswith(self._prefix):
+                _remove(entry.path)
+                continue
+            stat = entry.stat()
+            found.append((stat.st_mtime, entry.name, stat.st_size))
+
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._size += size
+
+    def parse_gbx(self, filepath, columnar=False, use_mmap=False, body=True, lazy=False, fields=None,
+                  trace=False):
+        """Parse a GBX file through the cache.
+
+        Args:
+            filepath: Path to .Gbx replay file
+            columnar, body, fields, trace: See parse_gbx
+            use_mmap: Ignored, since the file is read once for hashing anyway
+            lazy: Not supported - lazy results can't be cached
+
+        Returns:
+            Dictionary with 'metadata', 'ghost_info', and 'ghost_samples' keys
+        """
+        if lazy:
+            raise ValueError("lazy results can't be cached")
+        if not body:
+            # Header-only parsing is cheaper than hashing the whole file
+            return parse_gbx(filepath, columnar=columnar, body=False, fields=fields, trace=trace)
+
+        fields = validate_fields(fields)
+
+        with open(filepath, 'rb') as f:
+            data = f.read()
+
+        name = self._entry_name(data, columnar, fields, trace)
+        result = self._load(name)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = parse_gbx_bytes(data, columnar=columnar, fields=fields, trace=trace)
+        self._store(name, result)
+        return result
+
+    def _entry_name(self, data, columnar, fields, trace):
+        key = hashlib.sha256(data)
+        key.update(repr((columnar, fields, trace)).encode())
+        return self._prefix + key.hexdigest() + _SUFFIX
+
+    def _load(self, name):
+        if name not in self._entries:
+            return None
+
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            # Removed by another process, or a corrupt entry
+            self._forget(name)
+            _remove(path)
+            return None
+
+        # Mark as most recently used (the mtime persists the order across runs)
+        self._entries.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def _store(self, name, result):
+        data = zlib.compress(pickle.dumps(result, pickle.HIGHEST_PROTOCOL), self.compress_level)
+        if len(data) > self.max_bytes:
+            return
+
+        # Write atomically so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.directory, name))
+        except BaseException:
+            _remove(tmp_path)
+            raise
+
+        self._forget(name)
+        self._entries[name] = len(data)
+        self._size += len(data)
+        self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            _remove(os.path.join(self.directory, name))
+
+    def _forget(self, name):
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self._size -= size
+
+    def clear(self):
+        """Remove every entry of the current parser version."""
+        for name in list(self._entries):
+            _remove(os.path.join(self.directory, name))
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the current cache size."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._size,
+        }
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,280 @@
+"""tm-gbx command-line interface.
+
+    tm-gbx convert INPUT_DIR OUTPUT_DIR [--format jsonl|parquet] [--workers N]
+    tm-gbx synth OUTPUT_DIR [--count N] [--duration S [MAX_S]] [--entities N] [--check]
+
+convert converts every .Gbx file under INPUT_DIR into one output file per
+replay, mirroring the directory layout under OUTPUT_DIR. Files are converted
+on parallel worker processes, outputs that are newer than their input are
+skipped, and every output is written to a temporary file first and renamed
+into place so an interrupted run never leaves partial files behind.
+
+Output formats:
+    jsonl    First line {"metadata": ..., "ghost_info": ...}, then one JSON
+             object per sample
+    parquet  Sample table (see tm_gbx.arrow) with the metadata and ghost_info
+             stored as JSON under the b"tm_gbx" schema metadata key
+
+synth writes a corpus of synthetic replays (see tm_gbx.synthetic) and with
+--check verifies that every file round-trips through the parser.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from .ingest import GBX_SUFFIX, find_gbx_files
+from .parser import parse_gbx
+from .projection import validate_fields
+
+FORMATS = {'jsonl': '.jsonl', 'parquet': '.parquet'}
+
+
+def output_path_for(path, input_dir, output_dir, fmt):
+    """Map input_dir/a/b/x.Replay.Gbx to output_dir/a/b/x.Replay.<fmt>."""
+    relative = os.path.relpath(path, input_dir)
+    return os.path.join(output_dir, relative[:-len(GBX_SUFFIX)] + FORMATS[fmt])
+
+
+def is_up_to_date(src, dst):
+    """True if dst exists and is at least as new as src."""
+    try:
+        return os.stat(dst).st_mtime >= os.stat(src).st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def convert_file(src, dst, fmt='jsonl', fields=None):
+    """Convert one replay and write it atomically.
+
+    Returns:
+        (src, num_samples, input_bytes, error) - error is None on success
+    """
+    try:
+        result = parse_gbx(src, columnar=(fmt == 'parquet'), fields=fields)
+        os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if fmt == 'parquet':
+                    num_samples = _write_parquet(f, src, result, fields)
+                else:
+                    num_samples = _write_jsonl(f, result)
+            # mkstemp creates the file 0600; give the output the usual umask-based mode
+            os.chmod(tmp_path, _default_file_mode())
+            os.replace(tmp_path, dst)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        return src, num_samples, os.path.getsize(src), None
+    except Exception as e:
+        return src, 0, 0, f"{type(e).__name__}: {e}"
+
+
+def _default_file_mode():
+    """Mode open() would give a new file under the current umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _header_json(result):
+    return json.dumps({'metadata': result['metadata'], 'ghost_info': result['ghost_info']})
+
+
+def _write_jsonl(f, result):
+    write = f.write
+    dumps = json.dumps
+    write(_header_json(result).encode() + b'\n')
+    count = 0
+    for sample in result['ghost_samples']:
+        write(dumps(sample).encode() + b'\n')
+        count += 1
+    return count
+
+
+def _write_parquet(f, src, result, fields):
+    from .arrow import empty_sample_batch, pa, pq, replay_id_for, samples_to_record_batch
+
+    columns = result['ghost_samples']
+    if columns:
+        batch = samples_to_record_batch(columns, replay_id_for(src))
+    else:
+        batch = empty_sample_batch(fields)
+    schema = batch.schema.with_metadata({b'tm_gbx': _header_json(result).encode()})
+    pq.write_table(pa.Table.from_batches([batch], schema), f, compression='zstd')
+    return batch.num_rows
+
+
+def _convert_job(job):
+    return convert_file(*job)
+
+
+def convert_tree(input_dir, output_dir, fmt='jsonl', workers=None, fields=None, force=False,
+                 chunksize=1, log=None):
+    """Convert every .Gbx file under input_dir; return a summary dict.
+
+    Args:
+        input_dir: Directory tree to search for .Gbx files
+        output_dir: Directory tree to write outputs to
+        fmt: 'jsonl' or 'parquet'
+        workers: Worker processes (default: os.cpu_count(); 1 = in-process)
+        fields: Only decode and write these sample fields
+        force: Convert even if the output is up to date
+        chunksize: Files handed to a worker at a time
+        log: Optional callable receiving one progress line per failed file
+
+    Returns:
+        dict with files, converted, skipped, failed, samples, bytes, seconds
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format: {fmt!r}")
+    if fmt == 'parquet':
+        from .arrow import pa
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet output (pip install tm2020-gbx-parser[arrow])")
+    fields = validate_fields(fields)
+
+    start = time.perf_counter()
+    paths = find_gbx_files(input_dir)
+    jobs = []
+    for path in paths:
+        dst = output_path_for(path, input_dir, output_dir, fmt)
+        if force or not is_up_to_date(path, dst):
+            jobs.append((path, dst, fmt, fields))
+
+    summary = {
+        'files': len(paths),
+        'converted': 0,
+        'skipped': len(paths) - len(jobs),
+        'failed': [],
+        'samples': 0,
+        'bytes': 0,
+    }
+
+    if workers == 1 or len(jobs) <= 1:
+        results = map(_convert_job, jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap_unordered(_convert_job, jobs, chunksize)
+
+    try:
+        for src, num_samples, input_bytes, error in results:
+            if error is not None:
+                summary['failed'].append((src, error))
+                if log is not None:
+                    log(f"failed: {src}: {error}")
+                continue
+            summary['converted'] += 1
+            summary['samples'] += num_samples
+            summary['bytes'] += input_bytes
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def format_summary(summary):
+    """Render the throughput summary printed at the end of a run."""
+    seconds = max(summary['seconds'], 1e-9)
+    return (
+        f"{summary['converted']} converted, {summary['skipped']} up to date, "
+        f"{len(summary['failed'])} failed ({summary['files']} files) in {summary['seconds']:.2f}s\n"
+        f"{summary['converted'] / seconds:,.1f} files/s, "
+        f"{summary['samples'] / seconds:,.0f} samples/s, "
+        f"{summary['bytes'] / seconds / 1e6:,.2f} MB/s"
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='tm-gbx', description="TrackMania 2020 GBX replay tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert', help="convert a directory tree of .Gbx files")
+    convert.add_argument('input_dir', help="directory searched recursively for .Gbx files")
+    convert.add_argument('output_dir', help="output directory (mirrors the input layout)")
+    convert.add_argument('-f', '--format', choices=sorted(FORMATS), default='jsonl')
+    convert.add_argument('-j', '--workers', type=int, default=None,
+                         help="worker processes (default: CPU count)")
+    convert.add_argument('--fields', help="comma-separated sample fields to keep (default: all 52)")
+    convert.add_argument('--force', action='store_true', help="reconvert up-to-date outputs")
+    convert.add_argument('--chunksize', type=int, default=1, help="files per worker task")
+
+    synth = commands.add_parser('synth', help="write a corpus of synthetic replays")
+    synth.add_argument('output_dir', help="directory to write the corpus to")
+    synth.add_argument('-n', '--count', type=int, default=100, help="number of files (default: 100)")
+    synth.add_argument('--duration', type=float, nargs='+', default=[60.0], metavar='S',
+                       help="ghost length in seconds, or a MIN MAX range (default: 60)")
+    synth.add_argument('--entities', type=int, default=1, help="vehicle entities per record")
+    synth.add_argument('--record-version', type=int, choices=(10, 11), default=10)
+    synth.add_argument('--level', type=int, default=6, help="zlib compression level (default: 6)")
+    synth.add_argument('--map-size', type=int, default=0, help="bytes of embedded map data")
+    synth.add_argument('--seed', type=int, default=0)
+    synth.add_argument('-j', '--workers', type=int, default=None,
+                       help="worker processes (default: CPU count)")
+    synth.add_argument('--check', action='store_true', help="round-trip check every file after writing")
+    return parser
+
+
+def main(argv=None):
+    """Console entry point."""
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'convert':
+        fields = args.fields.split(',') if args.fields else None
+        try:
+            summary = convert_tree(args.input_dir, args.output_dir, args.format, args.workers, fields,
+                                   args.force, args.chunksize,
+                                   log=lambda line: print(line, file=sys.stderr))
+        except (ValueError, ImportError) as e:
+            print(f"tm-gbx: error: {e}", file=sys.stderr)
+            return 2
+        print(format_summary(summary))
+        return 1 if summary['failed'] else 0
+
+    if args.command == 'synth':
+        return _synth(args)
+
+    return 2
+
+
+def _synth(args):
+    from .synthetic import check_corpus, generate_corpus
+
+    if len(args.duration) > 2:
+        print("tm-gbx: error: --duration takes one value or a MIN MAX range", file=sys.stderr)
+        return 2
+    duration = args.duration[0] if len(args.duration) == 1 else tuple(args.duration)
+
+    start = time.perf_counter()
+    try:
+        specs = generate_corpus(args.output_dir, args.count, duration, args.entities, args.record_version,
+                                args.level, args.map_size, args.seed, args.workers)
+    except ValueError as e:
+        print(f"tm-gbx: error: {e}", file=sys.stderr)
+        return 2
+    samples = sum(spec.num_samples * spec.entities for spec in specs)
+    print(f"{len(specs)} files, {samples:,} samples written in {time.perf_counter() - start:.2f}s")
+
+    if not args.check:
+        return 0
+    start = time.perf_counter()
+    failures = check_corpus(args.output_dir, args.workers)
+    for name, problems in failures:
+        print(f"failed: {name}: {'; '.join(problems)}", file=sys.stderr)
+    print(f"{len(specs) - len(failures)}/{len(specs)} files round-trip ({time.perf_counter() - start:.2f}s)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Decompressor registry.
+
+GBX bodies are LZO (replays) or zlib (.Ghost.Gbx from some tools) compressed;
+CPlugEntRecordData records are always zlib. The codecs are resolved once when
+this module is imported - python-lzo is imported here or never - and a body's
+codec is chosen from the zlib stream header instead of by trying zlib and
+catching the error. The header is only 2 bytes, so an LZO body can pass the
+check by chance; callers retry a body that fails to inflate as LZO.
+
+Outputs are allocated once at the size the GBX data declares: zlib gets it as
+its initial buffer size (no growing and joining of output blocks), python-lzo
+as its output length. Neither can write into a caller's buffer, so there is
+no output buffer to reuse across files.
+
+Each codec counts calls, bytes in and out and the time spent decompressing,
+per process (parse_many() workers keep their own counters):
+
+    from tm_gbx.compression import codec_stats
+    print(codec_stats())   # {'zlib': {'calls': ..., 'seconds': ...}, 'lzo': {...}}
+"""
+
+import time
+import zlib
+
+try:
+    import lzo
+except ImportError:  # python-lzo not available - LZO replay bodies can't be decompressed
+    lzo = None
+
+# Largest output buffer allocated up front from a declared size; larger
+# outputs start at this size and grow as needed
+MAX_PREALLOC_SIZE = 64 * 1024 * 1024
+
+
+class Codec:
+    """A registered decompressor with timing counters."""
+
+    def __init__(self, name, decompress, errors):
+        """
+        Args:
+            name: Codec name in the registry
+            decompress: callable(data, uncompressed_size) -> bytes
+            errors: Exception types that mean the data is corrupt
+        """
+        self.name = name
+        self.errors = errors
+        self._decompress = decompress
+        self.reset_stats()
+
+    def decompress(self, data, uncompressed_size):
+        """Decompress data whose declared output size is uncompressed_size."""
+        start = time.perf_counter()
+        try:
+            out = self._decompress(data, uncompressed_size)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+            self.bytes_in += len(data)
+        self.bytes_out += len(out)
+        return out
+
+    def reset_stats(self):
+        self.calls = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def stats(self):
+        """Counters as a dict, with throughput in MB/s of output."""
+        return {
+            'calls': self.calls,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'seconds': self.seconds,
+            'mb_per_s': self.bytes_out / self.seconds / 1e6 if self.seconds else 0.0,
+        }
+
+
+CODECS = {}
+
+
+def register_codec(name, decompress, errors=(Exception,)):
+    """Register (or replace) a decompressor; returns its Codec."""
+    codec = CODECS[name] = Codec(name, decompress, tuple(errors))
+    return codec
+
+
+def get_codec(name):
+    """Return the registered Codec called name, or None if it is unavailable."""
+    return CODECS.get(name)
+
+
+def is_zlib_header(head):
+    """True if head starts a zlib stream (deflate method, window of at most 32K, valid check bits)."""
+    return (len(head) >= 2 and head[0] & 0x0F == 8 and head[0] >> 4 <= 7
+            and ((head[0] << 8) | head[1]) % 31 == 0)
+
+
+def body_codec_name(compressed_data):
+    """Codec of a compressed GBX body: 'zlib' if it has a zlib header, else 'lzo'."""
+    return 'zlib' if is_zlib_header(bytes(compressed_data[:2])) else 'lzo'
+
+
+def codec_stats():
+    """Counters of all registered codecs, by name."""
+    return {name: codec.stats() for name, codec in CODECS.items()}
+
+
+def reset_codec_stats():
+    for codec in CODECS.values():
+        codec.reset_stats()
+
+
+def _zlib_decompress(data, uncompressed_size):
+    return zlib.decompress(data, bufsize=max(1, min(uncompressed_size, MAX_PREALLOC_SIZE)))
+
+
+def _lzo_decompress(data, uncompressed_size):
+    return lzo.decompress(data, False, uncompressed_size)
+
+
+register_codec('zlib', _zlib_decompress, (zlib.error,))
+if lzo is not None:
+    register_codec('lzo', _lzo_decompress, (lzo.error,))
@@ -10,91 +10,426 @@ from TrackMania 2020 .Ghost.Gbx files.
 
 import struct
 import zlib
-import io
 import math
-from .reader import read_uint8, read_int16, read_uint16, read_int32, read_uint32
+from itertools import accumulate, chain
 
+from .body import read_body_records
+from .compression import get_codec
+from . import stats as _stats
+from .stats import NO_STATS
 
-def parse_ghost_from_body(body_data):
+try:
+    import numpy as np
+except ImportError:  # NumPy not available - column deltas are summed in Python
+    np = None
+
+
+# The 52 telemetry fields of a decoded CSceneVehicleVis sample, in output order
+SAMPLE_FIELDS = (
+    'time_ms', 'time_s',
+    'x', 'y', 'z',
+    'speed', 'side_speed',
+    'vel_x', 'vel_y', 'vel_z',
+    'pitch_deg', 'yaw_deg', 'roll_deg',
+    'steer', 'gas', 'brake', 'gear', 'rpm',
+    'is_turbo', 'turbo_time',
+    'is_ground_contact', 'is_top_contact',
+    'reactor_state', 'reactor_boost', 'reactor_pedal', 'reactor_steer',
+    'sim_time_coef', 'wetness',
+    'fl_dampen', 'fr_dampen', 'rr_dampen', 'rl_dampen',
+    'fl_ice', 'fr_ice', 'rr_ice', 'rl_ice',
+    'fl_dirt', 'fr_dirt', 'rr_dirt', 'rl_dirt',
+    'fl_slip', 'fr_slip', 'rr_slip', 'rl_slip',
+    'fl_ground_mat', 'fr_ground_mat', 'rr_ground_mat', 'rl_ground_mat',
+    'fl_wheel_rot', 'fr_wheel_rot', 'rr_wheel_rot', 'rl_wheel_rot',
+)
+
+
+# Precompiled framing layouts for CPlugEntRecordData
+_U32 = struct.Struct('<I')
+_RECORD_CHUNK_HEAD = struct.Struct('<III')   # version, uncompressedSize, dataLength
+_RECORD_TIMES = struct.Struct('<ii')         # start_time, end_time
+_ENT_DESC_HEAD = struct.Struct('<IiiiI')     # classId, sampleSize, u01, u02, data length
+_NOTICE_DESC = struct.Struct('<iiI')         # u01, u02, classId
+_ENTITY_HEAD = struct.Struct('<iiiii')       # type, u01-u04
+_SAMPLE_HEAD = struct.Struct('<iI')          # time, data length
+_SAMPLE2_HEAD = struct.Struct('<iiI')        # val1, val2, data length
+_COLUMN_ENTITY_HEAD = struct.Struct('<iIiiiIII')  # v11: desc index, flags, start, end, u01,
+                                                  # num_samples, num_keys (row size), u02
+
+VEHICLE_VIS_CLASS_ID = 0x0A018000
+VEHICLE_VIS_SAMPLE_SIZE = 107
+
+# Entity-list framing events yielded by _iter_entity_events()
+_ENTITY = 0       # (_ENTITY, type, u01, u02, u03, u04)
+_SAMPLE = 1       # (_SAMPLE, time_ms, offset, length)
+_ENTITY_END = 2   # (_ENTITY_END, has_next, samples2)
+
+
+def parse_ghost_from_body(body_data, columnar=False, lazy=False, fields=None, trace=False, stats=None):
     """Parse ghost telemetry from decompressed body data.
     
     Args:
         body_data: Decompressed body bytes (zlib-decompressed)
+        columnar: Decode samples with NumPy into a dict of column arrays
+        lazy: Return samples as a GhostSamples sequence decoded on access
+        fields: Only decode these sample fields (see tm_gbx.projection)
+        trace: Return samples as an array-backed GhostTrace
+        stats: Optional tm_gbx.stats.ParseStats recording stage times,
+            sample counts and why None was returned
         
     Returns:
         dict with ghost_info and ghost_samples (52 fields each), or None if not found
+        
+    Raises:
+        ValueError: If fields contains an unknown field name
     """
-    # Search for CPlugEntRecordData chunk ID: 0x0911F000 (little-endian: \x00\xf0\x11\x09)
-    chunk_pattern = b'\x00\xf0\x11\x09'
-    
-    offset = body_data.find(chunk_pattern)
-    if offset == -1:
-        return None
+    # Validate up front - malformed bodies are reported as None below
+    from .projection import validate_fields
+    fields = validate_fields(fields)
     
-    # Position after chunk ID
-    offset += 4
-    
-    if offset + 12 > len(body_data):
-        return None
+    if stats is None:
+        stats = NO_STATS
     
     try:
-        f = io.BytesIO(body_data[offset:])
-        
-        # Read version (u32)
-        version = read_uint32(f)
-        
-        # Valid versions: 5 <= version <= 15
-        if version < 5 or version > 15:
+        records = extract_records(body_data, limit=1, stats=stats)
+        if not records:
             return None
         
-        # For version >= 5: read uncompressedSize (u32), dataLength (u32)
-        uncompressed_size = read_uint32(f)
-        data_length = read_uint32(f)
+        version, record_data, _ = records[0]
         
-        # Sanity checks
-        if uncompressed_size > 100000000 or data_length > 100000000:
-            return None
-        if data_length < 10:
-            return None
+        # Parse the record data (version 10 format confirmed working)
+        return parse_record_data(record_data, version, columnar, lazy, fields, trace, stats)
+    
+    except (struct.error, IOError, ValueError, EOFError, IndexError) as e:
+        stats.fail(_stats.BAD_RECORD, f"{type(e).__name__}: {e}")
+        return None
+
+
+def extract_record_data(body_data):
+    """Locate the CPlugEntRecordData chunk in a body and decompress its record.
+    
+    Args:
+        body_data: Decompressed body bytes
         
-        # Read compressed data and decompress with zlib
-        compressed_data = f.read(data_length)
-        if len(compressed_data) != data_length:
-            return None
+    Returns:
+        (version, record_data) tuple, or None if no valid record was found
+    """
+    records = extract_records(body_data, limit=1)
+    if not records:
+        return None
+    
+    version, record_data, _ = records[0]
+    return version, record_data
+
+
+def extract_records(body_data, limit=None, stats=None):
+    """Decompress the records of the CPlugEntRecordData chunks in a body.
+    
+    The chunks are found by walking the body structure (see tm_gbx.body).
+    
+    Args:
+        body_data: Decompressed body bytes
+        limit: Stop after this many records (None = all)
+        stats: Optional tm_gbx.stats.ParseStats (record_search and
+            record_inflate stages, failure reasons)
         
+    Returns:
+        list of (version, record_data, player) tuples in body order, where
+        player holds the player info of the owning ghost node (see
+        tm_gbx.body.read_body_records); chunks that don't decompress are left out
+    """
+    if stats is None:
+        stats = NO_STATS
+    
+    with stats.stage('record_search', len(body_data)):
+        body_records = read_body_records(body_data, stats)
+    if not body_records:
+        stats.fail(_stats.NO_RECORD)
+    
+    records = []
+    for offset, player in body_records:
+        if limit is not None and len(records) >= limit:
+            break
+        record = _read_record_chunk(body_data, offset, stats)
+        if record is not None:
+            records.append(record + (player,))
+    return records
+
+
+def _read_record_chunk(data, offset, stats=NO_STATS):
+    """Read and decompress a record chunk whose version field is at offset."""
+    if offset + 12 > len(data):
+        stats.fail(_stats.RECORD_CORRUPT, "record chunk truncated")
+        return None
+    
+    # Read version (u32), then for version >= 5: uncompressedSize (u32), dataLength (u32)
+    version, uncompressed_size, data_length = _RECORD_CHUNK_HEAD.unpack_from(data, offset)
+    offset += _RECORD_CHUNK_HEAD.size
+    
+    # Valid versions: 5 <= version <= 15
+    if version < 5 or version > 15:
+        stats.fail(_stats.UNSUPPORTED_RECORD_VERSION, f"record version {version}")
+        return None
+    
+    # Sanity checks
+    if uncompressed_size > 100000000 or data_length > 100000000:
+        stats.fail(_stats.RECORD_CORRUPT, f"implausible record sizes {uncompressed_size}/{data_length}")
+        return None
+    if data_length < 10:
+        stats.fail(_stats.RECORD_CORRUPT, f"implausible record sizes {uncompressed_size}/{data_length}")
+        return None
+    
+    # Decompress the compressed data in place (no copy of the body tail)
+    if offset + data_length > len(data):
+        stats.fail(_stats.RECORD_CORRUPT, "record chunk truncated")
+        return None
+    compressed_data = memoryview(data)[offset:offset + data_length]
+    
+    # zlib checks the adler32 trailer, so a record is only returned once verified
+    with stats.stage('record_inflate', data_length) as stage:
         try:
-            record_data = zlib.decompress(compressed_data)
-        except zlib.error:
+            record_data = get_codec('zlib').decompress(compressed_data, uncompressed_size)
+        except zlib.error as e:
+            stats.fail(_stats.RECORD_CORRUPT, f"zlib: {e}")
             return None
+        stage.bytes_out = len(record_data)
+    
+    return version, record_data
+
+
+def parse_record_data(record_data, version, columnar=False, lazy=False, fields=None, trace=False,
+                      stats=None):
+    """Parse CPlugEntRecordData inner record data.
+    
+    The record is walked in place through a memoryview. Sample payloads are kept
+    as (time_ms, offset, length) references into record_data; descriptor and
+    samples2 payloads are skipped without being copied.
+    
+    Args:
+        record_data: Decompressed inner record bytes
+        version: Record version
+        columnar: Decode samples with NumPy into a dict of column arrays
+        lazy: Return samples as a GhostSamples sequence decoded on access
+        fields: Only decode these sample fields (see tm_gbx.projection);
+            None decodes all 52
+        trace: Return samples as an array-backed GhostTrace
+        stats: Optional tm_gbx.stats.ParseStats (framing and sample_decode
+            stages, sample counts, failure reasons)
+        
+    Returns:
+        dict with ghost_info and ghost_samples (list of dicts, dict of arrays
+        when columnar=True, GhostSamples when lazy=True, or GhostTrace when
+        trace=True) of the first vehicle entity
+    """
+    vehicles = parse_record_vehicles(record_data, version, columnar, lazy, fields, trace, limit=1,
+                                     stats=stats)
+    if not vehicles:
+        return None
+    
+    return {
+        'ghost_info': vehicles[0]['ghost_info'],
+        'ghost_samples': vehicles[0]['ghost_samples']
+    }
+
+
+def parse_record_vehicles(record_data, version, columnar=False, lazy=False, fields=None, trace=False,
+                          limit=None, stats=None):
+    """Parse every CSceneVehicleVis entity of a CPlugEntRecordData record.
+    
+    The record is framed once; the samples of each vehicle entity are then
+    decoded from that framing (see parse_record_data for the output modes).
+    
+    Args:
+        record_data: Decompressed inner record bytes
+        version: Record version
+        columnar, lazy, fields, trace, stats: See parse_record_data
+        limit: Stop after this many vehicle entities (None = all)
         
-        if len(record_data) == 0:
+    Returns:
+        list of dicts with 'entity' (index in the record's entity list and
+        entity type), 'ghost_info' and 'ghost_samples', one per vehicle
+        entity in record order; None if the record header is implausible
+    """
+    from .projection import make_sample_decoder, validate_fields
+    fields = validate_fields(fields)
+    decode_sample = make_sample_decoder(fields)
+    if stats is None:
+        stats = NO_STATS
+    
+    view = memoryview(record_data)
+    
+    with stats.stage('framing', len(record_data)):
+        record_header = _read_record_header(view)
+        if record_header is None:
+            stats.fail(_stats.BAD_RECORD, "implausible record header")
             return None
+        start_time, end_time, ent_record_descs, notice_record_descs, offset = record_header
         
-        # Parse the record data (version 10 format confirmed working)
-        return parse_record_data(record_data, version)
+        # Entity list: frame all entities, then decode the CSceneVehicleVis ones (0x0A018000)
+        if version >= 11:
+            entities = list(_iter_column_entities(view, offset))
+        else:
+            entities = _read_entities(view, offset)
     
-    except (struct.error, IOError, ValueError, EOFError):
-        return None
+    vehicles = []
+    for index, entity in enumerate(entities):
+        if _entity_class_id(entity['type'], ent_record_descs) != VEHICLE_VIS_CLASS_ID:
+            continue
+        if limit is not None and len(vehicles) >= limit:
+            break
+        
+        with stats.stage('sample_decode') as stage:
+            ghost_samples, num_samples, sample_refs = _decode_vehicle_entity(
+                record_data, view, version, entity, columnar, lazy, fields, trace, decode_sample)
+            stage.bytes_in = num_samples * VEHICLE_VIS_SAMPLE_SIZE
+        # Samples that aren't 107 bytes are dropped by every decoder
+        skipped = len(sample_refs) - num_samples
+        stats.add_samples(num_samples, skipped)
+        if skipped and not num_samples:
+            lengths = sorted({length for _, _, length in sample_refs})
+            stats.fail(_stats.BAD_SAMPLE_LENGTH, f"sample lengths {lengths}")
+        
+        vehicles.append({
+            'entity': {'index': index, 'type': entity['type']},
+            'ghost_info': {
+                'start_time': start_time,
+                'end_time': end_time,
+                'num_samples': num_samples,
+                'sample_period_ms': 50,  # TrackMania samples at 20Hz (50ms)
+                'version': version
+            },
+            'ghost_samples': ghost_samples
+        })
+    
+    if not vehicles:
+        stats.fail(_stats.NO_VEHICLE)
+    return vehicles
 
 
-def parse_record_data(record_data, version):
-    """Parse CPlugEntRecordData inner record data.
+def _decode_vehicle_entity(record_data, view, version, entity, columnar, lazy, fields, trace,
+                           decode_sample):
+    """Decode the samples of one framed vehicle entity.
+    
+    Returns:
+        (samples, number decoded, (time_ms, offset, length) sample references)
+    """
+    if version >= 11:
+        # Rebuild the row-oriented sample buffer from the delta-encoded columns
+        record_data, sample_refs = _decode_column_entity(view, entity)
+        view = memoryview(record_data)
+    else:
+        sample_refs = entity['samples']
+    
+    # Parse CSceneVehicleVis samples (107 bytes each)
+    if columnar:
+        from .vectorized import decode_vehicle_vis_samples
+        ghost_samples = decode_vehicle_vis_samples(record_data, sample_refs, fields)
+        num_samples = sum(1 for _, _, length in sample_refs if length == VEHICLE_VIS_SAMPLE_SIZE)
+    elif lazy:
+        from .samples import GhostSamples
+        ghost_samples = GhostSamples(record_data, sample_refs, decoder=decode_sample)
+        num_samples = len(ghost_samples)
+    else:
+        if trace:
+            from .trace import GhostTrace
+            ghost_samples = GhostTrace(fields)
+        else:
+            ghost_samples = []
+        for time_ms, sample_offset, sample_length in sample_refs:
+            parsed_sample = decode_sample(time_ms, view[sample_offset:sample_offset + sample_length])
+            if parsed_sample:
+                ghost_samples.append(parsed_sample)
+        num_samples = len(ghost_samples)
+    
+    return ghost_samples, num_samples, sample_refs
+
+
+def iter_record_samples(record_data, fields=None, version=10):
+    """Yield decoded CSceneVehicleVis samples while framing the record.
+    
+    Samples of the first vehicle entity are decoded as soon as they are framed
+    and nothing is accumulated, so memory stays flat however long the ghost is.
+    Framing stops once that entity ends. A record that turns out to be
+    truncated or malformed ends the iteration early. Version 11 records store
+    an entity's samples column-wise, so its sample buffer is rebuilt in one
+    step before the samples are decoded.
     
     Args:
         record_data: Decompressed inner record bytes
+        fields: Only decode these sample fields (see tm_gbx.projection)
         version: Record version
         
+    Yields:
+        dict with all 52 telemetry fields (or the requested fields) per sample
+    """
+    from .projection import make_sample_decoder
+    decode_sample = make_sample_decoder(fields)
+    
+    view = memoryview(record_data)
+    
+    try:
+        record_header = _read_record_header(view)
+        if record_header is None:
+            return
+        ent_record_descs = record_header[2]
+        
+        if version >= 11:
+            for entity in _iter_column_entities(view, record_header[-1]):
+                if _entity_class_id(entity['type'], ent_record_descs) == VEHICLE_VIS_CLASS_ID:
+                    rows, sample_refs = _decode_column_entity(view, entity)
+                    rows = memoryview(rows)
+                    for time_ms, offset, length in sample_refs:
+                        parsed_sample = decode_sample(time_ms, rows[offset:offset + length])
+                        if parsed_sample:
+                            yield parsed_sample
+                    return
+            return
+        
+        in_vehicle = False
+        for event in _iter_entity_events(view, record_header[-1]):
+            kind = event[0]
+            if kind == _SAMPLE:
+                if in_vehicle:
+                    _, time_ms, offset, length = event
+                    parsed_sample = decode_sample(time_ms, view[offset:offset + length])
+                    if parsed_sample:
+                        yield parsed_sample
+            elif kind == _ENTITY:
+                in_vehicle = _entity_class_id(event[1], ent_record_descs) == VEHICLE_VIS_CLASS_ID
+            elif in_vehicle:
+                return
+    
+    except (struct.error, ValueError, EOFError, IndexError):
+        return
+
+
+def _entity_class_id(entity_type, ent_record_descs):
+    """Class ID of an entity whose type is an index into the descriptor table.
+    
+    Types outside the table are taken to be class IDs themselves.
+    """
+    if 0 <= entity_type < len(ent_record_descs):
+        return ent_record_descs[entity_type]['class_id']
+    return entity_type
+
+
+def _read_record_header(view):
+    """Frame start/end times, entity descriptors and notice descriptors.
+    
     Returns:
-        dict with ghost_info and ghost_samples
+        (start_time, end_time, ent_record_descs, notice_record_descs, offset)
+        with offset at the start of the entity list, or None if implausible
     """
-    f = io.BytesIO(record_data)
+    end = len(view)
     
     # Read start_time and end_time (i32)
-    start_time = read_int32(f)
-    end_time = read_int32(f)
+    start_time, end_time = _RECORD_TIMES.unpack_from(view, 0)
+    offset = _RECORD_TIMES.size
     
     # EntRecordDescs array
-    ent_record_descs_count = read_uint32(f)
+    ent_record_descs_count, = _U32.unpack_from(view, offset)
+    offset += 4
     
     # Sanity check
     if ent_record_descs_count > 10000:
@@ -102,31 +437,32 @@ def parse_record_data(record_data, version):
     
     ent_record_descs = []
     for _ in range(ent_record_descs_count):
-        # Each desc: classId (u32), sampleSize (i32), int, int, ReadData (i32 length + bytes), int
-        class_id = read_uint32(f)
-        sample_size = read_int32(f)
-        u01 = read_int32(f)
-        u02 = read_int32(f)
-        
-        # ReadData: length + bytes
-        data_length = read_uint32(f)
-        data_bytes = f.read(data_length)
-        if len(data_bytes) != data_length:
+        # Each desc: classId (u32), sampleSize (i32), int, int, ReadData (u32 length + bytes), int
+        class_id, sample_size, u01, u02, data_length = _ENT_DESC_HEAD.unpack_from(view, offset)
+        offset += _ENT_DESC_HEAD.size
+        
+        # Skip the descriptor payload
+        data_offset = offset
+        offset += data_length
+        if offset > end:
             return None
         
-        u03 = read_int32(f)
+        u03, = _U32.unpack_from(view, offset)
+        offset += 4
         
         ent_record_descs.append({
             'class_id': class_id,
             'sample_size': sample_size,
             'u01': u01,
             'u02': u02,
-            'data': data_bytes,
+            'data_offset': data_offset,
+            'data_length': data_length,
             'u03': u03
         })
     
     # NoticeRecordDescs array
-    notice_record_descs_count = read_uint32(f)
+    notice_record_descs_count, = _U32.unpack_from(view, offset)
+    offset += 4
     
     if notice_record_descs_count > 10000:
         return None
@@ -134,9 +470,8 @@ def parse_record_data(record_data, version):
     notice_record_descs = []
     for _ in range(notice_record_descs_count):
         # Each notice: int, int, classId (u32) — 12 bytes total
-        u01 = read_int32(f)
-        u02 = read_int32(f)
-        class_id = read_uint32(f)
+        u01, u02, class_id = _NOTICE_DESC.unpack_from(view, offset)
+        offset += _NOTICE_DESC.size
         
         notice_record_descs.append({
             'u01': u01,
@@ -144,119 +479,236 @@ def parse_record_data(record_data, version):
             'class_id': class_id
         })
     
-    # Entity list: parse entities looking for CSceneVehicleVis (0x0A018000)
-    entities = []
+    return start_time, end_time, ent_record_descs, notice_record_descs, offset
+
+
+def _iter_entity_events(view, offset):
+    """Walk the entity list, yielding _ENTITY, _SAMPLE and _ENTITY_END events.
     
-    while True:
-        # ReadByte sentinel
-        has_entity = read_uint8(f)
-        if has_entity != 1:
-            break
-        
-        # Read entity type (i32)
-        entity_type = read_int32(f)
-        
-        # u01-u04 (4x i32)
-        u01 = read_int32(f)
-        u02 = read_int32(f)
-        u03 = read_int32(f)
-        u04 = read_int32(f)
+    Sample payloads are yielded as offsets into view, never copied.
+    Raises EOFError (or IndexError/struct.error) on a truncated record.
+    """
+    end = len(view)
+    
+    # ReadByte sentinel before the first entity; after that, each entity's
+    # hasNext byte tells whether another entity follows
+    has_entity = view[offset]
+    offset += 1
+    
+    while has_entity == 1:
+        # Entity type (i32), u01-u04 (4x i32)
+        yield (_ENTITY,) + _ENTITY_HEAD.unpack_from(view, offset)
+        offset += _ENTITY_HEAD.size
         
         # Samples: while ReadByte() == 1: time (i32) + ReadData
-        samples = []
         while True:
-            has_sample = read_uint8(f)
+            has_sample = view[offset]
+            offset += 1
             if has_sample != 1:
                 break
             
-            time_ms = read_int32(f)
-            
-            # ReadData: length + bytes
-            sample_length = read_uint32(f)
-            sample_data = f.read(sample_length)
-            if len(sample_data) != sample_length:
-                break
+            time_ms, sample_length = _SAMPLE_HEAD.unpack_from(view, offset)
+            offset += _SAMPLE_HEAD.size
             
-            samples.append({
-                'time_ms': time_ms,
-                'data': sample_data
-            })
+            # Reference the payload instead of copying it
+            if offset + sample_length > end:
+                raise EOFError(f"Failed to read sample data of length {sample_length}")
+            yield _SAMPLE, time_ms, offset, sample_length
+            offset += sample_length
         
         # hasNext byte
-        has_next = read_uint8(f)
+        has_next = view[offset]
+        offset += 1
         
-        # Samples2: while ReadByte() == 1: i32, i32, ReadData
+        # Samples2: while ReadByte() == 1: i32, i32, ReadData (payload skipped)
         samples2 = []
         while True:
-            has_sample2 = read_uint8(f)
+            has_sample2 = view[offset]
+            offset += 1
             if has_sample2 != 1:
                 break
             
-            val1 = read_int32(f)
-            val2 = read_int32(f)
+            val1, val2, data_length = _SAMPLE2_HEAD.unpack_from(view, offset)
+            offset += _SAMPLE2_HEAD.size
             
-            # ReadData
-            data_length = read_uint32(f)
-            data_bytes = f.read(data_length)
-            if len(data_bytes) != data_length:
-                break
-            
-            samples2.append({
-                'val1': val1,
-                'val2': val2,
-                'data': data_bytes
-            })
+            if offset + data_length > end:
+                raise EOFError(f"Failed to read data of length {data_length}")
+            samples2.append((val1, val2, offset, data_length))
+            offset += data_length
         
-        entities.append({
+        yield _ENTITY_END, has_next, samples2
+        has_entity = has_next
+
+
+def _read_entities(view, offset):
+    """Collect the entities of a per-sample tagged (version <= 10) entity list."""
+    entities = []
+    entity = None  # entity whose events are being read
+    
+    for event in _iter_entity_events(view, offset):
+        kind = event[0]
+        if kind == _ENTITY:
+            if entity is not None:
+                raise ValueError("entity started before the previous one ended")
+            entity = {
+                'type': event[1],
+                'u01': event[2],
+                'u02': event[3],
+                'u03': event[4],
+                'u04': event[5],
+                'samples': []
+            }
+        elif entity is None:
+            raise ValueError("entity list event outside an entity")
+        elif kind == _SAMPLE:
+            entity['samples'].append(event[1:])
+        else:
+            entity['has_next'] = event[1]
+            entity['samples2'] = event[2]
+            entities.append(entity)
+            entity = None
+    
+    return entities
+
+
+def _iter_column_entities(view, offset):
+    """Walk a version 11 entity list of column-oriented entities.
+    
+    Each entity is a header, num_samples - 1 u32 time deltas and num_keys
+    delta-encoded byte columns of num_samples bytes; the next entity follows
+    immediately. Columns are located but not decoded.
+    Raises EOFError (or IndexError/struct.error) on a truncated record.
+    """
+    end = len(view)
+    
+    while view[offset] == 1:
+        offset += 1
+        (entity_type, flags, start, end_time, u01,
+         num_samples, num_keys, u02) = _COLUMN_ENTITY_HEAD.unpack_from(view, offset)
+        offset += _COLUMN_ENTITY_HEAD.size
+        
+        times_offset = offset
+        offset += 4 * max(num_samples - 1, 0)
+        columns_offset = offset
+        offset += num_samples * num_keys
+        if offset > end:
+            raise EOFError(f"Failed to read {num_samples} samples of {num_keys} columns")
+        
+        yield {
             'type': entity_type,
+            'flags': flags,
+            'start': start,
+            'end': end_time,
             'u01': u01,
             'u02': u02,
-            'u03': u03,
-            'u04': u04,
-            'samples': samples,
-            'has_next': has_next,
-            'samples2': samples2
-        })
+            'num_samples': num_samples,
+            'num_keys': num_keys,
+            'times_offset': times_offset,
+            'columns_offset': columns_offset,
+        }
+
+
+def _decode_column_entity(view, entity):
+    """Rebuild the row-oriented samples of a column-oriented entity.
     
-    # Find CSceneVehicleVis entity (classId 0x0A018000)
-    vehicle_entity = None
-    for entity in entities:
-        if entity['type'] == 0x0A018000:
-            vehicle_entity = entity
-            break
+    Column 0 holds absolute byte values and every later byte is a signed
+    delta to its predecessor, so each column is a running byte sum (mod 256).
+    The sums are taken over all columns at once and transposed into rows.
     
-    if not vehicle_entity:
-        return None
+    Returns:
+        (rows, sample_refs) - rows holds num_samples rows of num_keys bytes,
+        sample_refs are (time_ms, offset, 107) references into it
+    """
+    num_samples = entity['num_samples']
+    num_keys = entity['num_keys']
+    if num_samples == 0 or num_keys < VEHICLE_VIS_SAMPLE_SIZE:
+        return b'', []
     
-    # Parse CSceneVehicleVis samples (107 bytes each)
-    ghost_samples = []
-    for sample in vehicle_entity['samples']:
-        parsed_sample = parse_vehicle_vis_sample(sample['time_ms'], sample['data'])
-        if parsed_sample:
-            ghost_samples.append(parsed_sample)
-    
-    ghost_info = {
-        'start_time': start_time,
-        'end_time': end_time,
-        'num_samples': len(ghost_samples),
-        'sample_period_ms': 50,  # TrackMania samples at 20Hz (50ms)
-        'version': version
-    }
+    times_offset = entity['times_offset']
+    deltas = struct.unpack_from(f'<{num_samples - 1}I', view, times_offset)
+    times = accumulate(chain((entity['start'],), deltas))
     
-    return {
-        'ghost_info': ghost_info,
-        'ghost_samples': ghost_samples
-    }
+    columns = view[entity['columns_offset']:entity['columns_offset'] + num_samples * num_keys]
+    if np is not None:
+        sums = np.cumsum(np.frombuffer(columns, np.uint8).reshape(num_keys, num_samples),
+                         axis=1, dtype=np.uint8)
+        rows = sums.T.tobytes()
+    else:
+        rows = bytearray(num_samples * num_keys)
+        for key in range(num_keys):
+            column = columns[key * num_samples:(key + 1) * num_samples]
+            rows[key::num_keys] = bytes(accumulate(column, _add_byte))
+    
+    sample_refs = [(time_ms, index * num_keys, VEHICLE_VIS_SAMPLE_SIZE)
+                   for index, time_ms in enumerate(times)]
+    return rows, sample_refs
+
+
+def _add_byte(total, delta):
+    return (total + delta) & 0xFF
+
+
+# CSceneVehicleVis sample layout (107 bytes), read in a single unpack_from call.
+# Pad bytes ('x') skip the parts of the sample that are not decoded.
+VEHICLE_VIS_STRUCT = struct.Struct(
+    '<'
+    '2x'      # 0-1
+    'H'       # 2-3: SideSpeed
+    'x'       # 4
+    'B'       # 5: RPM
+    '8B'      # 6-13: Wheel rotation + count (FL, FR, RR, RL)
+    'B'       # 14: Steer
+    'B'       # 15: Gas
+    '2x'      # 16-17
+    'B'       # 18: Brake
+    '2x'      # 19-20
+    'B'       # 21: TurboTime
+    'x'       # 22
+    '8B'      # 23-30: DampenLen + GroundContactMaterial (FL, FR, RR, RL)
+    'B'       # 31: IsTurbo
+    '2B'      # 32-33: SlipCoef bytes
+    '13x'     # 34-46
+    '3f'      # 47-58: Position
+    'H'       # 59-60: Angle
+    'h'       # 61-62: AxisHeading
+    'h'       # 63-64: AxisPitch
+    'h'       # 65-66: Speed
+    'b'       # 67: VelocityHeading
+    'b'       # 68: VelocityPitch
+    '7x'      # 69-75
+    'B'       # 76: IsTopContact
+    '4x'      # 77-80
+    '4B'      # 81-84: Ice (FL, FR, RR, RL)
+    '4x'      # 85-88
+    'B'       # 89: GroundContact/Reactor flags
+    'B'       # 90: ReactorAirControl
+    'B'       # 91: Gear
+    'x'       # 92
+    'B'       # 93: Dirt FL
+    'x'       # 94
+    'B'       # 95: Dirt FR
+    'x'       # 96
+    'B'       # 97: Dirt RR
+    'x'       # 98
+    'B'       # 99: Dirt RL
+    'x'       # 100
+    'B'       # 101: Wetness
+    'B'       # 102: SimulationTimeCoef
+    '4x'      # 103-106
+)
+
+_TWO_PI = 2 * math.pi
 
 
 def parse_vehicle_vis_sample(time_ms, sample_data):
     """Parse a CSceneVehicleVis sample (107 bytes).
     
     Based on CSceneVehicleVis.cs from gbx-net reference implementation.
+    All raw fields are read with one precompiled VEHICLE_VIS_STRUCT.unpack_from().
     
     Args:
         time_ms: Sample timestamp in milliseconds
-        sample_data: 107-byte sample data
+        sample_data: 107-byte sample data (bytes, bytearray or memoryview)
         
     Returns:
         dict with all 52 telemetry fields
@@ -265,289 +717,137 @@ def parse_vehicle_vis_sample(time_ms, sample_data):
         return None
     
     try:
-        # Helper to read specific bytes
-        def read_u8(offset):
-            return sample_data[offset]
-        
-        def read_i8(offset):
-            return struct.unpack('b', sample_data[offset:offset+1])[0]
-        
-        def read_u16(offset):
-            return struct.unpack('<H', sample_data[offset:offset+2])[0]
-        
-        def read_i16(offset):
-            return struct.unpack('<h', sample_data[offset:offset+2])[0]
-        
-        def read_f32(offset):
-            return struct.unpack('<f', sample_data[offset:offset+4])[0]
-        
-        # Position & Transform (ReadTransform at byte offset 47)
-        # Bytes 47-58: Vec3 position (3x f32)
-        x = read_f32(47)
-        y = read_f32(51)
-        z = read_f32(55)
-        
-        # Bytes 59-60: angle (u16) → angle * π / 65535
-        angle_raw = read_u16(59)
-        angle = angle_raw * math.pi / 65535.0
-        
-        # Bytes 61-62: axisHeading (i16) → axisHeading * π / 32767
-        axis_heading_raw = read_i16(61)
-        axis_heading = axis_heading_raw * math.pi / 32767.0
-        
-        # Bytes 63-64: axisPitch (i16) → axisPitch / 32767 * π/2
-        axis_pitch_raw = read_i16(63)
-        axis_pitch = (axis_pitch_raw / 32767.0) * (math.pi / 2.0)
-        
-        # Bytes 65-66: speed (i16) → exp(speed / 1000.0)
-        speed_raw = read_i16(65)
-        speed = math.exp(speed_raw / 1000.0)
-        
-        # Bytes 67: velocityHeading (i8) → velHeading / 127 * π
-        vel_heading_raw = read_i8(67)
-        vel_heading = (vel_heading_raw / 127.0) * math.pi
-        
-        # Bytes 68: velocityPitch (i8) → velPitch / 127 * π/2
-        vel_pitch_raw = read_i8(68)
-        vel_pitch = (vel_pitch_raw / 127.0) * (math.pi / 2.0)
-        
-        # Quaternion from axis-angle
-        ax = math.sin(angle) * math.cos(axis_pitch) * math.cos(axis_heading)
-        ay = math.sin(angle) * math.cos(axis_pitch) * math.sin(axis_heading)
-        az = math.sin(angle) * math.sin(axis_pitch)
-        qw = math.cos(angle)
-        
-        # Convert quaternion to Euler angles (pitch, yaw, roll in degrees)
-        # Using standard aerospace convention
-        sinr_cosp = 2.0 * (qw * ax + ay * az)
-        cosr_cosp = 1.0 - 2.0 * (ax * ax + ay * ay)
-        roll = math.atan2(sinr_cosp, cosr_cosp)
-        
-        sinp = 2.0 * (qw * ay - az * ax)
-        if abs(sinp) >= 1:
-            pitch = math.copysign(math.pi / 2, sinp)
-        else:
-            pitch = math.asin(sinp)
-        
-        siny_cosp = 2.0 * (qw * az + ax * ay)
-        cosy_cosp = 1.0 - 2.0 * (ay * ay + az * az)
-        yaw = math.atan2(siny_cosp, cosy_cosp)
-        
-        # Convert to degrees
-        pitch_deg = math.degrees(pitch)
-        yaw_deg = math.degrees(yaw)
-        roll_deg = math.degrees(roll)
-        
-        # Velocity vector
-        vel_x = speed * math.cos(vel_pitch) * math.cos(vel_heading)
-        vel_y = speed * math.cos(vel_pitch) * math.sin(vel_heading)
-        vel_z = speed * math.sin(vel_pitch)
-        
-        # Individual byte fields
-        # Byte 2-3: SideSpeed (u16) → ((val / 65536) - 0.5) * 2000
-        side_speed_raw = read_u16(2)
-        side_speed = ((side_speed_raw / 65536.0) - 0.5) * 2000.0
-        
-        # Byte 5: RPM (u8)
-        rpm = read_u8(5)
-        
-        # Bytes 6-13: Wheel rotation (FL rot, FL count, FR rot, FR count, RR rot, RR count, RL rot, RL count)
-        # Formula: (rot/255 * 2π) + (count * 2π)
-        fl_wheel_rot_raw = read_u8(6)
-        fl_wheel_count = read_u8(7)
-        fl_wheel_rot = (fl_wheel_rot_raw / 255.0) * (2 * math.pi) + (fl_wheel_count * 2 * math.pi)
-        
-        fr_wheel_rot_raw = read_u8(8)
-        fr_wheel_count = read_u8(9)
-        fr_wheel_rot = (fr_wheel_rot_raw / 255.0) * (2 * math.pi) + (fr_wheel_count * 2 * math.pi)
-        
-        rr_wheel_rot_raw = read_u8(10)
-        rr_wheel_count = read_u8(11)
-        rr_wheel_rot = (rr_wheel_rot_raw / 255.0) * (2 * math.pi) + (rr_wheel_count * 2 * math.pi)
-        
-        rl_wheel_rot_raw = read_u8(12)
-        rl_wheel_count = read_u8(13)
-        rl_wheel_rot = (rl_wheel_rot_raw / 255.0) * (2 * math.pi) + (rl_wheel_count * 2 * math.pi)
-        
-        # Byte 14: Steer (u8) → ((val / 255) - 0.5) * 2
-        steer_raw = read_u8(14)
-        steer = ((steer_raw / 255.0) - 0.5) * 2.0
-        
-        # Byte 18: Brake (u8) → val / 255
-        brake_raw = read_u8(18)
-        brake = brake_raw / 255.0
-        
-        # Byte 15: Gas component (u8) → val / 255 + brake
-        gas_raw = read_u8(15)
-        gas = (gas_raw / 255.0) + brake
-        
-        # Byte 21: TurboTime (u8) → val / 255
-        turbo_time_raw = read_u8(21)
-        turbo_time = turbo_time_raw / 255.0
-        
-        # Bytes 23,25,27,29: DampenLen FL,FR,RR,RL → ((val / 255) - 0.5) * 4
-        fl_dampen_raw = read_u8(23)
-        fl_dampen = ((fl_dampen_raw / 255.0) - 0.5) * 4.0
-        
-        fr_dampen_raw = read_u8(25)
-        fr_dampen = ((fr_dampen_raw / 255.0) - 0.5) * 4.0
-        
-        rr_dampen_raw = read_u8(27)
-        rr_dampen = ((rr_dampen_raw / 255.0) - 0.5) * 4.0
-        
-        rl_dampen_raw = read_u8(29)
-        rl_dampen = ((rl_dampen_raw / 255.0) - 0.5) * 4.0
-        
-        # Bytes 24,26,28,30: GroundContactMaterial FL,FR,RR,RL (u8 raw)
-        fl_ground_mat = read_u8(24)
-        fr_ground_mat = read_u8(26)
-        rr_ground_mat = read_u8(28)
-        rl_ground_mat = read_u8(30)
-        
-        # Byte 31: IsTurbo → (val & 0x82) != 0
-        is_turbo_raw = read_u8(31)
-        is_turbo = (is_turbo_raw & 0x82) != 0
-        
-        # Bytes 32,33: SlipCoef → FL: byte1 & 0x40, FR: byte2 & 0x01, RR: byte2 & 0x04, RL: byte2 & 0x10
-        slip_byte1 = read_u8(32)
-        slip_byte2 = read_u8(33)
-        fl_slip = (slip_byte1 & 0x40) != 0
-        fr_slip = (slip_byte2 & 0x01) != 0
-        rr_slip = (slip_byte2 & 0x04) != 0
-        rl_slip = (slip_byte2 & 0x10) != 0
-        
-        # Byte 76: IsTopContact → (val & 0x20) != 0
-        is_top_contact_raw = read_u8(76)
-        is_top_contact = (is_top_contact_raw & 0x20) != 0
-        
-        # Bytes 81-84: Ice FL,FR,RR,RL → val / 255
-        fl_ice_raw = read_u8(81)
-        fl_ice = fl_ice_raw / 255.0
-        
-        fr_ice_raw = read_u8(82)
-        fr_ice = fr_ice_raw / 255.0
-        
-        rr_ice_raw = read_u8(83)
-        rr_ice = rr_ice_raw / 255.0
-        
-        rl_ice_raw = read_u8(84)
-        rl_ice = rl_ice_raw / 255.0
-        
-        # Byte 89: GroundContact/Reactor flags
-        reactor_flags = read_u8(89)
-        is_ground_contact = (reactor_flags & 0x01) != 0
-        reactor_ground = (reactor_flags & 0x04) != 0
-        reactor_up = (reactor_flags & 0x08) != 0
-        reactor_down = (reactor_flags & 0x10) != 0
-        reactor_lvl1 = (reactor_flags & 0x20) != 0
-        reactor_lvl2 = (reactor_flags & 0x40) != 0
-        
-        # Combine reactor flags into state and boost
+        (side_speed_raw, rpm,
+         fl_wheel_rot_raw, fl_wheel_count, fr_wheel_rot_raw, fr_wheel_count,
+         rr_wheel_rot_raw, rr_wheel_count, rl_wheel_rot_raw, rl_wheel_count,
+         steer_raw, gas_raw, brake_raw, turbo_time_raw,
+         fl_dampen_raw, fl_ground_mat, fr_dampen_raw, fr_ground_mat,
+         rr_dampen_raw, rr_ground_mat, rl_dampen_raw, rl_ground_mat,
+         is_turbo_raw, slip_byte1, slip_byte2,
+         x, y, z,
+         angle_raw, axis_heading_raw, axis_pitch_raw, speed_raw,
+         vel_heading_raw, vel_pitch_raw,
+         is_top_contact_raw,
+         fl_ice_raw, fr_ice_raw, rr_ice_raw, rl_ice_raw,
+         reactor_flags, reactor_control, gear_raw,
+         fl_dirt_raw, fr_dirt_raw, rr_dirt_raw, rl_dirt_raw,
+         wetness_raw, sim_time_coef_raw) = VEHICLE_VIS_STRUCT.unpack_from(sample_data)
+    except struct.error:
+        return None
+    
+    # Transform: angle * π / 65535, axisHeading * π / 32767, axisPitch / 32767 * π/2
+    angle = angle_raw * math.pi / 65535.0
+    axis_heading = axis_heading_raw * math.pi / 32767.0
+    axis_pitch = (axis_pitch_raw / 32767.0) * (math.pi / 2.0)
+    
+    # Speed: exp(speed / 1000.0); velocity heading/pitch: i8 / 127 * π (π/2)
+    speed = math.exp(speed_raw / 1000.0)
+    vel_heading = (vel_heading_raw / 127.0) * math.pi
+    vel_pitch = (vel_pitch_raw / 127.0) * (math.pi / 2.0)
+    
+    # Quaternion from axis-angle
+    sin_angle = math.sin(angle)
+    cos_axis_pitch = math.cos(axis_pitch)
+    ax = sin_angle * cos_axis_pitch * math.cos(axis_heading)
+    ay = sin_angle * cos_axis_pitch * math.sin(axis_heading)
+    az = sin_angle * math.sin(axis_pitch)
+    qw = math.cos(angle)
+    
+    # Convert quaternion to Euler angles (pitch, yaw, roll in degrees)
+    # Using standard aerospace convention
+    roll = math.atan2(2.0 * (qw * ax + ay * az), 1.0 - 2.0 * (ax * ax + ay * ay))
+    
+    sinp = 2.0 * (qw * ay - az * ax)
+    if abs(sinp) >= 1:
+        pitch = math.copysign(math.pi / 2, sinp)
+    else:
+        pitch = math.asin(sinp)
+    
+    yaw = math.atan2(2.0 * (qw * az + ax * ay), 1.0 - 2.0 * (ay * ay + az * az))
+    
+    # Velocity vector
+    cos_vel_pitch = math.cos(vel_pitch)
+    vel_x = speed * cos_vel_pitch * math.cos(vel_heading)
+    vel_y = speed * cos_vel_pitch * math.sin(vel_heading)
+    vel_z = speed * math.sin(vel_pitch)
+    
+    # Brake: val / 255; Gas: val / 255 + brake
+    brake = brake_raw / 255.0
+    
+    # Reactor flags → state and boost
+    if reactor_flags & 0x04:
+        reactor_state = 1
+    elif reactor_flags & 0x08:
+        reactor_state = 2
+    elif reactor_flags & 0x10:
+        reactor_state = 3
+    else:
         reactor_state = 0
-        if reactor_ground:
-            reactor_state = 1
-        elif reactor_up:
-            reactor_state = 2
-        elif reactor_down:
-            reactor_state = 3
-        
+    
+    if reactor_flags & 0x20:
+        reactor_boost = 1
+    elif reactor_flags & 0x40:
+        reactor_boost = 2
+    else:
         reactor_boost = 0
-        if reactor_lvl1:
-            reactor_boost = 1
-        elif reactor_lvl2:
-            reactor_boost = 2
-        
-        # Byte 90: ReactorAirControl
-        reactor_control = read_u8(90)
-        reactor_pedal_accel = (reactor_control & 0x20) != 0
-        reactor_pedal_none = (reactor_control & 0x10) != 0
-        reactor_steer_left = (reactor_control & 0x80) != 0
-        reactor_steer_none = (reactor_control & 0x40) != 0
-        
-        # Encode reactor pedal and steer as integers
-        reactor_pedal = 1 if reactor_pedal_accel else (0 if reactor_pedal_none else -1)
-        reactor_steer = -1 if reactor_steer_left else (0 if reactor_steer_none else 1)
-        
-        # Byte 91: Gear → val / 5.0
-        gear_raw = read_u8(91)
-        gear = gear_raw / 5.0
-        
-        # Bytes 93,95,97,99: Dirt FL,FR,RR,RL → val / 255
-        fl_dirt_raw = read_u8(93)
-        fl_dirt = fl_dirt_raw / 255.0
-        
-        fr_dirt_raw = read_u8(95)
-        fr_dirt = fr_dirt_raw / 255.0
-        
-        rr_dirt_raw = read_u8(97)
-        rr_dirt = rr_dirt_raw / 255.0
-        
-        rl_dirt_raw = read_u8(99)
-        rl_dirt = rl_dirt_raw / 255.0
-        
-        # Byte 101: Wetness → val / 255
-        wetness_raw = read_u8(101)
-        wetness = wetness_raw / 255.0
-        
-        # Byte 102: SimulationTimeCoef → val / 255
-        sim_time_coef_raw = read_u8(102)
-        sim_time_coef = sim_time_coef_raw / 255.0
-        
-        # Return all 52 fields
-        return {
-            'time_ms': time_ms,
-            'time_s': time_ms / 1000.0,
-            'x': x,
-            'y': y,
-            'z': z,
-            'speed': speed,
-            'side_speed': side_speed,
-            'vel_x': vel_x,
-            'vel_y': vel_y,
-            'vel_z': vel_z,
-            'pitch_deg': pitch_deg,
-            'yaw_deg': yaw_deg,
-            'roll_deg': roll_deg,
-            'steer': steer,
-            'gas': gas,
-            'brake': brake,
-            'gear': gear,
-            'rpm': rpm,
-            'is_turbo': is_turbo,
-            'turbo_time': turbo_time,
-            'is_ground_contact': is_ground_contact,
-            'is_top_contact': is_top_contact,
-            'reactor_state': reactor_state,
-            'reactor_boost': reactor_boost,
-            'reactor_pedal': reactor_pedal,
-            'reactor_steer': reactor_steer,
-            'sim_time_coef': sim_time_coef,
-            'wetness': wetness,
-            'fl_dampen': fl_dampen,
-            'fr_dampen': fr_dampen,
-            'rr_dampen': rr_dampen,
-            'rl_dampen': rl_dampen,
-            'fl_ice': fl_ice,
-            'fr_ice': fr_ice,
-            'rr_ice': rr_ice,
-            'rl_ice': rl_ice,
-            'fl_dirt': fl_dirt,
-            'fr_dirt': fr_dirt,
-            'rr_dirt': rr_dirt,
-            'rl_dirt': rl_dirt,
-            'fl_slip': fl_slip,
-            'fr_slip': fr_slip,
-            'rr_slip': rr_slip,
-            'rl_slip': rl_slip,
-            'fl_ground_mat': fl_ground_mat,
-            'fr_ground_mat': fr_ground_mat,
-            'rr_ground_mat': rr_ground_mat,
-            'rl_ground_mat': rl_ground_mat,
-            'fl_wheel_rot': fl_wheel_rot,
-            'fr_wheel_rot': fr_wheel_rot,
-            'rr_wheel_rot': rr_wheel_rot,
-            'rl_wheel_rot': rl_wheel_rot
-        }
     
-    except (struct.error, ValueError, IndexError):
-        return None
+    # ReactorAirControl → pedal (1 accel, 0 none, -1 brake) and steer (-1 left, 0 none, 1 right)
+    reactor_pedal = 1 if reactor_control & 0x20 else (0 if reactor_control & 0x10 else -1)
+    reactor_steer = -1 if reactor_control & 0x80 else (0 if reactor_control & 0x40 else 1)
+    
+    # Return all 52 fields
+    return {
+        'time_ms': time_ms,
+        'time_s': time_ms / 1000.0,
+        'x': x,
+        'y': y,
+        'z': z,
+        'speed': speed,
+        'side_speed': ((side_speed_raw / 65536.0) - 0.5) * 2000.0,
+        'vel_x': vel_x,
+        'vel_y': vel_y,
+        'vel_z': vel_z,
+        'pitch_deg': math.degrees(pitch),
+        'yaw_deg': math.degrees(yaw),
+        'roll_deg': math.degrees(roll),
+        'steer': ((steer_raw / 255.0) - 0.5) * 2.0,
+        'gas': (gas_raw / 255.0) + brake,
+        'brake': brake,
+        'gear': gear_raw / 5.0,
+        'rpm': rpm,
+        'is_turbo': (is_turbo_raw & 0x82) != 0,
+        'turbo_time': turbo_time_raw / 255.0,
+        'is_ground_contact': (reactor_flags & 0x01) != 0,
+        'is_top_contact': (is_top_contact_raw & 0x20) != 0,
+        'reactor_state': reactor_state,
+        'reactor_boost': reactor_boost,
+        'reactor_pedal': reactor_pedal,
+        'reactor_steer': reactor_steer,
+        'sim_time_coef': sim_time_coef_raw / 255.0,
+        'wetness': wetness_raw / 255.0,
+        'fl_dampen': ((fl_dampen_raw / 255.0) - 0.5) * 4.0,
+        'fr_dampen': ((fr_dampen_raw / 255.0) - 0.5) * 4.0,
+        'rr_dampen': ((rr_dampen_raw / 255.0) - 0.5) * 4.0,
+        'rl_dampen': ((rl_dampen_raw / 255.0) - 0.5) * 4.0,
+        'fl_ice': fl_ice_raw / 255.0,
+        'fr_ice': fr_ice_raw / 255.0,
+        'rr_ice': rr_ice_raw / 255.0,
+        'rl_ice': rl_ice_raw / 255.0,
+        'fl_dirt': fl_dirt_raw / 255.0,
+        'fr_dirt': fr_dirt_raw / 255.0,
+        'rr_dirt': rr_dirt_raw / 255.0,
+        'rl_dirt': rl_dirt_raw / 255.0,
+        'fl_slip': (slip_byte1 & 0x40) != 0,
+        'fr_slip': (slip_byte2 & 0x01) != 0,
+        'rr_slip': (slip_byte2 & 0x04) != 0,
+        'rl_slip': (slip_byte2 & 0x10) != 0,
+        'fl_ground_mat': fl_ground_mat,
+        'fr_ground_mat': fr_ground_mat,
+        'rr_ground_mat': rr_ground_mat,
+        'rl_ground_mat': rl_ground_mat,
+        # Wheel rotation: (rot/255 * 2π) + (count * 2π)
+        'fl_wheel_rot': (fl_wheel_rot_raw / 255.0) * _TWO_PI + (fl_wheel_count * _TWO_PI),
+        'fr_wheel_rot': (fr_wheel_rot_raw / 255.0) * _TWO_PI + (fr_wheel_count * _TWO_PI),
+        'rr_wheel_rot': (rr_wheel_rot_raw / 255.0) * _TWO_PI + (rr_wheel_count * _TWO_PI),
+        'rl_wheel_rot': (rl_wheel_rot_raw / 255.0) * _TWO_PI + (rl_wheel_count * _TWO_PI),
+    }
@@ -0,0 +1,213 @@
+"""Incremental directory ingestion.
+
+A Manifest records path, size, mtime and content hash of every replay that
+has been ingested from a directory tree. scan_directory() compares the tree
+against it - files whose size and mtime are unchanged are not even read -
+and ingest_incremental() parses only replays whose content has not been seen
+before, so renamed and duplicated files are never parsed twice and a daily
+run costs time proportional to the new uploads.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import namedtuple
+
+from .batch import parse_many
+
+GBX_SUFFIX = '.gbx'
+MANIFEST_VERSION = 1
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def find_gbx_files(input_dir):
+    """Return all .Gbx files under input_dir (case-insensitive), sorted."""
+    paths = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(GBX_SUFFIX):
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+ManifestEntry = namedtuple('ManifestEntry', ['size', 'mtime', 'hash'])
+
+
+class Manifest:
+    """JSON manifest of ingested files: relative path -> (size, mtime, hash)."""
+
+    def __init__(self, path):
+        """Load the manifest at path (a missing file is an empty manifest)."""
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+
+        if data.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {data.get('version')!r}")
+        self.entries = {name: ManifestEntry(*entry) for name, entry in data['files'].items()}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def get(self, name):
+        return self.entries.get(name)
+
+    def hashes(self):
+        """Content hashes of all recorded files."""
+        return {entry.hash for entry in self.entries.values()}
+
+    def update(self, name, size, mtime, content_hash):
+        self.entries[name] = ManifestEntry(size, mtime, content_hash)
+
+    def remove(self, name):
+        self.entries.pop(name, None)
+
+    def save(self):
+        """Write the manifest atomically."""
+        data = {
+            'version': MANIFEST_VERSION,
+            'files': {name: list(entry) for name, entry in sorted(self.entries.items())},
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+# Result of comparing a directory tree with a manifest. new/changed hold
+# (relative path, size, mtime, hash) tuples for content that needs parsing;
+# moved holds the same for files whose content is already known (renames,
+# duplicates, touched files); removed lists paths no longer on disk.
+Delta = namedtuple('Delta', ['new', 'changed', 'moved', 'unchanged', 'removed'])
+
+
+class IngestItem(namedtuple('IngestItem', ['path', 'status', 'content_hash', 'result', 'error'])):
+    """One parsed file of the delta set.
+
+    Attributes:
+        path: Path of the replay
+        status: 'new' or 'changed'
+        content_hash: SHA-256 of the file contents
+        result: parse_gbx() output, or None if parsing failed
+        error: None on success, otherwise "ExceptionType: message"
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def scan_directory(input_dir, manifest):
+    """Compare a directory tree with the manifest.
+
+    Files whose size and mtime match their manifest entry are assumed unchanged
+    and are not read; every other file is hashed.
+
+    Returns:
+        Delta
+    """
+    new, changed, moved = [], [], []
+    unchanged = 0
+    known_hashes = manifest.hashes()
+    seen = set()
+    pending_hashes = set()
+
+    for path in find_gbx_files(input_dir):
+        name = os.path.relpath(path, input_dir)
+        seen.add(name)
+        stat = os.stat(path)
+        entry = manifest.get(name)
+
+        if entry is not None and entry.size == stat.st_size and entry.mtime == stat.st_mtime:
+            unchanged += 1
+            continue
+
+        content_hash = hash_file(path)
+        item = (name, stat.st_size, stat.st_mtime, content_hash)
+        if content_hash in known_hashes or content_hash in pending_hashes:
+            moved.append(item)
+        elif entry is None:
+            new.append(item)
+        else:
+            changed.append(item)
+        pending_hashes.add(content_hash)
+
+    removed = sorted(name for name in manifest.entries if name not in seen)
+    return Delta(new, changed, moved, unchanged, removed)
+
+
+def ingest_incremental(input_dir, manifest_path, workers=1, **parse_kwargs):
+    """Parse only the new or changed replays of a directory tree.
+
+    Content that is already in the manifest (renamed, duplicated or touched
+    files) is recorded without being parsed, and removed files are dropped
+    from the manifest. Each yielded file is recorded once the consumer asks
+    for the next item, and the manifest is saved when iteration ends (also
+    when the consumer stops early), so a file is only marked as ingested after
+    it has been processed. Files that fail to parse are yielded with an error
+    and not recorded, so they are retried on the next run.
+
+    Args:
+        input_dir: Directory tree of .Gbx files
+        manifest_path: Manifest JSON file (created if missing)
+        workers: Worker processes for parsing (see parse_many)
+        **parse_kwargs: Passed to parse_many (e.g. ordered=False) and parse_gbx
+
+    Yields:
+        IngestItem(path, status, content_hash, result, error) with status
+        'new' or 'changed'
+    """
+    manifest = Manifest(manifest_path)
+    delta = scan_directory(input_dir, manifest)
+    known_hashes = manifest.hashes()
+
+    for name in delta.removed:
+        manifest.remove(name)
+
+    # Results are matched to their files by path, so they may arrive in any order (ordered=False)
+    todo = {os.path.join(input_dir, name): (name, size, mtime, content_hash, status)
+            for status, items in (('new', delta.new), ('changed', delta.changed))
+            for name, size, mtime, content_hash in items}
+    results = parse_many(list(todo), workers=workers, **parse_kwargs)
+
+    try:
+        for parsed in results:
+            name, size, mtime, content_hash, status = todo[parsed.path]
+            yield IngestItem(parsed.path, status, content_hash, parsed.result, parsed.error)
+            if parsed.ok:
+                manifest.update(name, size, mtime, content_hash)
+    finally:
+        results.close()
+
+        # Copies of known content are recorded once that content is ingested
+        known_hashes |= manifest.hashes()
+        for name, size, mtime, content_hash in delta.moved:
+            if content_hash in known_hashes:
+                manifest.update(name, size, mtime, content_hash)
+        manifest.save()
@@ -3,90 +3,484 @@
 Pure-Python parser for TrackMania 2020 replay files (.Gbx).
 """
 
+import io
+import mmap
+import os
+import struct
 import zlib
 from .header import parse_header
-from .ghost import parse_ghost_from_body
+from .ghost import (
+    extract_records, iter_record_samples, parse_record_data, parse_record_vehicles,
+)
+from .body import walk_to_record
+from .compression import body_codec_name, get_codec, is_zlib_header
+from .projection import make_sample_decoder, validate_fields
 from .reader import read_int32, read_uint32, read_string
+from . import stats as _stats
+from .stats import NO_STATS
+from .streaming import BufferMeter, InflateReader, iter_stream_record_samples
 
 
-def parse_gbx(filepath):
+# Files smaller than this are read normally even when use_mmap=True;
+# mapping a few KB costs more than it saves.
+MMAP_MIN_SIZE = 256 * 1024
+
+# Node classes the parser understands
+REPLAY_RECORD_CLASS_ID = 0x03093000  # CGameCtnReplayRecord (.Replay.Gbx)
+GHOST_CLASS_ID = 0x03092000          # CGameCtnGhost (.Ghost.Gbx)
+SUPPORTED_CLASS_IDS = (REPLAY_RECORD_CLASS_ID, GHOST_CLASS_ID)
+
+# Sanity limit for the header user data section (real replays use well under 1 KB)
+MAX_USER_DATA_SIZE = 1024 * 1024
+
+
+def parse_gbx_header(filepath):
+    """Parse only the GBX header of a replay file, never touching the body.
+
+    The fixed 17-byte prefix is checked first so non-GBX files and unexpected
+    node classes are rejected before anything else is read. Only the header
+    user data section (usually a few KB) is read after that.
+
+    Args:
+        filepath: Path to .Gbx replay file
+
+    Returns:
+        Header dictionary from header.parse_header ('metadata', 'class_id', ...)
+
+    Raises:
+        ValueError: If the file is not a GBX file or has an unsupported class ID
+    """
+    with open(filepath, 'rb') as f:
+        head = f.read(17)
+        user_data_size = _check_header_prefix(head)
+        data = head + f.read(user_data_size + 4)
+
+    return parse_header(io.BytesIO(data))
+
+
+def _check_header_prefix(head):
+    """Validate the fixed header prefix and return the user data size."""
+    if len(head) < 17 or head[:3] != b'GBX':
+        raise ValueError(f"Invalid GBX file: magic bytes are {head[:3].hex()}")
+
+    # magic(3) + version(2) + format(1) + ref/body compression(2) [+ unknown(1) if version >= 4]
+    version, = struct.unpack_from('<H', head, 3)
+    class_offset = 9 if version >= 4 else 8
+    class_id, user_data_size = struct.unpack_from('<II', head, class_offset)
+
+    if class_id not in SUPPORTED_CLASS_IDS:
+        raise ValueError(f"Unsupported GBX class ID: 0x{class_id:08X}")
+    if user_data_size > MAX_USER_DATA_SIZE:
+        raise ValueError(f"Unreasonable header user data size: {user_data_size}")
+
+    return user_data_size
+
+
+def parse_gbx(filepath, columnar=False, use_mmap=False, body=True, lazy=False, fields=None,
+              trace=False, stats=None):
     """Parse a GBX replay file.
-    
+
     Args:
         filepath: Path to .Gbx replay file
-        
+        columnar: Return ghost_samples as a dict of NumPy column arrays
+            (one per field) instead of a list of per-sample dicts
+        use_mmap: Memory-map the file so header parsing, ref-table skipping and
+            the compressed body are read straight from the mapped region. Files
+            smaller than MMAP_MIN_SIZE fall back to normal reads.
+        body: Parse the body. With body=False only the header is read (see
+            parse_gbx_header); ghost_info is None and ghost_samples is empty.
+        lazy: Return ghost_samples as a GhostSamples sequence that decodes each
+            sample on first access (see tm_gbx.samples). Use .materialize()
+            to get the plain list of dicts.
+        fields: Only decode these sample fields (names from ghost.SAMPLE_FIELDS).
+            Just the raw values they depend on are unpacked and only their
+            derived math runs, e.g. ['time_ms', 'x', 'y', 'z'] skips all
+            trigonometry. Samples contain the fields in the order given.
+        trace: Return ghost_samples as a GhostTrace (see tm_gbx.trace) that
+            stores every channel in a compact array.array; rows are still
+            available as dicts via indexing and iteration.
+        stats: Optional tm_gbx.stats.ParseStats that records the file's
+            per-stage times and bytes, decoded and skipped sample counts and,
+            if no samples come back, the failure reason (not used with body=False)
+
     Returns:
         Dictionary with 'metadata', 'ghost_info', and 'ghost_samples' keys
+
+    Raises:
+        ValueError: If fields contains an unknown field name
     """
+    _check_output_mode(columnar, lazy, trace)
+    fields = validate_fields(fields)
+
+    if stats is not None and body:
+        return _instrumented(stats, filepath, _parse_path, filepath, columnar, use_mmap, body, lazy, fields,
+                             trace, stats)
+    return _parse_path(filepath, columnar, use_mmap, body, lazy, fields, trace)
+
+
+def _parse_path(filepath, columnar, use_mmap, body, lazy, fields, trace, stats=NO_STATS):
+    """parse_gbx with validated arguments."""
+    if not body:
+        return {
+            'metadata': parse_gbx_header(filepath)['metadata'],
+            'ghost_info': None,
+            'ghost_samples': _empty_samples(columnar, fields, trace)
+        }
+
     with open(filepath, 'rb') as f:
-        # Parse header
-        header_data = parse_header(f)
-        metadata = header_data.get('metadata', {})
-        
-        # Skip ref table
-        num_external = read_int32(f)
-        
-        if num_external > 0:
-            # Read external refs (most TM2020 replays have 0)
-            for _ in range(num_external):
-                # Skip external node info
-                # flags (int32), file path (string), or node_index (int32)
-                flags = read_int32(f)
-                if (flags & 0x4) != 0:
-                    # Has file path
-                    file_path = read_string(f)
-                else:
-                    # Has node index instead of file path
-                    file_node_index = read_int32(f)
-                # Use resource index if needed
-                if (flags & 0x8) != 0:
-                    resource_index = read_int32(f)
-                # Node index
-                node_index = read_int32(f)
-                # Use flags
-                use_flags = read_int32(f)
-                # Folder deps
-                if (flags & 0x10) != 0:
-                    folder_dep_count = read_int32(f)
-        
-        # Read body - handle both zlib (.Ghost.Gbx) and LZO (replay .Gbx) compression
-        body_data = None
-        ghost_info = None
-        ghost_samples = []
-        
-        body_compressed = header_data.get('body_compressed', 0)
-        
-        if body_compressed == 0x43:  # 'C' = compressed
-            # Read uncompressed_size and compressed_size
-            uncompressed_size = read_uint32(f)
-            compressed_size = read_uint32(f)
-            
-            # Read compressed data
-            compressed_data = f.read(compressed_size)
-            
-            # Try zlib first (for .Ghost.Gbx files)
+        if use_mmap and os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _parse_file(mm, columnar, lazy, fields, trace, mapped=True, stats=stats)
+        return _parse_file(f, columnar, lazy, fields, trace, stats=stats)
+
+
+def _instrumented(stats, name, parse, *args):
+    """Run parse(*args) as one file entry of stats, recording exceptions as failures."""
+    stats.begin_file(name)
+    try:
+        return parse(*args)
+    except (ValueError, struct.error, EOFError) as e:
+        stats.fail(_stats.INVALID_HEADER, f"{type(e).__name__}: {e}")
+        raise
+    except Exception as e:
+        stats.fail(_stats.ERROR, f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        stats.end_file()
+
+
+def parse_gbx_bytes(data, columnar=False, lazy=False, fields=None, trace=False, stats=None, name=None):
+    """Parse a GBX replay already held in memory (e.g. received from a queue).
+
+    Args:
+        data: Complete .Gbx file contents (bytes, bytearray or memoryview)
+        columnar, lazy, fields, trace, stats: See parse_gbx
+        name: Label of the file entry in stats (e.g. the object key)
+
+    Returns:
+        Dictionary with 'metadata', 'ghost_info', and 'ghost_samples' keys
+    """
+    _check_output_mode(columnar, lazy, trace)
+    fields = validate_fields(fields)
+
+    if stats is not None:
+        return _instrumented(stats, name, _parse_file, io.BytesIO(data), columnar, lazy, fields, trace, False,
+                             stats)
+    return _parse_file(io.BytesIO(data), columnar, lazy, fields, trace)
+
+
+def parse_gbx_ghosts(filepath, columnar=False, use_mmap=False, lazy=False, fields=None, trace=False):
+    """Parse every ghost of a GBX replay file in one pass.
+
+    The body is decompressed and walked once; each CPlugEntRecordData record
+    is decompressed and framed once, and every CSceneVehicleVis entity in it
+    is decoded into its own sample stream.
+
+    Args:
+        filepath: Path to .Gbx replay file
+        columnar, use_mmap, lazy, fields, trace: See parse_gbx
+
+    Returns:
+        Dictionary with 'metadata' and 'ghosts', a list with one dict per
+        vehicle entity in file order:
+            'entity': {'record': index of the record in the body,
+                       'index': index in the record's entity list,
+                       'type': entity type}
+            'player': nickname, trigram, zone, club_tag and login of the
+                      ghost node owning the record (as far as present)
+            'ghost_info', 'ghost_samples': as returned by parse_gbx
+
+    Raises:
+        ValueError: If fields contains an unknown field name
+    """
+    _check_output_mode(columnar, lazy, trace)
+    fields = validate_fields(fields)
+
+    with open(filepath, 'rb') as f:
+        if use_mmap and os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header_data = parse_header(mm)
+                records = _read_records(mm, header_data, mapped=True)
+        else:
+            header_data = parse_header(f)
+            records = _read_records(f, header_data)
+
+    ghosts = []
+    for record_index, (version, record_data, player) in enumerate(records):
+        try:
+            vehicles = parse_record_vehicles(record_data, version, columnar, lazy, fields, trace)
+        except (struct.error, IOError, ValueError, EOFError, IndexError):
+            vehicles = None
+        for vehicle in vehicles or ():
+            vehicle['entity']['record'] = record_index
+            vehicle['player'] = dict(player)
+            ghosts.append(vehicle)
+
+    return {
+        'metadata': header_data.get('metadata', {}),
+        'ghosts': ghosts
+    }
+
+
+def _check_output_mode(columnar, lazy, trace):
+    if bool(columnar) + bool(lazy) + bool(trace) > 1:
+        raise ValueError("columnar, lazy and trace output are mutually exclusive")
+
+
+def _empty_samples(columnar, fields, trace):
+    """ghost_samples value for files without decodable telemetry."""
+    if columnar:
+        return {}
+    if trace:
+        from .trace import GhostTrace
+        return GhostTrace(fields)
+    return []
+
+
+def iter_ghost_samples(filepath, use_mmap=False, fields=None, streaming=False, stream_info=None):
+    """Iterate over the decoded ghost samples of a GBX replay file.
+
+    Samples are decoded one at a time straight from the CPlugEntRecordData
+    framing loop and never collected into a list, so per-file memory does not
+    grow with the ghost length. Files without a decodable body yield nothing.
+
+    With streaming=True the decompressed body and record are not held in
+    memory either: both are inflated incrementally while the body is walked
+    and the record framed (see tm_gbx.streaming), and decompression stops
+    once the vehicle entity ends. LZO bodies can only be decompressed whole,
+    so for replays just the record is streamed.
+
+    Args:
+        filepath: Path to .Gbx replay file
+        use_mmap: Memory-map the file (see parse_gbx; not used when streaming)
+        fields: Only decode these sample fields (see parse_gbx)
+        streaming: Inflate body and record incrementally with bounded memory
+        stream_info: Optional dict that a streaming iteration fills in when it ends:
+            body_codec ('zlib' or 'lzo'), compressed_bytes (of the body read
+            from the file), body_bytes and record_bytes (inflated),
+            peak_buffer_bytes (peak of all decompression buffers together)
+            and samples
+
+    Yields:
+        dict with all 52 telemetry fields (or the requested fields) per sample
+
+    Raises:
+        ValueError: If fields contains an unknown field name
+    """
+    fields = validate_fields(fields)
+
+    if streaming:
+        with open(filepath, 'rb') as f:
+            yield from _stream_samples(f, fields, stream_info if stream_info is not None else {})
+        return
+
+    with open(filepath, 'rb') as f:
+        if use_mmap and os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                records = _read_records(mm, parse_header(mm), mapped=True, limit=1)
+        else:
+            records = _read_records(f, parse_header(f), limit=1)
+
+    if not records:
+        return
+
+    version, record_data, _ = records.pop()
+    yield from iter_record_samples(record_data, fields, version)
+
+
+def _stream_samples(f, fields, info):
+    """Streaming iter_ghost_samples on an open file; fills in info when done."""
+    header_data = parse_header(f)
+    _skip_ref_table(f)
+    if header_data.get('body_compressed', 0) != 0x43:
+        return
+
+    uncompressed_size = read_uint32(f)
+    compressed_size = read_uint32(f)
+
+    meter = BufferMeter()
+    body = record = None
+    samples = 0
+    info.update(body_codec=None, compressed_bytes=0, body_bytes=0, record_bytes=0)
+
+    try:
+        body_start = f.tell()
+        body_stream = None
+        if is_zlib_header(f.read(2)):
+            f.seek(body_start)
+            info['body_codec'] = 'zlib'
+            body = InflateReader(f, compressed_size, meter=meter)
             try:
-                body_data = zlib.decompress(compressed_data)
+                found = walk_to_record(body)
+                body_stream = body
             except zlib.error:
-                # Fall back to LZO (for replay .Gbx files) if available
-                try:
-                    import lzo
-                    body_data = lzo.decompress(compressed_data, False, uncompressed_size)
-                except ImportError:
-                    # LZO not available - can't decompress replay body
-                    body_data = None
-                except Exception:
-                    body_data = None
-        
-        # If body decompressed, parse ghost telemetry
-        if body_data:
-            result = parse_ghost_from_body(body_data)
-            if result:
-                ghost_info = result.get('ghost_info')
-                ghost_samples = result.get('ghost_samples', [])
-    
+                # An LZO body can start with bytes that pass the 2-byte header check
+                body = None
+
+        if body_stream is None:
+            # LZO has no streaming API: the body is decompressed whole
+            f.seek(body_start)
+            info['body_codec'] = 'lzo'
+            info['compressed_bytes'] = compressed_size
+            body_data = _decompress_lzo_body(f.read(compressed_size), uncompressed_size)
+            if not body_data:
+                return
+            meter.add(len(body_data))
+            info['body_bytes'] = len(body_data)
+            body_stream = io.BytesIO(body_data)
+            del body_data
+            found = walk_to_record(body_stream)
+
+        if found is None:
+            return
+        version, _, data_length = struct.unpack('<III', body_stream.read(12))
+        if version < 5 or version > 15:
+            return
+
+        record = InflateReader(body_stream, data_length, meter=meter)
+        for sample in iter_stream_record_samples(record, version, make_sample_decoder(fields)):
+            samples += 1
+            yield sample
+
+    except (struct.error, EOFError, ValueError, zlib.error, io.UnsupportedOperation):
+        return
+
+    finally:
+        if body is not None:
+            info['compressed_bytes'] = body.compressed_bytes
+            info['body_bytes'] = body.inflated_bytes
+        if record is not None:
+            info['record_bytes'] = record.inflated_bytes
+        info['peak_buffer_bytes'] = meter.peak
+        info['samples'] = samples
+
+
+def _parse_file(f, columnar, lazy, fields=None, trace=False, mapped=False, stats=NO_STATS):
+    """Parse an open GBX file object (or mmap when mapped=True) positioned at the start."""
+    fields = validate_fields(fields)
+
+    # Parse header
+    with stats.stage('parse_header') as stage:
+        header_data = parse_header(f)
+        stage.bytes_in = f.tell()
+    metadata = header_data.get('metadata', {})
+
+    records = _read_records(f, header_data, mapped, limit=1, stats=stats)
+
+    ghost_info = None
+    ghost_samples = _empty_samples(columnar, fields, trace)
+
+    # If the record was found, parse ghost telemetry
+    if records:
+        version, record_data, _ = records[0]
+        try:
+            result = parse_record_data(record_data, version, columnar, lazy, fields, trace, stats)
+        except (struct.error, IOError, ValueError, EOFError, IndexError) as e:
+            stats.fail(_stats.BAD_RECORD, f"{type(e).__name__}: {e}")
+            result = None
+        if result:
+            ghost_info = result.get('ghost_info')
+            ghost_samples = result['ghost_samples']
+
     return {
         'metadata': metadata,
         'ghost_info': ghost_info,
         'ghost_samples': ghost_samples
     }
+
+
+def _read_records(f, header_data, mapped=False, limit=None, stats=NO_STATS):
+    """Skip the ref table and return the body's [(version, record_data, player)]."""
+    # Skip ref table
+    with stats.stage('ref_table') as stage:
+        start = f.tell()
+        _skip_ref_table(f)
+        stage.bytes_in = f.tell() - start
+
+    # Read body - handle both zlib (.Ghost.Gbx) and LZO (replay .Gbx) compression
+    body_compressed = header_data.get('body_compressed', 0)
+
+    if body_compressed != 0x43:  # 'C' = compressed
+        stats.fail(_stats.BODY_NOT_COMPRESSED, f"body compression flag {body_compressed!r}")
+        return []
+
+    # Read uncompressed_size and compressed_size
+    uncompressed_size = read_uint32(f)
+    compressed_size = read_uint32(f)
+
+    if mapped:
+        # Decompress straight from the mapped region; only the output is allocated
+        start = f.tell()
+        with memoryview(f) as view, view[start:start + compressed_size] as compressed_data:
+            return _extract_records(compressed_data, uncompressed_size, limit, stats)
+
+    return _extract_records(f.read(compressed_size), uncompressed_size, limit, stats)
+
+
+def _extract_records(compressed_data, uncompressed_size, limit, stats=NO_STATS):
+    """Decompress the body and extract its records; see _read_records."""
+    with stats.stage('decompress_body', len(compressed_data)) as stage:
+        body_data = _decompress_body(compressed_data, uncompressed_size, stats)
+        stage.bytes_out = len(body_data) if body_data else 0
+    if not body_data:
+        return []
+    try:
+        return extract_records(body_data, limit, stats)
+    except (struct.error, ValueError, EOFError) as e:
+        stats.fail(_stats.BAD_RECORD, f"{type(e).__name__}: {e}")
+        return []
+
+
+def _skip_ref_table(f):
+    """Skip the reference table that follows the header."""
+    num_external = read_int32(f)
+
+    if num_external > 0:
+        # Read external refs (most TM2020 replays have 0)
+        for _ in range(num_external):
+            # Skip external node info
+            # flags (int32), file path (string), or node_index (int32)
+            flags = read_int32(f)
+            if (flags & 0x4) != 0:
+                # Has file path
+                file_path = read_string(f)
+            else:
+                # Has node index instead of file path
+                file_node_index = read_int32(f)
+            # Use resource index if needed
+            if (flags & 0x8) != 0:
+                resource_index = read_int32(f)
+            # Node index
+            node_index = read_int32(f)
+            # Use flags
+            use_flags = read_int32(f)
+            # Folder deps
+            if (flags & 0x10) != 0:
+                folder_dep_count = read_int32(f)
+
+
+def _decompress_body(compressed_data, uncompressed_size, stats=NO_STATS):
+    """Decompress the GBX body, or return None if it can't be decompressed."""
+    # zlib (.Ghost.Gbx) is recognized by its stream header, anything else is LZO (replays)
+    if body_codec_name(compressed_data) != 'zlib':
+        return _decompress_lzo_body(compressed_data, uncompressed_size, stats)
+    codec = get_codec('zlib')
+    try:
+        return codec.decompress(compressed_data, uncompressed_size)
+    except codec.errors as e:
+        # An LZO body can start with bytes that pass the 2-byte header check
+        return _decompress_lzo_body(compressed_data, uncompressed_size, stats, f"zlib: {e}; ")
+
+
+def _decompress_lzo_body(compressed_data, uncompressed_size, stats=NO_STATS, tried=''):
+    """Decompress an LZO body; tried describes an earlier failed attempt for stats."""
+    codec = get_codec('lzo')
+    if codec is None:
+        # LZO not available - can't decompress replay body
+        stats.fail(_stats.LZO_MISSING, f"{tried}no lzo codec registered (install python-lzo)")
+        return None
+    try:
+        return codec.decompress(compressed_data, uncompressed_size)
+    except codec.errors as e:
+        stats.fail(_stats.BODY_CORRUPT, f"{tried}lzo: {e}")
+        return None
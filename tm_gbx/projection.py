@@ -0,0 +1,233 @@
+"""Field projection for CSceneVehicleVis samples.
+
+make_sample_decoder(fields) builds a decoder equivalent to
+ghost.parse_vehicle_vis_sample() that only produces the requested fields. Only
+the raw values those fields depend on are unpacked (unused bytes are struct pad
+bytes) and only the derived values they need are computed, so e.g. asking for
+x/y/z does no floating-point math at all while yaw_deg still pulls in the full
+axis-angle → quaternion → Euler chain.
+
+Decoders are generated once per field set and cached, the same way
+collections.namedtuple builds its classes.
+"""
+
+import functools
+import math
+import struct
+
+from .ghost import SAMPLE_FIELDS, parse_vehicle_vis_sample
+
+
+# Raw CSceneVehicleVis values: (name, byte offset, struct code).
+# Same layout and names as ghost.VEHICLE_VIS_STRUCT.
+_RAW_LAYOUT = (
+    ('side_speed_raw', 2, 'H'), ('rpm', 5, 'B'),
+    ('fl_wheel_rot_raw', 6, 'B'), ('fl_wheel_count', 7, 'B'),
+    ('fr_wheel_rot_raw', 8, 'B'), ('fr_wheel_count', 9, 'B'),
+    ('rr_wheel_rot_raw', 10, 'B'), ('rr_wheel_count', 11, 'B'),
+    ('rl_wheel_rot_raw', 12, 'B'), ('rl_wheel_count', 13, 'B'),
+    ('steer_raw', 14, 'B'), ('gas_raw', 15, 'B'), ('brake_raw', 18, 'B'),
+    ('turbo_time_raw', 21, 'B'),
+    ('fl_dampen_raw', 23, 'B'), ('fl_ground_mat', 24, 'B'),
+    ('fr_dampen_raw', 25, 'B'), ('fr_ground_mat', 26, 'B'),
+    ('rr_dampen_raw', 27, 'B'), ('rr_ground_mat', 28, 'B'),
+    ('rl_dampen_raw', 29, 'B'), ('rl_ground_mat', 30, 'B'),
+    ('is_turbo_raw', 31, 'B'), ('slip_byte1', 32, 'B'), ('slip_byte2', 33, 'B'),
+    ('x', 47, 'f'), ('y', 51, 'f'), ('z', 55, 'f'),
+    ('angle_raw', 59, 'H'), ('axis_heading_raw', 61, 'h'), ('axis_pitch_raw', 63, 'h'),
+    ('speed_raw', 65, 'h'), ('vel_heading_raw', 67, 'b'), ('vel_pitch_raw', 68, 'b'),
+    ('is_top_contact_raw', 76, 'B'),
+    ('fl_ice_raw', 81, 'B'), ('fr_ice_raw', 82, 'B'), ('rr_ice_raw', 83, 'B'), ('rl_ice_raw', 84, 'B'),
+    ('reactor_flags', 89, 'B'), ('reactor_control', 90, 'B'), ('gear_raw', 91, 'B'),
+    ('fl_dirt_raw', 93, 'B'), ('fr_dirt_raw', 95, 'B'), ('rr_dirt_raw', 97, 'B'), ('rl_dirt_raw', 99, 'B'),
+    ('wetness_raw', 101, 'B'), ('sim_time_coef_raw', 102, 'B'),
+)
+_RAW_NAMES = frozenset(name for name, _, _ in _RAW_LAYOUT)
+
+# Intermediate values: name -> (expression, names it uses). Expressions are
+# copied from parse_vehicle_vis_sample() so results are bit-identical.
+_DERIVED = {
+    'angle': ('angle_raw * _pi / 65535.0', ('angle_raw',)),
+    'axis_heading': ('axis_heading_raw * _pi / 32767.0', ('axis_heading_raw',)),
+    'axis_pitch': ('(axis_pitch_raw / 32767.0) * (_pi / 2.0)', ('axis_pitch_raw',)),
+    'speed': ('_exp(speed_raw / 1000.0)', ('speed_raw',)),
+    'vel_heading': ('(vel_heading_raw / 127.0) * _pi', ('vel_heading_raw',)),
+    'vel_pitch': ('(vel_pitch_raw / 127.0) * (_pi / 2.0)', ('vel_pitch_raw',)),
+    'sin_angle': ('_sin(angle)', ('angle',)),
+    'cos_axis_pitch': ('_cos(axis_pitch)', ('axis_pitch',)),
+    'ax': ('sin_angle * cos_axis_pitch * _cos(axis_heading)', ('sin_angle', 'cos_axis_pitch', 'axis_heading')),
+    'ay': ('sin_angle * cos_axis_pitch * _sin(axis_heading)', ('sin_angle', 'cos_axis_pitch', 'axis_heading')),
+    'az': ('sin_angle * _sin(axis_pitch)', ('sin_angle', 'axis_pitch')),
+    'qw': ('_cos(angle)', ('angle',)),
+    'sinp': ('2.0 * (qw * ay - az * ax)', ('qw', 'ax', 'ay', 'az')),
+    'cos_vel_pitch': ('_cos(vel_pitch)', ('vel_pitch',)),
+    'brake': ('brake_raw / 255.0', ('brake_raw',)),
+}
+
+# Output fields: name -> (expression, names it uses)
+_FIELDS = {
+    'time_ms': ('time_ms', ()),
+    'time_s': ('time_ms / 1000.0', ()),
+    'x': ('x', ('x',)),
+    'y': ('y', ('y',)),
+    'z': ('z', ('z',)),
+    'speed': ('speed', ('speed',)),
+    'side_speed': ('((side_speed_raw / 65536.0) - 0.5) * 2000.0', ('side_speed_raw',)),
+    'vel_x': ('speed * cos_vel_pitch * _cos(vel_heading)', ('speed', 'cos_vel_pitch', 'vel_heading')),
+    'vel_y': ('speed * cos_vel_pitch * _sin(vel_heading)', ('speed', 'cos_vel_pitch', 'vel_heading')),
+    'vel_z': ('speed * _sin(vel_pitch)', ('speed', 'vel_pitch')),
+    'pitch_deg': ('_degrees(_copysign(_pi / 2, sinp) if abs(sinp) >= 1 else _asin(sinp))', ('sinp',)),
+    'yaw_deg': ('_degrees(_atan2(2.0 * (qw * az + ax * ay), 1.0 - 2.0 * (ay * ay + az * az)))',
+                ('qw', 'ax', 'ay', 'az')),
+    'roll_deg': ('_degrees(_atan2(2.0 * (qw * ax + ay * az), 1.0 - 2.0 * (ax * ax + ay * ay)))',
+                 ('qw', 'ax', 'ay', 'az')),
+    'steer': ('((steer_raw / 255.0) - 0.5) * 2.0', ('steer_raw',)),
+    'gas': ('(gas_raw / 255.0) + brake', ('gas_raw', 'brake')),
+    'brake': ('brake', ('brake',)),
+    'gear': ('gear_raw / 5.0', ('gear_raw',)),
+    'rpm': ('rpm', ('rpm',)),
+    'is_turbo': ('(is_turbo_raw & 0x82) != 0', ('is_turbo_raw',)),
+    'turbo_time': ('turbo_time_raw / 255.0', ('turbo_time_raw',)),
+    'is_ground_contact': ('(reactor_flags & 0x01) != 0', ('reactor_flags',)),
+    'is_top_contact': ('(is_top_contact_raw & 0x20) != 0', ('is_top_contact_raw',)),
+    'reactor_state': ('1 if reactor_flags & 0x04 else 2 if reactor_flags & 0x08 '
+                      'else 3 if reactor_flags & 0x10 else 0', ('reactor_flags',)),
+    'reactor_boost': ('1 if reactor_flags & 0x20 else 2 if reactor_flags & 0x40 else 0', ('reactor_flags',)),
+    'reactor_pedal': ('1 if reactor_control & 0x20 else (0 if reactor_control & 0x10 else -1)',
+                      ('reactor_control',)),
+    'reactor_steer': ('-1 if reactor_control & 0x80 else (0 if reactor_control & 0x40 else 1)',
+                      ('reactor_control',)),
+    'sim_time_coef': ('sim_time_coef_raw / 255.0', ('sim_time_coef_raw',)),
+    'wetness': ('wetness_raw / 255.0', ('wetness_raw',)),
+    'fl_slip': ('(slip_byte1 & 0x40) != 0', ('slip_byte1',)),
+    'fr_slip': ('(slip_byte2 & 0x01) != 0', ('slip_byte2',)),
+    'rr_slip': ('(slip_byte2 & 0x04) != 0', ('slip_byte2',)),
+    'rl_slip': ('(slip_byte2 & 0x10) != 0', ('slip_byte2',)),
+}
+for _wheel in ('fl', 'fr', 'rr', 'rl'):
+    _FIELDS[_wheel + '_dampen'] = (
+        '((%s_dampen_raw / 255.0) - 0.5) * 4.0' % _wheel, (_wheel + '_dampen_raw',))
+    _FIELDS[_wheel + '_ice'] = ('%s_ice_raw / 255.0' % _wheel, (_wheel + '_ice_raw',))
+    _FIELDS[_wheel + '_dirt'] = ('%s_dirt_raw / 255.0' % _wheel, (_wheel + '_dirt_raw',))
+    _FIELDS[_wheel + '_ground_mat'] = (_wheel + '_ground_mat', (_wheel + '_ground_mat',))
+    _FIELDS[_wheel + '_wheel_rot'] = (
+        '(%s_wheel_rot_raw / 255.0) * _two_pi + (%s_wheel_count * _two_pi)' % (_wheel, _wheel),
+        (_wheel + '_wheel_rot_raw', _wheel + '_wheel_count'))
+del _wheel
+
+_GLOBALS = {
+    '_pi': math.pi,
+    '_two_pi': 2 * math.pi,
+    '_exp': math.exp,
+    '_sin': math.sin,
+    '_cos': math.cos,
+    '_asin': math.asin,
+    '_atan2': math.atan2,
+    '_copysign': math.copysign,
+    '_degrees': math.degrees,
+    '_struct_error': struct.error,
+}
+
+
+def _resolve(names, raw, derived):
+    """Collect the raw values and intermediates needed for names (dependency order)."""
+    for name in names:
+        if name in _RAW_NAMES:
+            raw.add(name)
+        elif name not in derived:
+            expression, uses = _DERIVED[name]
+            _resolve(uses, raw, derived)
+            derived.append(name)
+
+
+def _field_dependencies(field):
+    raw = set()
+    _resolve(_FIELDS[field][1], raw, [])
+    return tuple(name for name, _, _ in _RAW_LAYOUT if name in raw)
+
+
+# Raw CSceneVehicleVis values each output field is computed from
+FIELD_DEPENDENCIES = {field: _field_dependencies(field) for field in SAMPLE_FIELDS}
+
+
+def validate_fields(fields):
+    """Return fields as a tuple without duplicates, or None for all fields.
+
+    Raises:
+        ValueError: If no field is requested, or any of the names is not one
+            of ghost.SAMPLE_FIELDS
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = (fields,)
+
+    fields = tuple(dict.fromkeys(fields))
+    if not fields:
+        raise ValueError("No ghost sample fields requested (pass fields=None for all fields)")
+    unknown = [field for field in fields if field not in _FIELDS]
+    if unknown:
+        raise ValueError(
+            "Unknown ghost sample field(s): %s (valid fields are listed in "
+            "tm_gbx.ghost.SAMPLE_FIELDS)" % ", ".join(repr(field) for field in unknown))
+    return fields
+
+
+def make_sample_decoder(fields=None):
+    """Return a sample decoder that only produces the given fields.
+
+    The decoder has the same signature and failure behaviour as
+    ghost.parse_vehicle_vis_sample(); samples are dicts with the requested
+    fields in the requested order.
+
+    Args:
+        fields: Iterable of field names from ghost.SAMPLE_FIELDS, or None for
+            all 52 fields (returns parse_vehicle_vis_sample itself)
+
+    Raises:
+        ValueError: If an unknown field name is requested
+    """
+    fields = validate_fields(fields)
+    if fields is None:
+        return parse_vehicle_vis_sample
+    return _build_decoder(fields)
+
+
+@functools.lru_cache(maxsize=64)
+def _build_decoder(fields):
+    raw = set()
+    derived = []
+    for field in fields:
+        _resolve(_FIELDS[field][1], raw, derived)
+
+    # Unpack only the needed raw values; everything else becomes pad bytes
+    fmt = '<'
+    names = []
+    position = 0
+    for name, offset, code in _RAW_LAYOUT:
+        if name in raw:
+            if offset > position:
+                fmt += '%dx' % (offset - position)
+            fmt += code
+            names.append(name)
+            position = offset + struct.calcsize('<' + code)
+    if position < 107:
+        fmt += '%dx' % (107 - position)
+
+    lines = ['def decode(time_ms, sample_data):',
+             '    if len(sample_data) != 107:',
+             '        return None']
+    if names:
+        lines += ['    try:',
+                  '        %s, = _raw_struct.unpack_from(sample_data)' % ', '.join(names),
+                  '    except _struct_error:',
+                  '        return None']
+    lines += ['    %s = %s' % (name, _DERIVED[name][0]) for name in derived]
+    lines.append('    return {%s}' % ', '.join(
+        '%r: %s' % (field, _FIELDS[field][0]) for field in fields))
+
+    namespace = dict(_GLOBALS, _raw_struct=struct.Struct(fmt))
+    exec('\n'.join(lines), namespace)
+    decode = namespace['decode']
+    decode.__qualname__ = decode.__name__ = 'decode_' + '_'.join(fields)[:64]
+    return decode
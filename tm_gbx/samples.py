@@ -0,0 +1,90 @@
+"""Lazy sequence of CSceneVehicleVis samples.
+
+GhostSamples wraps the sample references produced by ghost.parse_record_data()
+and decodes a sample only when it is accessed, so callers that read a handful of
+indices or stop iterating early never pay for the full 52-field decode.
+"""
+
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from .ghost import parse_vehicle_vis_sample
+
+
+class GhostSamples(Sequence):
+    """Read-only sequence of decoded samples backed by the raw record bytes.
+
+    Supports len(), indexing (including negative indices), slicing (which returns
+    another lazy GhostSamples sharing the same buffer) and iteration. Recently
+    accessed samples are kept in a small LRU cache.
+    """
+
+    def __init__(self, buffer, sample_refs, cache_size=256, decoder=None):
+        """Create a lazy sample sequence.
+
+        Args:
+            buffer: Record bytes the sample references point into
+            sample_refs: List of (time_ms, offset, length) sample references;
+                payloads that are not 107 bytes are dropped like in the eager path
+            cache_size: Number of decoded samples to keep cached (0 disables caching)
+            decoder: Sample decoder with the signature of parse_vehicle_vis_sample
+                (e.g. a projection.make_sample_decoder() result); defaults to
+                parse_vehicle_vis_sample
+        """
+        self._view = memoryview(buffer)
+        self._refs = [ref for ref in sample_refs if ref[2] == 107]
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._decoder = decoder
+
+    def __len__(self):
+        return len(self._refs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return GhostSamples(self._view, self._refs[index], self._cache_size, self._decoder)
+
+        if index < 0:
+            index += len(self._refs)
+        if not 0 <= index < len(self._refs):
+            raise IndexError("ghost sample index out of range")
+
+        cache = self._cache
+        sample = cache.get(index)
+        if sample is not None:
+            cache.move_to_end(index)
+            return sample
+
+        sample = self._decode(index)
+        if self._cache_size > 0:
+            cache[index] = sample
+            if len(cache) > self._cache_size:
+                cache.popitem(last=False)
+        return sample
+
+    def __iter__(self):
+        # Sequential scans bypass the cache so they don't evict hot samples
+        cache = self._cache
+        view = self._view
+        decode = self._decoder or parse_vehicle_vis_sample
+        for index, (time_ms, offset, length) in enumerate(self._refs):
+            sample = cache.get(index)
+            if sample is None:
+                sample = decode(time_ms, view[offset:offset + length])
+            yield sample
+
+    def __repr__(self):
+        return f"<GhostSamples: {len(self._refs)} samples, {len(self._cache)} decoded>"
+
+    def _decode(self, index):
+        time_ms, offset, length = self._refs[index]
+        decode = self._decoder or parse_vehicle_vis_sample
+        return decode(time_ms, self._view[offset:offset + length])
+
+    def times(self):
+        """Return the sample timestamps (ms) without decoding any sample."""
+        return [ref[0] for ref in self._refs]
+
+    def materialize(self):
+        """Decode every sample and return them as a plain list of dicts."""
+        return list(self)
@@ -0,0 +1,209 @@
+"""Per-stage parse instrumentation and failure reasons.
+
+parse_gbx() reports a file it can't decode as an empty result. Passing a
+ParseStats records why, and where the time went:
+
+    stats = ParseStats()
+    for item in parse_many(paths, stats=stats):
+        ...
+    stats.summary()      # per-stage time and bytes, sample and failure counts
+    stats.hot_files(10)  # slowest files
+    stats.unparseable()  # files that fail for a reason retrying won't fix
+
+Stages are timed with time.perf_counter():
+
+    parse_header     header and user data chunks
+    ref_table        reference table skip
+    decompress_body  body decompression (zlib or LZO)
+    record_search    structural body walk to the CPlugEntRecordData chunks
+    record_inflate   record chunk decompression
+    framing          record header and entity list framing
+    sample_decode    sample decoding (v11: column rebuild included)
+
+Each file parsed with stats gets an entry in stats.files with its path, wall
+time, per-stage seconds, decoded and skipped sample counts and - if it came
+back without samples - a failure reason (one of the constants below) with a
+detail message. Stats of several batches (or of parse_many() workers) are
+combined with merge(). A ParseStats is not thread-safe.
+"""
+
+import time
+from collections import Counter
+
+# Failure reasons
+INVALID_HEADER = 'invalid_header'                          # not a GBX file, or unsupported class
+BODY_NOT_COMPRESSED = 'body_not_compressed'                # no compressed body to decode
+LZO_MISSING = 'lzo_missing'                                # LZO body and python-lzo not installed
+BODY_CORRUPT = 'body_corrupt'                              # body codec rejected the data
+UNREADABLE_BODY = 'unreadable_body'                        # body walk stopped at a chunk of unknown layout
+NO_RECORD = 'no_record'                                    # no CPlugEntRecordData chunk in the body
+UNSUPPORTED_RECORD_VERSION = 'unsupported_record_version'  # record chunk version outside 5-15
+RECORD_CORRUPT = 'record_corrupt'                          # record chunk truncated or not inflatable
+BAD_RECORD = 'bad_record'                                  # record header or entity list implausible
+NO_VEHICLE = 'no_vehicle'                                  # no CSceneVehicleVis entity
+BAD_SAMPLE_LENGTH = 'bad_sample_length'                    # vehicle samples aren't 107 bytes
+NO_SAMPLES = 'no_samples'                                  # vehicle entity without samples
+ERROR = 'error'                                            # unexpected exception (e.g. OSError)
+
+# Reasons that depend on the environment rather than the file - worth retrying
+RETRYABLE = frozenset((LZO_MISSING, ERROR))
+
+
+class _Stage:
+    """Times one stage run; set bytes_in/bytes_out inside the with block."""
+
+    __slots__ = ('_stats', 'name', 'bytes_in', 'bytes_out', '_start')
+
+    def __init__(self, stats, name, bytes_in):
+        self._stats = stats
+        self.name = name
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stats._add_stage(self.name, time.perf_counter() - self._start, self.bytes_in, self.bytes_out)
+
+
+class ParseStats:
+    """Stage timings, sample counts and failure reasons of parsed files."""
+
+    def __init__(self):
+        self.stages = {}
+        self.files = []
+        self.samples = 0
+        self.skipped_samples = 0
+        self._file = None
+        self._file_start = 0.0
+
+    def __repr__(self):
+        return f"ParseStats(files={len(self.files)}, samples={self.samples}, failed={len(self.failed())})"
+
+    def stage(self, name, bytes_in=0):
+        """Context manager timing one run of a stage."""
+        return _Stage(self, name, bytes_in)
+
+    def _add_stage(self, name, seconds, bytes_in, bytes_out):
+        totals = self.stages.get(name)
+        if totals is None:
+            totals = self.stages[name] = {'calls': 0, 'seconds': 0.0, 'bytes_in': 0, 'bytes_out': 0}
+        totals['calls'] += 1
+        totals['seconds'] += seconds
+        totals['bytes_in'] += bytes_in
+        totals['bytes_out'] += bytes_out
+        if self._file is not None:
+            file_stages = self._file['stages']
+            file_stages[name] = file_stages.get(name, 0.0) + seconds
+
+    def begin_file(self, path):
+        """Start the entry of a file; stage times and counts go to it until end_file()."""
+        self._file = {
+            'path': path,
+            'seconds': 0.0,
+            'stages': {},
+            'samples': 0,
+            'skipped_samples': 0,
+            'failure': None,
+            'detail': None,
+        }
+        self._file_start = time.perf_counter()
+
+    def end_file(self):
+        """Close the current file entry and return it."""
+        entry, self._file = self._file, None
+        entry['seconds'] = time.perf_counter() - self._file_start
+        if entry['samples']:
+            # A failure along the way (e.g. one bad record) didn't stop the parse
+            entry['failure'] = entry['detail'] = None
+        elif entry['failure'] is None:
+            entry['failure'] = NO_SAMPLES
+        self.files.append(entry)
+        return entry
+
+    def fail(self, reason, detail=None):
+        """Record why the current file yields no samples; the first reason is kept."""
+        if self._file is not None and self._file['failure'] is None:
+            self._file['failure'] = reason
+            self._file['detail'] = detail
+
+    def add_samples(self, decoded, skipped=0):
+        self.samples += decoded
+        self.skipped_samples += skipped
+        if self._file is not None:
+            self._file['samples'] += decoded
+            self._file['skipped_samples'] += skipped
+
+    def merge(self, other):
+        """Add the stats of another ParseStats (e.g. another batch); returns self."""
+        for name, totals in other.stages.items():
+            mine = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'bytes_in': 0, 'bytes_out': 0})
+            for key, value in totals.items():
+                mine[key] += value
+        self.files.extend(other.files)
+        self.samples += other.samples
+        self.skipped_samples += other.skipped_samples
+        return self
+
+    def failed(self):
+        """Entries of the files that came back without samples."""
+        return [entry for entry in self.files if entry['failure'] is not None]
+
+    def failures(self):
+        """Number of failed files per failure reason."""
+        return dict(Counter(entry['failure'] for entry in self.failed()))
+
+    def unparseable(self):
+        """Paths of files whose failure reason retrying can't fix."""
+        return [entry['path'] for entry in self.failed() if entry['failure'] not in RETRYABLE]
+
+    def hot_files(self, n=10, stage=None):
+        """The n slowest file entries, by wall time or by the time of one stage."""
+        if stage is None:
+            key = lambda entry: entry['seconds']
+        else:
+            key = lambda entry: entry['stages'].get(stage, 0.0)
+        return sorted(self.files, key=key, reverse=True)[:n]
+
+    def summary(self):
+        """Totals as a dict, with stage throughput in MB/s of input."""
+        return {
+            'files': len(self.files),
+            'failed': len(self.failed()),
+            'samples': self.samples,
+            'skipped_samples': self.skipped_samples,
+            'failures': self.failures(),
+            'stages': {
+                name: dict(totals, mb_per_s=totals['bytes_in'] / totals['seconds'] / 1e6
+                           if totals['seconds'] and totals['bytes_in'] else 0.0)
+                for name, totals in self.stages.items()
+            },
+        }
+
+
+class _NullStage:
+    __slots__ = ('bytes_in', 'bytes_out')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+class _NullStats:
+    """Stands in for a ParseStats when none was passed; records nothing."""
+
+    def stage(self, name, bytes_in=0):
+        return _NullStage()
+
+    def fail(self, reason, detail=None):
+        pass
+
+    def add_samples(self, decoded, skipped=0):
+        pass
+
+
+NO_STATS = _NullStats()
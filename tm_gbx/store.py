@@ -0,0 +1,355 @@
+"""Memory-mappable columnar telemetry store.
+
+Decoded ghosts are written to a single file as one contiguous little-endian
+array per channel, so reading a ghost back is an mmap and a slice - no parsing,
+decompression or per-sample objects. Channels keep GhostTrace's compact types
+(float32, int32 time_ms, uint8 rpm/materials/flags, int8 reactor states).
+
+File layout:
+
+    header   64 bytes: magic b'TMGBXCOL', format version (u16), reserved (u16),
+             ghost count (u32), index offset (u64), index length (u64), zero padding
+    data     per ghost, per channel: num_samples values, each array 8-byte aligned
+    index    UTF-8 JSON: per ghost its name, metadata, ghost_info, num_samples and
+             {channel: {'type': typecode, 'offset': file offset}}
+
+Write with StoreWriter, read with TelemetryStore:
+
+    with StoreWriter("ghosts.tmcol") as writer:
+        writer.add(parse_gbx(path, trace=True), name=path)
+
+    with TelemetryStore("ghosts.tmcol") as store:
+        speed = store[0].numpy('speed')   # zero-copy view of the mapped file
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from .ghost import SAMPLE_FIELDS
+from .trace import GhostTrace, _BOOL_FIELDS, _TYPECODES
+
+try:
+    import numpy as np
+except ImportError:  # NumPy not available - channels are read as memoryviews only
+    np = None
+
+
+MAGIC = b'TMGBXCOL'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<8sHHIQQ')
+HEADER_SIZE = 64
+ALIGNMENT = 8
+
+# Little-endian NumPy dtype per array typecode
+_NUMPY_TYPES = {'f': '<f4', 'i': '<i4', 'B': 'u1', 'b': 'i1'}
+
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def _result_channels(result):
+    """(field, typecode, little-endian bytes) for each channel of a parse_gbx() result.
+
+    Accepts every ghost_samples output mode: list of dicts (or lazy
+    GhostSamples), GhostTrace and the columnar dict of NumPy arrays.
+    """
+    samples = result.get('ghost_samples') or []
+    if isinstance(samples, dict):
+        channels = []
+        for field, values in samples.items():
+            typecode = _TYPECODES.get(field, 'f')
+            data = np.asarray(values).astype(_NUMPY_TYPES[typecode], copy=False)
+            channels.append((field, typecode, np.ascontiguousarray(data).tobytes()))
+        return channels
+
+    if not isinstance(samples, GhostTrace):
+        samples = list(samples)
+        if not samples:
+            return []
+        fields = [name for name in SAMPLE_FIELDS if name in samples[0]]
+        samples = GhostTrace.from_samples(samples, fields)
+
+    channels = []
+    for field in samples.fields:
+        column = samples.column(field)
+        if not _LITTLE_ENDIAN:
+            column = array(column.typecode, column)
+            column.byteswap()
+        channels.append((field, column.typecode, column.tobytes()))
+    return channels
+
+
+def _default_file_mode():
+    """Mode open() would give a new file under the current umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _count(channel):
+    _, typecode, data = channel
+    return len(data) // array(typecode).itemsize
+
+
+class StoreWriter:
+    """Writes decoded ghosts to a columnar store file.
+
+    The file is written to a temporary path and moved into place by close(), so
+    readers never see a partial store. Used as a context manager, the store is
+    discarded if the block raises.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Store file to create (replaced if it exists)
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        self._file = os.fdopen(fd, 'wb')
+        self._file.write(bytes(HEADER_SIZE))
+        self._ghosts = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add(self, result, name=None):
+        """Append one ghost.
+
+        Args:
+            result: parse_gbx() result (any output mode), or one entry of
+                parse_gbx_ghosts()['ghosts'] with the file's metadata added
+            name: Label stored in the index (e.g. the replay path)
+
+        Returns:
+            Index of the ghost in the store
+        """
+        channels = _result_channels(result)
+        entry = {
+            'name': name,
+            'metadata': result.get('metadata') or {},
+            'ghost_info': result.get('ghost_info'),
+            'num_samples': _count(channels[0]) if channels else 0,
+            'channels': {},
+        }
+        for field, typecode, data in channels:
+            self._align()
+            entry['channels'][field] = {'type': typecode, 'offset': self._file.tell()}
+            self._file.write(data)
+        self._ghosts.append(entry)
+        return len(self._ghosts) - 1
+
+    def close(self):
+        """Write the index and header and move the store into place."""
+        if self._file.closed:
+            return
+        try:
+            self._align()
+            index_offset = self._file.tell()
+            index = json.dumps({'ghosts': self._ghosts}, separators=(',', ':')).encode('utf-8')
+            self._file.write(index)
+            self._file.seek(0)
+            self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(self._ghosts), index_offset, len(index)))
+            self._file.close()
+            # mkstemp creates the file 0600; give the store the usual umask-based mode
+            os.chmod(self._tmp_path, _default_file_mode())
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        """Discard the store being written."""
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def _align(self):
+        padding = -self._file.tell() % ALIGNMENT
+        if padding:
+            self._file.write(bytes(padding))
+
+
+def write_store(path, results):
+    """Write parse results to a new store.
+
+    Args:
+        path: Store file to create
+        results: Iterable of parse_gbx() results or (name, result) pairs
+
+    Returns:
+        Number of ghosts written
+    """
+    with StoreWriter(path) as writer:
+        count = 0
+        for item in results:
+            name, result = item if isinstance(item, tuple) else (None, item)
+            writer.add(result, name=name)
+            count += 1
+    return count
+
+
+class StoredGhost:
+    """One ghost of a TelemetryStore; channels are views of the mapped file."""
+
+    def __init__(self, store, entry):
+        self._store = store
+        self.name = entry['name']
+        self.metadata = entry['metadata']
+        self.ghost_info = entry['ghost_info']
+        self.num_samples = entry['num_samples']
+        self._channels = entry['channels']
+
+    def __repr__(self):
+        return f"StoredGhost(name={self.name!r}, num_samples={self.num_samples}, channels={len(self._channels)})"
+
+    def __len__(self):
+        return self.num_samples
+
+    def __contains__(self, field):
+        return field in self._channels
+
+    @property
+    def fields(self):
+        """Names of the stored channels."""
+        return tuple(self._channels)
+
+    def _locate(self, field):
+        try:
+            channel = self._channels[field]
+        except KeyError:
+            raise KeyError(f"channel not stored: {field!r}") from None
+        return channel['type'], channel['offset']
+
+    def channel(self, field):
+        """Channel as a memoryview of the mapped file (flags as 0/1 bytes).
+
+        The view is zero-copy on little-endian hosts; elsewhere a byte-swapped
+        array.array copy is returned.
+        """
+        typecode, offset = self._locate(field)
+        size = self.num_samples * array(typecode).itemsize
+        view = self._store._view[offset:offset + size]
+        if _LITTLE_ENDIAN:
+            return view.cast(typecode)
+        column = array(typecode, view.tobytes())
+        column.byteswap()
+        return column
+
+    def numpy(self, field):
+        """Channel as a read-only NumPy array viewing the mapped file (flags as bool)."""
+        if np is None:
+            raise ImportError("numpy is required for TelemetryStore numpy access")
+        typecode, offset = self._locate(field)
+        values = np.frombuffer(self._store._mmap, dtype=_NUMPY_TYPES[typecode],
+                               count=self.num_samples, offset=offset)
+        return values.view(bool) if field in _BOOL_FIELDS else values
+
+    def columns(self, fields=None):
+        """Dict of channel name -> NumPy array, like parse_gbx(columnar=True)."""
+        return {field: self.numpy(field) for field in (fields if fields is not None else self._channels)}
+
+    def to_trace(self):
+        """Copy the ghost into a GhostTrace (row dicts, no file mapping)."""
+        trace = GhostTrace(self.fields)
+        for field in trace.fields:
+            trace.column(field).extend(self.channel(field))
+        return trace
+
+
+class TelemetryStore:
+    """Read-only, memory-mapped view of a store written by StoreWriter.
+
+    store[i] returns the i-th StoredGhost, store.find(name) looks one up by
+    name. Views returned by StoredGhost.channel() and numpy() point into the
+    mapping and keep it alive after close() until they are released.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Store file
+
+        Raises:
+            ValueError: The file is not a store, or uses an unknown format version
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path}: not a tm_gbx telemetry store (empty file)") from None
+        self._view = memoryview(self._mmap)
+        try:
+            self._ghosts = self._read_index()
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_index(self):
+        if len(self._mmap) < HEADER_SIZE:
+            raise ValueError(f"{self.path}: not a tm_gbx telemetry store (truncated header)")
+        magic, version, _, count, index_offset, index_length = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: not a tm_gbx telemetry store")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unsupported store format version {version}")
+        if index_offset + index_length > len(self._mmap):
+            raise ValueError(f"{self.path}: truncated store index")
+
+        index = json.loads(self._mmap[index_offset:index_offset + index_length].decode('utf-8'))
+        ghosts = [StoredGhost(self, entry) for entry in index['ghosts']]
+        if len(ghosts) != count:
+            raise ValueError(f"{self.path}: store index lists {len(ghosts)} ghosts, header {count}")
+        return ghosts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._ghosts)
+
+    def __getitem__(self, index):
+        return self._ghosts[index]
+
+    def __iter__(self):
+        return iter(self._ghosts)
+
+    def __repr__(self):
+        return f"TelemetryStore({self.path!r}, ghosts={len(self._ghosts)})"
+
+    def names(self):
+        return [ghost.name for ghost in self._ghosts]
+
+    def find(self, name):
+        """First ghost stored under name, or None."""
+        for ghost in self._ghosts:
+            if ghost.name == name:
+                return ghost
+        return None
+
+    def close(self):
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:  # channel views still exported - the mapping is unmapped with the last one
+            pass
+        self._file.close()
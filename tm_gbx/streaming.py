@@ -0,0 +1,264 @@
+"""Bounded-memory streaming decompression.
+
+InflateReader is a read-only file object over a zlib stream that is inflated
+on demand with zlib.decompressobj, at most chunk_size bytes at a time. Bytes
+that have been read are dropped, forward seeks inflate and discard, and the
+compressed input is pulled from the source in chunk_size pieces - so neither
+the compressed payload nor the inflated stream is ever held in full.
+
+iter_stream_record_samples() frames a CPlugEntRecordData record from such a
+reader and yields samples as they are framed; it stops reading once the
+vehicle entity ends, so the rest of the record is never inflated.
+parser.iter_ghost_samples(streaming=True) chains the two: the body walk of
+tm_gbx.body reads a zlib body through one InflateReader, and the record chunk
+it reaches is inflated through a second one reading from the first.
+
+Every reader reports to a BufferMeter, which tracks the bytes buffered by all
+readers together and their peak. That peak is bounded by about two chunks per
+reader plus the largest single read (a 107-byte sample, or one column-oriented
+entity of a version 11 record).
+"""
+
+import io
+import struct
+import zlib
+
+from .ghost import (
+    VEHICLE_VIS_CLASS_ID, _COLUMN_ENTITY_HEAD, _ENT_DESC_HEAD, _ENTITY_HEAD, _RECORD_TIMES,
+    _SAMPLE2_HEAD, _SAMPLE_HEAD, _decode_column_entity, _entity_class_id,
+)
+
+CHUNK_SIZE = 64 * 1024
+
+# Consumed bytes kept when the buffer is refilled, for short backward seeks
+# (the body walk steps back over a 4-byte chunk marker)
+_SEEK_BACK = 16
+
+
+class BufferMeter:
+    """Bytes buffered by a group of InflateReaders, and their peak."""
+
+    def __init__(self):
+        self.buffered = 0
+        self.peak = 0
+
+    def add(self, size):
+        self.buffered += size
+        if self.buffered > self.peak:
+            self.peak = self.buffered
+
+
+class InflateReader:
+    """Read-only file object over a zlib stream, inflated as it is read.
+
+    Supports read(), tell() and seek() - forward to any position, backward
+    only a few bytes behind the read position.
+    """
+
+    def __init__(self, source, compressed_size, wbits=zlib.MAX_WBITS, chunk_size=CHUNK_SIZE,
+                 meter=None):
+        """Wrap the next compressed_size bytes of source.
+
+        Args:
+            source: File object positioned at the zlib stream
+            compressed_size: Length of the stream in source
+            wbits: zlib window bits (-15 for raw deflate)
+            chunk_size: Compressed bytes pulled from source, and bytes
+                inflated, per step
+            meter: BufferMeter shared with other readers (default: own meter)
+        """
+        self.compressed_bytes = 0   # read from source so far
+        self.inflated_bytes = 0     # inflated so far
+        self.meter = meter if meter is not None else BufferMeter()
+
+        self._source = source
+        self._remaining = compressed_size
+        self._inflater = zlib.decompressobj(wbits)
+        self._chunk_size = chunk_size
+        self._buf = b''
+        self._pos = 0
+        self._base = 0      # stream position of _buf[0]
+        self._held = 0
+
+    @property
+    def eof(self):
+        """True once the whole stream has been inflated and read."""
+        return self._inflater.eof and self._pos >= len(self._buf)
+
+    def tell(self):
+        return self._base + self._pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            while self._fill(len(self._buf) - self._pos + self._chunk_size):
+                pass
+            size = len(self._buf) - self._pos
+        elif self._pos + size > len(self._buf):
+            self._fill(size)
+
+        data = self._buf[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.tell()
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("InflateReader can't seek relative to the end")
+
+        if offset < self._base:
+            raise io.UnsupportedOperation(f"Can't seek back to {offset}: stream is at {self.tell()}")
+
+        # Inflate and discard up to the target
+        while offset > self._base + len(self._buf):
+            self._pos = len(self._buf)
+            if not self._fill(self._chunk_size, keep=0):
+                break
+        self._pos = min(offset - self._base, len(self._buf))
+        return self.tell()
+
+    def _fill(self, size, keep=_SEEK_BACK):
+        """Inflate until size bytes are buffered past the read position.
+
+        Returns False if the stream ended before anything new was inflated.
+        """
+        inflater = self._inflater
+        keep = min(self._pos, keep)
+        pieces = [self._buf[self._pos - keep:]]
+        self._base += self._pos - keep
+        self._pos = keep
+        have = len(pieces[0]) - keep
+        inflated = 0
+
+        while have < size and not inflater.eof:
+            data = inflater.unconsumed_tail
+            if not data and self._remaining > 0:
+                data = self._source.read(min(self._chunk_size, self._remaining))
+                self._remaining = self._remaining - len(data) if data else 0
+                self.compressed_bytes += len(data)
+            out = inflater.decompress(data, self._chunk_size)
+            if not out:
+                if not data:
+                    break
+                continue
+            pieces.append(out)
+            have += len(out)
+            inflated += len(out)
+
+        self._buf = b''.join(pieces) if len(pieces) > 1 else pieces[0]
+        self.inflated_bytes += inflated
+
+        held = len(self._buf) + len(inflater.unconsumed_tail)
+        self.meter.add(held - self._held)
+        self._held = held
+        return inflated > 0
+
+    def close(self):
+        """Release the buffers (the source is left open)."""
+        self._buf = b''
+        self._pos = 0
+        self.meter.add(-self._held)
+        self._held = 0
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise EOFError(f"Failed to read {size} bytes")
+    return data
+
+
+def _read_byte(f):
+    return _read_exact(f, 1)[0]
+
+
+def _read_stream_record_header(f):
+    """Read the record header from f; returns the entity class IDs or None if implausible."""
+    _read_exact(f, _RECORD_TIMES.size)
+    count, = struct.unpack('<I', _read_exact(f, 4))
+    if count > 10000:
+        return None
+
+    descs = []
+    for _ in range(count):
+        class_id, _, _, _, data_length = _ENT_DESC_HEAD.unpack(_read_exact(f, _ENT_DESC_HEAD.size))
+        f.seek(data_length, io.SEEK_CUR)
+        _read_exact(f, 4)
+        descs.append({'class_id': class_id})
+
+    count, = struct.unpack('<I', _read_exact(f, 4))
+    if count > 10000:
+        return None
+    f.seek(12 * count, io.SEEK_CUR)
+    return descs
+
+
+def iter_stream_record_samples(f, version=10, decode_sample=None):
+    """Yield the decoded samples of the first vehicle entity of a record stream.
+
+    The streaming counterpart of ghost.iter_record_samples: the record is
+    read from the file object f (usually an InflateReader over the record
+    chunk) as it is framed, and nothing after the vehicle entity is read.
+    Payloads of other entities and descriptors are skipped with seek().
+
+    Args:
+        f: File object positioned at the start of the decompressed record
+        version: Record version
+        decode_sample: Sample decoder (default: all 52 fields)
+
+    Yields:
+        dict per sample, as decode_sample returns it
+
+    Raises:
+        EOFError, struct.error, zlib.error: On a truncated or corrupt record
+    """
+    if decode_sample is None:
+        from .projection import make_sample_decoder
+        decode_sample = make_sample_decoder(None)
+
+    descs = _read_stream_record_header(f)
+    if descs is None:
+        return
+
+    if version >= 11:
+        while _read_byte(f) == 1:
+            head = _COLUMN_ENTITY_HEAD.unpack(_read_exact(f, _COLUMN_ENTITY_HEAD.size))
+            entity_type, _, start, _, _, num_samples, num_keys, _ = head
+            times_size = 4 * max(num_samples - 1, 0)
+            size = times_size + num_samples * num_keys
+            if _entity_class_id(entity_type, descs) != VEHICLE_VIS_CLASS_ID:
+                f.seek(size, io.SEEK_CUR)
+                continue
+
+            # One entity's columns are needed at once to rebuild its rows
+            entity = {'start': start, 'num_samples': num_samples, 'num_keys': num_keys,
+                      'times_offset': 0, 'columns_offset': times_size}
+            rows, sample_refs = _decode_column_entity(memoryview(_read_exact(f, size)), entity)
+            rows = memoryview(rows)
+            for time_ms, offset, length in sample_refs:
+                sample = decode_sample(time_ms, rows[offset:offset + length])
+                if sample:
+                    yield sample
+            return
+        return
+
+    has_entity = _read_byte(f)
+    while has_entity == 1:
+        entity_type = _ENTITY_HEAD.unpack(_read_exact(f, _ENTITY_HEAD.size))[0]
+        is_vehicle = _entity_class_id(entity_type, descs) == VEHICLE_VIS_CLASS_ID
+
+        while _read_byte(f) == 1:
+            time_ms, length = _SAMPLE_HEAD.unpack(_read_exact(f, _SAMPLE_HEAD.size))
+            if not is_vehicle:
+                f.seek(length, io.SEEK_CUR)
+                continue
+            sample = decode_sample(time_ms, _read_exact(f, length))
+            if sample:
+                yield sample
+        if is_vehicle:
+            return
+
+        has_entity = _read_byte(f)
+        while _read_byte(f) == 1:
+            length = _SAMPLE2_HEAD.unpack(_read_exact(f, _SAMPLE2_HEAD.size))[2]
+            f.seek(length, io.SEEK_CUR)
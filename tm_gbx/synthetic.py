@@ -0,0 +1,411 @@
+"""Synthetic GBX replay generator for scale testing.
+
+build_gbx() writes the structures parse_gbx() reads: header chunks 0x03093000
+and 0x03093001, an empty reference table and a zlib-compressed body holding
+the embedded map chunk, the ghost list with one CGameCtnGhost node and that
+ghost's CPlugEntRecordData record. The record holds one or more
+CSceneVehicleVis entities, per-sample tagged (version 10) or column-oriented
+(version 11).
+
+Samples follow a car lapping a loop at 20 Hz and are derived from the spec's
+seed, so a file can always be checked against its spec without storing the
+expected samples:
+
+    specs = generate_corpus("corpus/", count=1000, duration_s=(30, 600))
+    failures = check_corpus("corpus/")     # [] when every file round-trips
+"""
+
+import json
+import math
+import multiprocessing
+import os
+import random
+import struct
+import tempfile
+import zlib
+from collections import namedtuple
+from itertools import chain
+
+from .ghost import VEHICLE_VIS_CLASS_ID, VEHICLE_VIS_SAMPLE_SIZE, parse_vehicle_vis_sample
+
+try:
+    import numpy as np
+except ImportError:  # NumPy not available - v11 columns are delta-encoded in Python
+    np = None
+
+SAMPLE_PERIOD_MS = 50
+CORPUS_MANIFEST = 'corpus.json'
+CORPUS_VERSION = 1
+
+# Row size of version 11 entities: the 107-byte sample plus 9 trailing bytes
+COLUMN_ROW_SIZE = 116
+
+REPLAY_CLASS_ID = 0x03093000
+GHOST_CLASS_ID = 0x03092000
+RECORD_CLASS_ID = 0x0911F000
+NODE_END = 0xFACADE01
+
+# Lookback ID index of a string stored inline (first use) and of an empty ID
+_NEW_ID = 0x40000000
+_EMPTY_ID = 0xFFFFFFFF
+_ID_VERSION = 3
+
+# Sample bytes 47-68: position, rotation (angle, axis), speed, velocity direction
+_MOTION = struct.Struct('<3fHhhhbb')
+_MOTION_OFFSET = 47
+
+
+class SyntheticSpec(namedtuple('SyntheticSpec', [
+        'name', 'seed', 'num_samples', 'entities', 'record_version', 'compression_level', 'map_size'])):
+    """Everything a synthetic replay is generated from.
+
+    Attributes:
+        name: File name
+        seed: Seed of the sample and map data
+        num_samples: Samples per vehicle entity (20 per second)
+        entities: Number of vehicle entities in the record
+        record_version: CPlugEntRecordData version (10 or 11)
+        compression_level: zlib level of the body and the record
+        map_size: Size of the embedded map data blob in the body
+    """
+
+    __slots__ = ()
+
+    @property
+    def race_time_ms(self):
+        return (self.num_samples - 1) * SAMPLE_PERIOD_MS
+
+    @property
+    def nickname(self):
+        return f"Synthetic {self.seed}"
+
+    @property
+    def login(self):
+        return f"synth-{self.seed:08x}"
+
+    @property
+    def map_uid(self):
+        return f"SynthLoop{self.seed % 1000:03d}xxxxxxxxxxxxxxx"
+
+
+def make_spec(name='synthetic.Replay.Gbx', seed=0, duration_s=60.0, entities=1, record_version=10,
+              compression_level=6, map_size=0):
+    """Build a SyntheticSpec for a ghost of duration_s seconds."""
+    if record_version not in (10, 11):
+        raise ValueError(f"Unsupported record version: {record_version!r}")
+    if entities < 1:
+        raise ValueError("A synthetic record needs at least one entity")
+    num_samples = int(duration_s * 1000) // SAMPLE_PERIOD_MS + 1
+    return SyntheticSpec(name, seed, num_samples, entities, record_version, compression_level, map_size)
+
+
+def synthetic_samples(seed, num_samples, entity=0):
+    """Return [(time_ms, 107-byte sample)] of one vehicle entity.
+
+    The car laps a loop of slightly varying radius with varying speed, full
+    throttle and ground contact; wheel rotation, RPM, gear and side speed
+    follow the motion.
+    """
+    rng = random.Random(seed * 1000 + entity)
+    radius = 150.0 + 30.0 * entity + rng.uniform(0, 50)
+    center_x, center_z = rng.uniform(200, 800), rng.uniform(200, 800)
+    theta = rng.uniform(0, 2 * math.pi)
+    phase = rng.uniform(0, 2 * math.pi)
+    wheel_rot = 0
+
+    sample = bytearray(VEHICLE_VIS_SAMPLE_SIZE)
+    sample[14] = 160            # steer: constant left turn
+    sample[15] = 255            # gas
+    sample[23:31:2] = b'\x80' * 4  # half-compressed suspension
+    sample[89] = 0x01           # ground contact
+    sample[90] = 0x60           # reactor air control: accel, no steer
+    sample[102] = 255           # simulation time coefficient
+
+    samples = []
+    for index in range(num_samples):
+        t = index * SAMPLE_PERIOD_MS / 1000.0
+        speed = 40.0 + 15.0 * math.sin(0.2 * t + phase)      # m/s
+        theta += speed * SAMPLE_PERIOD_MS / 1000.0 / radius
+        heading = (theta + math.pi / 2) % (2 * math.pi)
+        wheel_rot = (wheel_rot + int(speed)) & 0xFF
+
+        _MOTION.pack_into(
+            sample, _MOTION_OFFSET,
+            center_x + radius * math.cos(theta),
+            10.0 + 4.0 * math.sin(3 * theta),
+            center_z + radius * math.sin(theta),
+            round(heading / 2 * 65535 / math.pi),                     # rotation about the up axis
+            0, 32767,
+            round(math.log(speed) * 1000),
+            round((heading if heading <= math.pi else heading - 2 * math.pi) / math.pi * 127),
+            0)
+        struct.pack_into('<H', sample, 2, 32768 + rng.randrange(-200, 200))
+        sample[5] = min(255, int(speed * 4))                          # RPM
+        sample[6:14:2] = bytes([wheel_rot]) * 4
+        sample[91] = min(5, 1 + int(speed / 12))                      # gear
+        samples.append((index * SAMPLE_PERIOD_MS, bytes(sample)))
+    return samples
+
+
+def build_gbx(spec):
+    """Return the bytes of the synthetic replay described by spec."""
+    entities = [synthetic_samples(spec.seed, spec.num_samples, entity) for entity in range(spec.entities)]
+    if spec.record_version >= 11:
+        record = _build_column_record(entities)
+    else:
+        record = _build_record(entities)
+
+    body = _build_body(spec, record)
+    compressed_body = zlib.compress(body, spec.compression_level)
+    user_data = _build_user_data(spec)
+
+    out = [b'GBX', struct.pack('<H', 6), b'BUCR', struct.pack('<II', REPLAY_CLASS_ID, len(user_data)),
+           user_data, struct.pack('<i', 3),                     # num_nodes
+           struct.pack('<i', 0),                                # no external references
+           struct.pack('<II', len(body), len(compressed_body)), compressed_body]
+    return b''.join(out)
+
+
+def write_gbx(path, spec):
+    """Write the synthetic replay described by spec to path atomically."""
+    data = build_gbx(spec)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return len(data)
+
+
+def _string(value):
+    data = value.encode('utf-8')
+    return struct.pack('<I', len(data)) + data
+
+
+def _new_id(value, first=False):
+    """A lookback ID stored inline; the first ID of a section carries the version."""
+    prefix = struct.pack('<I', _ID_VERSION) if first else b''
+    return prefix + struct.pack('<I', _NEW_ID) + _string(value)
+
+
+def _build_user_data(spec):
+    chunk_3000 = b''.join([
+        struct.pack('<I', 8),
+        _new_id(spec.map_uid, first=True), struct.pack('<I', _EMPTY_ID), _new_id('synth'),
+        struct.pack('<i', spec.race_time_ms),
+        _string(spec.nickname), _string(spec.login),
+        b'\x00', _new_id('TMStadium'),
+    ])
+    chunk_3001 = _string(
+        f'<header type="replay" exever="3.3.0" exebuild="synthetic" title="TMStadium">'
+        f'<map uid="{spec.map_uid}" name="Synthetic Loop {spec.seed % 1000}" author="synth"/>'
+        f'<times best="{spec.race_time_ms}" respawns="0" stuntscore="0" validable="1"/>'
+        f'<checkpoints cur="3"/></header>')
+
+    chunks = [(0x03093000, chunk_3000), (0x03093001, chunk_3001)]
+    out = [struct.pack('<I', len(chunks))]
+    out += [struct.pack('<II', chunk_id, len(data)) for chunk_id, data in chunks]
+    out += [data for _, data in chunks]
+    return b''.join(out)
+
+
+def _build_body(spec, record):
+    """Replay body: embedded map, a ghost list with one ghost node, clip and end."""
+    map_data = b''
+    if spec.map_size:
+        map_data = random.Random(spec.seed).getrandbits(8 * spec.map_size).to_bytes(spec.map_size, 'little')
+    compressed_record = zlib.compress(record, spec.compression_level)
+
+    ghost = b''.join([
+        struct.pack('<I', 8),
+        _new_id('CarSport', first=True), struct.pack('<I', _EMPTY_ID), _new_id('Nadeo'),
+        struct.pack('<fff', 1.0, 0.5, 0.0),                         # light trail color
+        struct.pack('<II', 0, 0),                                   # no skin packs, no badges
+        _string(spec.nickname), _string(''), _string(''), struct.pack('<I', 0),
+        struct.pack('<iI', 2, RECORD_CLASS_ID),                     # record node, stored inline
+        struct.pack('<IIII', RECORD_CLASS_ID, spec.record_version, len(record), len(compressed_record)),
+        compressed_record, struct.pack('<I', NODE_END),
+        struct.pack('<I', 0),                                       # no record offsets
+        _string('SYN'), _string('World|Synthetic'), _string(''),
+    ])
+
+    return b''.join([
+        struct.pack('<II', 0x03093002, len(map_data)), map_data,
+        struct.pack('<IIIiI', 0x03093014, 10, 1, 1, GHOST_CLASS_ID),
+        struct.pack('<IIII', 0x0303F006, 0, 0, 0),                 # no CGameGhost sample data
+        struct.pack('<I', 0x03092000), b'PIKS', struct.pack('<I', len(ghost)), ghost,
+        struct.pack('<I', 0x0309200F), _string(spec.login),
+        struct.pack('<I', 0x03092010), struct.pack('<I', _NEW_ID), _string(spec.map_uid),
+        struct.pack('<I', NODE_END),
+        struct.pack('<II', 0, 0),                                   # u01, no extras
+        struct.pack('<Ii', 0x03093015, -1),                         # no MediaTracker clip
+        struct.pack('<I', NODE_END),
+    ])
+
+
+def _record_header(entities, sample_size):
+    end_time = (len(entities[0]) - 1) * SAMPLE_PERIOD_MS
+    return b''.join([
+        struct.pack('<ii', 0, end_time),
+        struct.pack('<I', 1), struct.pack('<IiiiI', VEHICLE_VIS_CLASS_ID, sample_size, 0, 0, 0),
+        struct.pack('<i', 0),
+        struct.pack('<I', 0),                                       # no notice descriptors
+    ])
+
+
+def _build_record(entities):
+    """Version 10 record: samples tagged one by one, entities chained by hasNext."""
+    out = [_record_header(entities, VEHICLE_VIS_SAMPLE_SIZE), b'\x01']
+    sample_head = struct.Struct('<BiI')
+    for index, samples in enumerate(entities):
+        out.append(struct.pack('<iiiii', 0, 0, 0, 0, 0))
+        for time_ms, data in samples:
+            out.append(sample_head.pack(1, time_ms, len(data)))
+            out.append(data)
+        out.append(struct.pack('<BBB', 0, int(index < len(entities) - 1), 0))
+    out.append(b'\x00')
+    return b''.join(out)
+
+
+def _build_column_record(entities):
+    """Version 11 record: per entity, time deltas and delta-encoded byte columns."""
+    out = [_record_header(entities, COLUMN_ROW_SIZE)]
+    padding = bytes(COLUMN_ROW_SIZE - VEHICLE_VIS_SAMPLE_SIZE)
+    for samples in entities:
+        num_samples = len(samples)
+        out.append(struct.pack('<BiIiiiIII', 1, 0, 0x02000006, 0, samples[-1][0], 0,
+                               num_samples, COLUMN_ROW_SIZE, 0))
+        out.append(struct.pack(f'<{num_samples - 1}I', *[SAMPLE_PERIOD_MS] * (num_samples - 1)))
+        rows = b''.join(data + padding for _, data in samples)
+        out.append(_delta_columns(rows, num_samples))
+    out.append(b'\x00')
+    return b''.join(out)
+
+
+def _delta_columns(rows, num_samples):
+    """Transpose rows into columns, each stored as its first byte and byte deltas."""
+    if np is not None:
+        columns = np.frombuffer(rows, np.uint8).reshape(num_samples, COLUMN_ROW_SIZE).T
+        return np.diff(columns, axis=1, prepend=np.zeros((COLUMN_ROW_SIZE, 1), np.uint8)).tobytes()
+
+    out = bytearray()
+    for key in range(COLUMN_ROW_SIZE):
+        column = rows[key::COLUMN_ROW_SIZE]
+        out += bytes((b - a) & 0xFF for a, b in zip(chain((0,), column), column))
+    return bytes(out)
+
+
+def check_gbx(path, spec):
+    """Parse a synthetic replay and compare it with its spec.
+
+    Returns:
+        list of problem descriptions; empty if the file round-trips
+    """
+    from .parser import parse_gbx_ghosts
+
+    result = parse_gbx_ghosts(path)
+    problems = []
+
+    metadata = result['metadata']
+    expected_metadata = {
+        'map_uid': spec.map_uid,
+        'race_time_ms': spec.race_time_ms,
+        'player_nickname': spec.nickname,
+        'player_login': spec.login,
+    }
+    for key, value in expected_metadata.items():
+        if metadata.get(key) != value:
+            problems.append(f"metadata {key}: {metadata.get(key)!r} != {value!r}")
+
+    ghosts = result['ghosts']
+    if len(ghosts) != spec.entities:
+        problems.append(f"{len(ghosts)} vehicle entities, expected {spec.entities}")
+
+    for entity, ghost in enumerate(ghosts[:spec.entities]):
+        if ghost['player'].get('nickname') != spec.nickname:
+            problems.append(f"entity {entity}: player {ghost['player']!r}")
+        info = ghost['ghost_info']
+        if info['num_samples'] != spec.num_samples or info['end_time'] != spec.race_time_ms:
+            problems.append(f"entity {entity}: ghost_info {info!r}")
+        expected = [parse_vehicle_vis_sample(time_ms, data)
+                    for time_ms, data in synthetic_samples(spec.seed, spec.num_samples, entity)]
+        if ghost['ghost_samples'] != expected:
+            mismatch = next((i for i, (a, b) in enumerate(zip(ghost['ghost_samples'], expected)) if a != b),
+                            min(len(ghost['ghost_samples']), len(expected)))
+            problems.append(f"entity {entity}: samples differ from sample {mismatch}")
+    return problems
+
+
+def _map(func, items, workers):
+    if workers == 1 or len(items) <= 1:
+        return list(map(func, items))
+    with multiprocessing.Pool(workers) as pool:
+        return pool.map(func, items, chunksize=max(1, len(items) // (4 * (workers or os.cpu_count() or 1))))
+
+
+def _write_job(job):
+    directory, spec = job
+    return write_gbx(os.path.join(directory, spec.name), spec)
+
+
+def _check_job(job):
+    directory, spec = job
+    try:
+        return spec.name, check_gbx(os.path.join(directory, spec.name), spec)
+    except Exception as e:
+        return spec.name, [f"{type(e).__name__}: {e}"]
+
+
+def generate_corpus(output_dir, count, duration_s=60.0, entities=1, record_version=10,
+                    compression_level=6, map_size=0, seed=0, workers=1):
+    """Write count synthetic replays and a corpus.json manifest of their specs.
+
+    Args:
+        output_dir: Directory to write to (created if missing)
+        count: Number of files
+        duration_s: Ghost length in seconds, or a (min, max) range that each
+            file's length is drawn from
+        entities, record_version, compression_level, map_size: See SyntheticSpec
+        seed: Seed of the corpus; file i uses seed + i
+        workers: Worker processes (None = CPU count)
+
+    Returns:
+        list of SyntheticSpec, one per file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    specs = []
+    for index in range(count):
+        duration = rng.uniform(*duration_s) if isinstance(duration_s, (tuple, list)) else duration_s
+        specs.append(make_spec(f"synthetic-{index:05d}.Replay.Gbx", seed + index, duration, entities,
+                               record_version, compression_level, map_size))
+
+    _map(_write_job, [(output_dir, spec) for spec in specs], workers)
+
+    with open(os.path.join(output_dir, CORPUS_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump({'version': CORPUS_VERSION, 'files': [spec._asdict() for spec in specs]}, f)
+    return specs
+
+
+def load_corpus(directory):
+    """Return the SyntheticSpecs recorded in a corpus directory's manifest."""
+    with open(os.path.join(directory, CORPUS_MANIFEST), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != CORPUS_VERSION:
+        raise ValueError(f"Unsupported corpus manifest version: {data.get('version')!r}")
+    return [SyntheticSpec(**entry) for entry in data['files']]
+
+
+def check_corpus(directory, workers=1):
+    """Round-trip check every file of a corpus.
+
+    Returns:
+        list of (file name, problems) for the files that don't round-trip
+    """
+    specs = load_corpus(directory)
+    results = _map(_check_job, [(directory, spec) for spec in specs], workers)
+    return [(name, problems) for name, problems in results if problems]
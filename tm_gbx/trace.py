@@ -0,0 +1,128 @@
+"""Compact array-backed ghost sample storage.
+
+GhostTrace keeps each telemetry channel in a stdlib array.array (float32 for
+continuous channels, int32 for time_ms, uint8/int8 for small integers and
+flags) instead of one dict of boxed Python objects per sample, which cuts the
+memory of a decoded ghost by more than an order of magnitude. Rows are still
+available as dicts for code written against the list-of-dicts output.
+"""
+
+from array import array
+
+from .ghost import SAMPLE_FIELDS
+
+
+# array.array typecode per field; everything not listed is float32 ('f')
+_TYPECODES = {
+    'time_ms': 'i',
+    'rpm': 'B',
+    'fl_ground_mat': 'B', 'fr_ground_mat': 'B', 'rr_ground_mat': 'B', 'rl_ground_mat': 'B',
+    'reactor_state': 'b', 'reactor_boost': 'b', 'reactor_pedal': 'b', 'reactor_steer': 'b',
+    'is_turbo': 'B', 'is_ground_contact': 'B', 'is_top_contact': 'B',
+    'fl_slip': 'B', 'fr_slip': 'B', 'rr_slip': 'B', 'rl_slip': 'B',
+}
+
+# Flags are stored as 0/1 bytes and returned as bool in rows
+_BOOL_FIELDS = frozenset(('is_turbo', 'is_ground_contact', 'is_top_contact',
+                          'fl_slip', 'fr_slip', 'rr_slip', 'rl_slip'))
+
+
+class GhostTrace:
+    """Ghost samples stored column-wise in array.array channels.
+
+    trace[i] returns sample i as a dict (like the list-of-dicts output, with
+    float32 precision), trace['speed'] returns the whole channel array, and
+    iterating yields the row dicts in order.
+    """
+
+    __slots__ = ('_fields', '_columns')
+
+    def __init__(self, fields=None):
+        """Create an empty trace.
+
+        Args:
+            fields: Channels to store (names from ghost.SAMPLE_FIELDS);
+                defaults to all 52
+        """
+        self._fields = tuple(fields) if fields is not None else SAMPLE_FIELDS
+        self._columns = tuple(array(_TYPECODES.get(name, 'f')) for name in self._fields)
+
+    @classmethod
+    def from_samples(cls, samples, fields=None):
+        """Build a trace from an iterable of sample dicts.
+
+        Args:
+            samples: Iterable of decoded sample dicts (e.g. iter_ghost_samples())
+            fields: Channels to store; defaults to all 52
+
+        Returns:
+            GhostTrace
+        """
+        trace = cls(fields)
+        append = trace.append
+        for sample in samples:
+            append(sample)
+        return trace
+
+    def append(self, sample):
+        """Append one decoded sample dict."""
+        for name, column in zip(self._fields, self._columns):
+            column.append(sample[name])
+
+    @property
+    def fields(self):
+        """Names of the stored channels."""
+        return self._fields
+
+    def keys(self):
+        return self._fields
+
+    def column(self, name):
+        """Return the array.array of one channel."""
+        try:
+            return self._columns[self._fields.index(name)]
+        except ValueError:
+            raise KeyError(name) from None
+
+    def row(self, index):
+        """Return sample `index` as a dict."""
+        return {
+            name: (column[index] != 0 if name in _BOOL_FIELDS else column[index])
+            for name, column in zip(self._fields, self._columns)
+        }
+
+    def __len__(self):
+        return len(self._columns[0]) if self._columns else 0
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, slice):
+            trace = GhostTrace(self._fields)
+            trace._columns = tuple(column[key] for column in self._columns)
+            return trace
+        return self.row(key)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def __contains__(self, name):
+        return name in self._fields
+
+    def __eq__(self, other):
+        if not isinstance(other, GhostTrace):
+            return NotImplemented
+        return self._fields == other._fields and self._columns == other._columns
+
+    def __repr__(self):
+        return f"<GhostTrace: {len(self)} samples, {len(self._fields)} channels, {self.nbytes:,} bytes>"
+
+    @property
+    def nbytes(self):
+        """Bytes used by the channel data."""
+        return sum(len(column) * column.itemsize for column in self._columns)
+
+    def to_list(self):
+        """Return the samples as a plain list of dicts."""
+        return list(self)
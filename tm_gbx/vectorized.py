@@ -0,0 +1,238 @@
+"""Vectorized NumPy decoder for CSceneVehicleVis samples.
+
+Batch counterpart of ghost.parse_vehicle_vis_sample(): all 107-byte samples of a
+vehicle entity are viewed as one structured NumPy array and every derived channel
+is computed with whole-array operations. Returns columns instead of per-sample dicts.
+
+NumPy is optional - install it to use this module.
+"""
+
+from .ghost import SAMPLE_FIELDS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy not available - batch decoding disabled
+    np = None
+
+
+if np is not None:
+    # Raw CSceneVehicleVis layout (same byte offsets as parse_vehicle_vis_sample)
+    VEHICLE_VIS_DTYPE = np.dtype({
+        'names': [
+            'side_speed', 'rpm',
+            'fl_wheel_rot', 'fl_wheel_count', 'fr_wheel_rot', 'fr_wheel_count',
+            'rr_wheel_rot', 'rr_wheel_count', 'rl_wheel_rot', 'rl_wheel_count',
+            'steer', 'gas', 'brake', 'turbo_time',
+            'fl_dampen', 'fl_ground_mat', 'fr_dampen', 'fr_ground_mat',
+            'rr_dampen', 'rr_ground_mat', 'rl_dampen', 'rl_ground_mat',
+            'is_turbo', 'slip_byte1', 'slip_byte2',
+            'x', 'y', 'z',
+            'angle', 'axis_heading', 'axis_pitch', 'speed',
+            'vel_heading', 'vel_pitch',
+            'is_top_contact',
+            'fl_ice', 'fr_ice', 'rr_ice', 'rl_ice',
+            'reactor_flags', 'reactor_control', 'gear',
+            'fl_dirt', 'fr_dirt', 'rr_dirt', 'rl_dirt',
+            'wetness', 'sim_time_coef',
+        ],
+        'formats': [
+            '<u2', 'u1',
+            'u1', 'u1', 'u1', 'u1',
+            'u1', 'u1', 'u1', 'u1',
+            'u1', 'u1', 'u1', 'u1',
+            'u1', 'u1', 'u1', 'u1',
+            'u1', 'u1', 'u1', 'u1',
+            'u1', 'u1', 'u1',
+            '<f4', '<f4', '<f4',
+            '<u2', '<i2', '<i2', '<i2',
+            'i1', 'i1',
+            'u1',
+            'u1', 'u1', 'u1', 'u1',
+            'u1', 'u1', 'u1',
+            'u1', 'u1', 'u1', 'u1',
+            'u1', 'u1',
+        ],
+        'offsets': [
+            2, 5,
+            6, 7, 8, 9,
+            10, 11, 12, 13,
+            14, 15, 18, 21,
+            23, 24, 25, 26,
+            27, 28, 29, 30,
+            31, 32, 33,
+            47, 51, 55,
+            59, 61, 63, 65,
+            67, 68,
+            76,
+            81, 82, 83, 84,
+            89, 90, 91,
+            93, 95, 97, 99,
+            101, 102,
+        ],
+        'itemsize': 107,
+    })
+else:
+    VEHICLE_VIS_DTYPE = None
+
+
+def decode_vehicle_vis_samples(buffer, samples, fields=None):
+    """Decode all CSceneVehicleVis samples of an entity into columns.
+
+    Samples whose payload is not 107 bytes are skipped, like the scalar decoder does.
+    When the payloads are evenly spaced in the buffer (the usual per-sample framing)
+    they are viewed in place with a strided array; otherwise they are gathered.
+
+    Args:
+        buffer: Record bytes the samples point into
+        samples: List of (time_ms, offset, length) sample references
+        fields: Only compute these columns (see decode_vehicle_vis_array)
+
+    Returns:
+        dict mapping each of the 52 field names (or the requested fields) to a
+        NumPy array
+    """
+    if np is None:
+        raise ImportError("NumPy is required for columnar sample decoding")
+
+    samples = [s for s in samples if s[2] == 107]
+    count = len(samples)
+    time_ms = np.fromiter((s[0] for s in samples), dtype=np.int64, count=count)
+    offsets = np.fromiter((s[1] for s in samples), dtype=np.int64, count=count)
+
+    strides = np.diff(offsets)
+    if count == 0:
+        raw = np.empty(0, dtype=VEHICLE_VIS_DTYPE)
+    elif count == 1 or (strides[0] >= 107 and (strides == strides[0]).all()):
+        # Zero-copy strided view over the record
+        raw = np.ndarray((count,), dtype=VEHICLE_VIS_DTYPE, buffer=buffer,
+                         offset=int(offsets[0]), strides=(int(strides[0]) if count > 1 else 107,))
+    else:
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        raw = data[offsets[:, None] + np.arange(107)].view(VEHICLE_VIS_DTYPE).reshape(count)
+
+    return decode_vehicle_vis_array(time_ms, raw, fields)
+
+
+def decode_vehicle_vis_array(time_ms, raw, fields=None):
+    """Compute telemetry columns from a VEHICLE_VIS_DTYPE array.
+
+    Only the requested columns and the intermediate arrays they depend on are
+    computed, so e.g. ['time_ms', 'x', 'y', 'z'] does no trigonometry.
+
+    Args:
+        time_ms: int64 array of sample timestamps
+        raw: Structured array with dtype VEHICLE_VIS_DTYPE
+        fields: Columns to compute, in output order (names from
+            ghost.SAMPLE_FIELDS); defaults to all 52
+
+    Returns:
+        dict mapping each field name to a NumPy array
+    """
+    if np is None:
+        raise ImportError("NumPy is required for columnar sample decoding")
+
+    columns = _Columns(time_ms, raw)
+    return {name: columns[name] for name in (fields if fields is not None else SAMPLE_FIELDS)}
+
+
+class _Columns(dict):
+    """Arrays computed on first access from _EXPRESSIONS, each at most once."""
+
+    def __init__(self, time_ms, raw):
+        super().__init__(time_ms=time_ms)
+        self.raw = raw
+
+    def __missing__(self, name):
+        value = self[name] = _EXPRESSIONS[name](self)
+        return value
+
+    def u8(self, name):
+        return self.raw[name].astype(np.float64)
+
+
+def _wheel_rot(wheel):
+    # (rot/255 * 2π) + (count * 2π)
+    return lambda c: (c.u8(wheel + '_wheel_rot') / 255.0) * (2 * np.pi) + (c.u8(wheel + '_wheel_count') * 2 * np.pi)
+
+
+# name -> function of the _Columns memo; intermediates first, then the 52 fields
+_EXPRESSIONS = {
+    # Position & transform
+    'angle': lambda c: c.raw['angle'] * np.pi / 65535.0,
+    'axis_heading': lambda c: c.raw['axis_heading'] * np.pi / 32767.0,
+    'axis_pitch': lambda c: (c.raw['axis_pitch'] / 32767.0) * (np.pi / 2.0),
+    'vel_heading': lambda c: (c.raw['vel_heading'] / 127.0) * np.pi,
+    'vel_pitch': lambda c: (c.raw['vel_pitch'] / 127.0) * (np.pi / 2.0),
+
+    # Quaternion from axis-angle
+    'sin_angle': lambda c: np.sin(c['angle']),
+    'cos_axis_pitch': lambda c: np.cos(c['axis_pitch']),
+    'ax': lambda c: c['sin_angle'] * c['cos_axis_pitch'] * np.cos(c['axis_heading']),
+    'ay': lambda c: c['sin_angle'] * c['cos_axis_pitch'] * np.sin(c['axis_heading']),
+    'az': lambda c: c['sin_angle'] * np.sin(c['axis_pitch']),
+    'qw': lambda c: np.cos(c['angle']),
+    'cos_vel_pitch': lambda c: np.cos(c['vel_pitch']),
+    'reactor_flags': lambda c: c.raw['reactor_flags'],
+    'reactor_control': lambda c: c.raw['reactor_control'],
+
+    'time_s': lambda c: c['time_ms'] / 1000.0,
+    'x': lambda c: c.raw['x'].astype(np.float64),
+    'y': lambda c: c.raw['y'].astype(np.float64),
+    'z': lambda c: c.raw['z'].astype(np.float64),
+    'speed': lambda c: np.exp(c.raw['speed'] / 1000.0),
+    'side_speed': lambda c: ((c.raw['side_speed'] / 65536.0) - 0.5) * 2000.0,
+
+    # Velocity vector
+    'vel_x': lambda c: c['speed'] * c['cos_vel_pitch'] * np.cos(c['vel_heading']),
+    'vel_y': lambda c: c['speed'] * c['cos_vel_pitch'] * np.sin(c['vel_heading']),
+    'vel_z': lambda c: c['speed'] * np.sin(c['vel_pitch']),
+
+    # Quaternion → Euler (same convention as the scalar decoder)
+    'pitch_deg': lambda c: np.degrees(np.arcsin(np.clip(
+        2.0 * (c['qw'] * c['ay'] - c['az'] * c['ax']), -1.0, 1.0))),
+    'yaw_deg': lambda c: np.degrees(np.arctan2(
+        2.0 * (c['qw'] * c['az'] + c['ax'] * c['ay']), 1.0 - 2.0 * (c['ay'] * c['ay'] + c['az'] * c['az']))),
+    'roll_deg': lambda c: np.degrees(np.arctan2(
+        2.0 * (c['qw'] * c['ax'] + c['ay'] * c['az']), 1.0 - 2.0 * (c['ax'] * c['ax'] + c['ay'] * c['ay']))),
+
+    'steer': lambda c: ((c.u8('steer') / 255.0) - 0.5) * 2.0,
+    'gas': lambda c: (c.u8('gas') / 255.0) + c['brake'],
+    'brake': lambda c: c.u8('brake') / 255.0,
+    'gear': lambda c: c.u8('gear') / 5.0,
+    'rpm': lambda c: c.raw['rpm'].astype(np.int64),
+    'is_turbo': lambda c: (c.raw['is_turbo'] & 0x82) != 0,
+    'turbo_time': lambda c: c.u8('turbo_time') / 255.0,
+    'is_ground_contact': lambda c: (c['reactor_flags'] & 0x01) != 0,
+    'is_top_contact': lambda c: (c.raw['is_top_contact'] & 0x20) != 0,
+
+    # Reactor flags
+    'reactor_state': lambda c: np.select(
+        [(c['reactor_flags'] & 0x04) != 0, (c['reactor_flags'] & 0x08) != 0, (c['reactor_flags'] & 0x10) != 0],
+        [1, 2, 3], default=0),
+    'reactor_boost': lambda c: np.select(
+        [(c['reactor_flags'] & 0x20) != 0, (c['reactor_flags'] & 0x40) != 0],
+        [1, 2], default=0),
+    'reactor_pedal': lambda c: np.select(
+        [(c['reactor_control'] & 0x20) != 0, (c['reactor_control'] & 0x10) != 0],
+        [1, 0], default=-1),
+    'reactor_steer': lambda c: np.select(
+        [(c['reactor_control'] & 0x80) != 0, (c['reactor_control'] & 0x40) != 0],
+        [-1, 0], default=1),
+
+    'sim_time_coef': lambda c: c.u8('sim_time_coef') / 255.0,
+    'wetness': lambda c: c.u8('wetness') / 255.0,
+    'fl_slip': lambda c: (c.raw['slip_byte1'] & 0x40) != 0,
+    'fr_slip': lambda c: (c.raw['slip_byte2'] & 0x01) != 0,
+    'rr_slip': lambda c: (c.raw['slip_byte2'] & 0x04) != 0,
+    'rl_slip': lambda c: (c.raw['slip_byte2'] & 0x10) != 0,
+}
+
+for _wheel in ('fl', 'fr', 'rr', 'rl'):
+    _EXPRESSIONS.update({
+        _wheel + '_dampen': lambda c, w=_wheel: ((c.u8(w + '_dampen') / 255.0) - 0.5) * 4.0,
+        _wheel + '_ice': lambda c, w=_wheel: c.u8(w + '_ice') / 255.0,
+        _wheel + '_dirt': lambda c, w=_wheel: c.u8(w + '_dirt') / 255.0,
+        _wheel + '_ground_mat': lambda c, w=_wheel: c.raw[w + '_ground_mat'].astype(np.int64),
+        _wheel + '_wheel_rot': _wheel_rot(_wheel),
+    })
+del _wheel